@@ -0,0 +1,151 @@
+"""
+Times how long the app takes to get its DataFrame, from complete.json and from
+the columnar complete.parquet artifact written by main_script.py.
+
+    python benchmarks/bench_cold_start.py [--runs 5] [--json results.json]
+
+"cold" runs each loader in a fresh interpreter (imports included), which is
+what a new Streamlit worker pays. "warm" times only the loader call.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from car_dataset import (  # noqa: E402
+    normalize_car_data,
+    read_columnar_dataset,
+    read_json_dataset,
+    write_columnar_dataset,
+)
+from file_utils import hash_file  # noqa: E402
+
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from car_dataset import read_columnar_dataset, read_json_dataset
+car_df = {call}
+assert car_df is not None and len(car_df)
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start_seconds(call, runs):
+    """Median seconds for a fresh interpreter to import and run ``call``."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT.format(call=call)],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def warm_seconds(function, runs, *args):
+    """Best-of-``runs`` seconds for a loader call in this process."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_scaled_copies(json_filepath, scale, out_dir):
+    """
+    Writes complete.json and complete.parquet with every model repeated
+    ``scale`` times (as earlier model years), to see how both paths grow.
+
+    Returns:
+        tuple: (json path, parquet path).
+    """
+    with open(json_filepath, "r") as infile:
+        company_cars_data = json.load(infile)
+
+    scaled = {
+        brand: [
+            dict(model_info, year=int(model_info["year"]) - copy)
+            for copy in range(scale)
+            for model_info in models
+        ]
+        for brand, models in company_cars_data.items()
+    }
+    scaled_json = os.path.join(out_dir, "complete.json")
+    scaled_columnar = os.path.join(out_dir, "complete.parquet")
+    with open(scaled_json, "w") as outfile:
+        json.dump(scaled, outfile, indent=4)
+    write_columnar_dataset(
+        normalize_car_data(scaled).frame, scaled_columnar, hash_file(scaled_json)
+    )
+    return scaled_json, scaled_columnar
+
+
+def run(json_filepath, columnar_filepath, runs):
+    if read_columnar_dataset(columnar_filepath, json_filepath) is None:
+        raise SystemExit(
+            f"{columnar_filepath} is missing or stale; run main_script.py first."
+        )
+
+    json_call = f"read_json_dataset({json_filepath!r})"
+    columnar_call = f"read_columnar_dataset({columnar_filepath!r}, {json_filepath!r})"
+    return {
+        "benchmark": "cold_start",
+        "runs": runs,
+        "json_cold_seconds": cold_start_seconds(json_call, runs),
+        "columnar_cold_seconds": cold_start_seconds(columnar_call, runs),
+        "json_warm_seconds": warm_seconds(read_json_dataset, runs, json_filepath),
+        "columnar_warm_seconds": warm_seconds(
+            read_columnar_dataset, runs, columnar_filepath, json_filepath
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json-file", default=os.path.join(ROOT_DIR, "complete.json"))
+    parser.add_argument(
+        "--columnar-file", default=os.path.join(ROOT_DIR, "complete.parquet")
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Repeat every model this many times (in a temporary copy).",
+    )
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file, columnar_file = args.json_file, args.columnar_file
+        if args.scale > 1:
+            json_file, columnar_file = write_scaled_copies(
+                args.json_file, args.scale, tmp_dir
+            )
+        results = run(json_file, columnar_file, args.runs)
+        results["rows"] = len(read_json_dataset(json_file))
+
+    print(
+        f"{results['rows']} rows\n"
+        f"Cold start (median of {args.runs}, imports included):\n"
+        f"  complete.json    {results['json_cold_seconds'] * 1000:.1f} ms\n"
+        f"  complete.parquet {results['columnar_cold_seconds'] * 1000:.1f} ms\n"
+        f"Loader only (best of {args.runs}):\n"
+        f"  complete.json    {results['json_warm_seconds'] * 1000:.2f} ms\n"
+        f"  complete.parquet {results['columnar_warm_seconds'] * 1000:.2f} ms"
+    )
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
@@ -0,0 +1,136 @@
+"""
+Compares the streaming lineup extraction against the full BeautifulSoup parse
+over the raw pages in data/.
+
+    python benchmarks/bench_extraction.py [--repeat 3] [--json results.json]
+
+Every page is checked for identical {year, model, price} records before its
+timings are reported.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+from lineup_parser import iter_lineup_cards  # noqa: E402
+
+
+def soup_extract(html_content, data_qa_prefix):
+    """The full-document BeautifulSoup extraction the scraper used before."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    records = []
+    for item in soup.find_all("spark-card", class_="new-car-lineup-model-card"):
+        model_name_element = item.find(
+            "div", {"data-qa": lambda x: x and x.startswith(data_qa_prefix)}
+        )
+        if not model_name_element:
+            continue
+        link_element = model_name_element.find("a", {"data-card-link": ""})
+        if not link_element:
+            continue
+        model_name_div = link_element.find("div", class_="new-car-model-card-name")
+        if not model_name_div:
+            continue
+        model_year_model_name = model_name_div.text.strip()
+        parts = model_year_model_name.split(" ", 1)
+        price_element = item.find("div", class_="new-car-model-card-price")
+        records.append(
+            {
+                "year": parts[0] if parts else "Year N/A",
+                "model": parts[1] if len(parts) > 1 else model_year_model_name,
+                "price": (
+                    price_element.text.strip() if price_element else "Price not found"
+                ),
+            }
+        )
+    return records
+
+
+def streaming_extract(html_content, data_qa_prefix):
+    """The same records through lineup_parser."""
+    records = []
+    for card in iter_lineup_cards(html_content, data_qa_prefix):
+        if not (card.has_model_element and card.has_link and card.name is not None):
+            continue
+        parts = card.name.split(" ", 1)
+        records.append(
+            {
+                "year": parts[0] if parts else "Year N/A",
+                "model": parts[1] if len(parts) > 1 else card.name,
+                "price": card.price if card.price is not None else "Price not found",
+            }
+        )
+    return records
+
+
+def best_of(function, repeat, *args):
+    """Returns (result, best wall-clock seconds) over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(data_dir, repeat):
+    pages = {}
+    for filepath in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        make = os.path.basename(filepath)[:-5]
+        with open(filepath, "r") as infile:
+            pages[make] = json.load(infile)["results"][0]["content"]
+
+    per_make = {}
+    for make, html_content in pages.items():
+        soup_records, soup_seconds = best_of(
+            soup_extract, repeat, html_content, f"{make}-"
+        )
+        stream_records, stream_seconds = best_of(
+            streaming_extract, repeat, html_content, f"{make}-"
+        )
+        if soup_records != stream_records:
+            raise AssertionError(f"Extracted records differ for {make}")
+        per_make[make] = {
+            "bytes": len(html_content),
+            "records": len(stream_records),
+            "soup_seconds": soup_seconds,
+            "streaming_seconds": stream_seconds,
+        }
+
+    soup_total = sum(result["soup_seconds"] for result in per_make.values())
+    stream_total = sum(result["streaming_seconds"] for result in per_make.values())
+    return {
+        "benchmark": "extraction",
+        "pages": len(per_make),
+        "records": sum(result["records"] for result in per_make.values()),
+        "soup_seconds": soup_total,
+        "streaming_seconds": stream_total,
+        "speedup": soup_total / stream_total if stream_total else None,
+        "per_make": per_make,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = run(args.data_dir, args.repeat)
+    print(
+        f"{results['pages']} pages, {results['records']} records (identical output)\n"
+        f"BeautifulSoup: {results['soup_seconds']:.3f}s\n"
+        f"Streaming:     {results['streaming_seconds']:.3f}s\n"
+        f"Speedup:       {results['speedup']:.1f}x"
+    )
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark of LineupExtractor, the extraction shared by the scraper and
+the build, over the raw pages in data/.
+
+    python benchmarks/bench_extractor.py [--repeat 5] [--json results.json]
+
+Every page's records are checked against complete.json first. Timings are the
+best of --repeat over all pages: records from str and from bytes input, the
+card parse alone, and the record conversion of already parsed cards.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from lineup_parser import LineupExtractor  # noqa: E402
+from page_store import find_raw_page, list_stored_makes, load_raw_page  # noqa: E402
+
+
+def best_of(function, repeat):
+    """Returns (result, best wall-clock seconds) over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(data_dir, complete_filepath, repeat):
+    pages = {
+        make: load_raw_page(find_raw_page(data_dir, make))
+        for make in list_stored_makes(data_dir)
+    }
+    page_bytes = {
+        make: html_content.encode("utf-8") for make, html_content in pages.items()
+    }
+    extractors = {make: LineupExtractor.for_make(make) for make in pages}
+
+    with open(complete_filepath, "r") as infile:
+        company_cars_data = json.load(infile)
+    for make, html_content in pages.items():
+        records = [
+            record._asdict() for record in extractors[make].iter_records(html_content)
+        ]
+        if records != company_cars_data.get(make.capitalize(), []):
+            raise AssertionError(f"Records differ from complete.json for {make}")
+
+    def records_from(sources):
+        return sum(
+            sum(1 for _ in extractors[make].iter_records(source))
+            for make, source in sources.items()
+        )
+
+    record_count, str_seconds = best_of(lambda: records_from(pages), repeat)
+    _, bytes_seconds = best_of(lambda: records_from(page_bytes), repeat)
+    cards, parse_seconds = best_of(
+        lambda: {
+            make: list(extractors[make].iter_cards(html_content))
+            for make, html_content in pages.items()
+        },
+        repeat,
+    )
+    _, convert_seconds = best_of(
+        lambda: sum(
+            sum(1 for _ in extractors[make].iter_card_records(make_cards))
+            for make, make_cards in cards.items()
+        ),
+        repeat,
+    )
+
+    total_bytes = sum(len(html_content) for html_content in page_bytes.values())
+    return {
+        "benchmark": "extractor",
+        "repeat": repeat,
+        "pages": len(pages),
+        "bytes": total_bytes,
+        "records": record_count,
+        "str_seconds": str_seconds,
+        "bytes_seconds": bytes_seconds,
+        "parse_seconds": parse_seconds,
+        "convert_seconds": convert_seconds,
+        "records_per_second": record_count / str_seconds,
+        "megabytes_per_second": total_bytes / str_seconds / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument(
+        "--complete-file", default=os.path.join(ROOT_DIR, "complete.json")
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = run(args.data_dir, args.complete_file, args.repeat)
+    print(
+        f"{results['pages']} pages, {results['bytes'] / 1e6:.1f} MB, "
+        f"{results['records']} records (match complete.json)\n"
+        f"Records from str:   {results['str_seconds'] * 1000:.1f} ms "
+        f"({results['megabytes_per_second']:.0f} MB/s)\n"
+        f"Records from bytes: {results['bytes_seconds'] * 1000:.1f} ms\n"
+        f"Card parse only:    {results['parse_seconds'] * 1000:.1f} ms\n"
+        f"Record conversion:  {results['convert_seconds'] * 1000:.2f} ms"
+    )
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
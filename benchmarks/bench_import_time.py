@@ -0,0 +1,157 @@
+"""
+Reports what importing the Streamlit app costs, from ``python -X importtime``.
+
+    python benchmarks/bench_import_time.py [--runs 5] [--top 15] [--json results.json]
+
+"app" imports car_prices_app the way a fresh Streamlit worker does. "first
+chart" then imports plotly.express, which the app defers until it draws its
+first chart. Times are medians over --runs fresh interpreters.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_IMPORT = "import car_prices_app"
+FIRST_CHART_IMPORT = "import car_prices_app; import plotly.express"
+
+# Modules the app used to import at the top, and its heavy dependencies;
+# reported to show which are paid at startup (Streamlit itself pulls in parts
+# of plotly, but not plotly.express)
+WATCHED_MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "plotly.express",
+    "plotly.graph_objs",
+    "dotenv",
+]
+
+
+def import_times(code):
+    """
+    Runs ``code`` under ``-X importtime`` in a fresh interpreter.
+
+    Returns:
+        dict: Module name -> cumulative microseconds, for every module imported
+        while running ``code``. Only top-level imports (not nested under
+        another module's) have names without a leading space, so their times
+        can be summed.
+    """
+    env = dict(os.environ, STREAMLIT_LOGGER_LEVEL="error")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    # "import time: self [us] | cumulative | imported package", nested
+    # imports indented below the module that triggered them
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name[1:]  # Keep the indentation beyond the separator's space
+        times[name] = int(cumulative)
+    return times
+
+
+def top_level(times):
+    """The entries of ``import_times`` not nested under another import."""
+    return {name: value for name, value in times.items() if not name.startswith(" ")}
+
+
+def app_imports(times):
+    """The entries imported directly by car_prices_app (one level down)."""
+    children = {}
+    for name, value in times.items():  # Children are listed before their parent
+        if name == "car_prices_app":
+            return children
+        if not name.startswith(" "):
+            children = {}  # Those belonged to another top-level import
+        elif not name.startswith("    "):
+            children[name.strip()] = value
+    return {}
+
+
+def module_time(times, module):
+    """Cumulative microseconds of ``module`` wherever it was imported, or None."""
+    for name, value in times.items():
+        if name.strip() == module:
+            return value
+    return None
+
+
+def median_times(code, runs):
+    """Median of ``import_times`` over ``runs`` runs, in import order."""
+    samples = [import_times(code) for _ in range(runs)]
+    modules = dict.fromkeys(module for sample in samples for module in sample)
+    return {
+        module: statistics.median(sample.get(module, 0) for sample in samples)
+        for module in modules
+    }
+
+
+def run(runs, top):
+    app = median_times(APP_IMPORT, runs)
+    first_chart = median_times(FIRST_CHART_IMPORT, runs)
+    app_total = sum(top_level(app).values())
+    # Only what the first chart imports on top of the app
+    deferred_total = sum(
+        microseconds
+        for module, microseconds in top_level(first_chart).items()
+        if module not in app
+    )
+    return {
+        "benchmark": "import_time",
+        "runs": runs,
+        "app_seconds": app_total / 1e6,
+        "deferred_seconds": deferred_total / 1e6,
+        "watched_modules": {
+            module: {
+                "at_startup": module_time(app, module) is not None,
+                "seconds": (module_time(first_chart, module) or 0) / 1e6,
+            }
+            for module in WATCHED_MODULES
+        },
+        "top_modules": [
+            {"module": module, "seconds": microseconds / 1e6}
+            for module, microseconds in sorted(
+                app_imports(app).items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.top)
+    print(
+        f"App import:            {results['app_seconds'] * 1000:.0f} ms\n"
+        f"Deferred to 1st chart: {results['deferred_seconds'] * 1000:.0f} ms\n"
+        f"Slowest imports of car_prices_app (median of {args.runs}):"
+    )
+    for entry in results["top_modules"]:
+        print(f"  {entry['module']:<24} {entry['seconds'] * 1000:8.1f} ms")
+    print("Watched modules:")
+    for module, entry in results["watched_modules"].items():
+        when = "startup" if entry["at_startup"] else "deferred"
+        print(f"  {module:<24} {when:<9} {entry['seconds'] * 1000:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
@@ -0,0 +1,236 @@
+"""
+Times every stage from scrape to serve, using the raw pages in data/ as
+fixtures and a local stub in place of the Oxylabs endpoint.
+
+    python benchmarks/bench_pipeline.py [--repeat 3] [--json results.json]
+
+Stages (best of --repeat, seconds):
+    scrape        scrape_car_models for every make through the stub proxy
+    raw_load      reading each raw page from disk
+    extract       lineup extraction from the loaded HTML
+    build         main_script's serial build (load + extract + merge)
+    write         writing complete.json
+    normalize     typing years and prices, quarantine and outlier flags
+    load_car_data the app's cached loader, with its cache cleared
+    serve         the app's filter path: index, queries, sort and summaries
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from car_dataset import (  # noqa: E402
+    normalize_car_data,
+    write_columnar_dataset,
+)
+from car_query import CarIndex  # noqa: E402
+from file_utils import hash_file, write_json_atomic  # noqa: E402
+from main_script import (  # noqa: E402
+    build_company_cars_data,
+    discover_makes,
+)
+from page_store import find_raw_page, load_raw_page  # noqa: E402
+from scraper_module import (  # noqa: E402
+    create_session,
+    parse_models_data,
+    scrape_car_models,
+)
+from stub_proxy import start_stub_proxy  # noqa: E402
+
+BASE_URL = "https://www.cars.com/research/"
+QUERY_COUNT = 50  # Random filter states per serve run
+
+
+def best_of(function, repeat):
+    """Returns (result, best wall-clock seconds) over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def quiet(function):
+    """Wraps ``function`` so its console output is discarded."""
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function()
+
+    return run
+
+
+def bench_scrape(makes, data_dir, out_dir, repeat):
+    server, endpoint = start_stub_proxy(data_dir)
+    session = create_session(1)
+    try:
+
+        def scrape_all():
+            return {
+                make: scrape_car_models(
+                    make, "user", "pass", BASE_URL, out_dir, session, endpoint
+                )
+                for make in makes
+            }
+
+        results, seconds = best_of(quiet(scrape_all), repeat)
+    finally:
+        session.close()
+        server.shutdown()
+
+    failed = [make for make, models in results.items() if models is None]
+    if failed:
+        raise AssertionError(f"Stub scrape failed for {', '.join(failed)}")
+    return {
+        "seconds": seconds,
+        "requests": len(makes),
+        "models": sum(len(models) for models in results.values()),
+    }
+
+
+def bench_serve(car_index, repeat):
+    """Index build once, then random brand/year/price queries with sorting."""
+    rng = random.Random(0)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        brands = rng.sample(car_index.brands, rng.randint(1, len(car_index.brands)))
+        min_year = rng.randint(car_index.min_year, car_index.max_year)
+        max_year = rng.randint(min_year, car_index.max_year)
+        min_price = rng.randint(int(car_index.min_price), int(car_index.max_price))
+        max_price = rng.randint(min_price, int(car_index.max_price))
+        queries.append((brands, (min_year, max_year), (min_price, max_price)))
+
+    def run_queries():
+        rows = 0
+        for brands, year_range, price_range in queries:
+            result = car_index.query(brands, year_range, price_range)
+            car_index.sorted_positions(
+                result.positions,
+                ("Price", "Brand", "Year", "Model"),
+                (False, True, True, True),
+            )
+            rows += len(result.positions)
+        return rows
+
+    rows, seconds = best_of(run_queries, repeat)
+    return {
+        "seconds": seconds,
+        "queries": len(queries),
+        "seconds_per_query": seconds / len(queries),
+        "rows_returned": rows,
+    }
+
+
+def run(data_dir, repeat):
+    # Outside `streamlit run` the app module logs a warning per Streamlit call
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    import car_prices_app
+
+    makes = discover_makes(data_dir)
+    stages = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scrape_dir = os.path.join(tmp_dir, "scraped")
+        os.makedirs(scrape_dir)
+        stages["scrape"] = bench_scrape(makes, data_dir, scrape_dir, repeat)
+        shutil.rmtree(scrape_dir)
+
+        pages, seconds = best_of(
+            lambda: {
+                make: load_raw_page(find_raw_page(data_dir, make)) for make in makes
+            },
+            repeat,
+        )
+        stages["raw_load"] = {
+            "seconds": seconds,
+            "bytes": sum(len(html_content) for html_content in pages.values()),
+        }
+
+        models, seconds = best_of(
+            quiet(
+                lambda: {
+                    make: parse_models_data(html_content, make)
+                    for make, html_content in pages.items()
+                }
+            ),
+            repeat,
+        )
+        stages["extract"] = {
+            "seconds": seconds,
+            "models": sum(len(records) for records in models.values()),
+        }
+
+        (company_cars_data, _), seconds = best_of(
+            quiet(lambda: build_company_cars_data(makes, data_dir)), repeat
+        )
+        stages["build"] = {"seconds": seconds, "makes": len(makes)}
+
+        complete_filepath = os.path.join(tmp_dir, "complete.json")
+        _, seconds = best_of(
+            lambda: write_json_atomic(complete_filepath, company_cars_data), repeat
+        )
+        stages["write"] = {
+            "seconds": seconds,
+            "bytes": os.path.getsize(complete_filepath),
+        }
+
+        columnar_filepath = os.path.join(tmp_dir, "complete.parquet")
+        normalized, seconds = best_of(
+            lambda: normalize_car_data(company_cars_data), repeat
+        )
+        stages["normalize"] = {
+            "seconds": seconds,
+            **normalized.report._asdict(),
+        }
+        has_columnar = write_columnar_dataset(
+            normalized.frame, columnar_filepath, hash_file(complete_filepath)
+        )
+
+        def load_uncached():
+            car_prices_app.load_car_data.clear()
+            return car_prices_app.load_car_data(complete_filepath, columnar_filepath)
+
+        car_df, seconds = best_of(load_uncached, repeat)
+        stages["load_car_data"] = {
+            "seconds": seconds,
+            "rows": len(car_df),
+            "source": "parquet" if has_columnar else "json",
+        }
+
+        car_index, seconds = best_of(lambda: CarIndex(car_df), repeat)
+        stages["serve"] = dict(bench_serve(car_index, repeat), index_seconds=seconds)
+
+    return {
+        "benchmark": "pipeline",
+        "repeat": repeat,
+        "makes": len(makes),
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = run(args.data_dir, args.repeat)
+    print(f"{results['makes']} makes, best of {args.repeat}:")
+    for stage, timings in results["stages"].items():
+        print(f"  {stage:<14} {timings['seconds'] * 1000:9.2f} ms")
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
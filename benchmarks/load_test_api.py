@@ -0,0 +1,211 @@
+"""
+Load test of the car_api.py HTTP endpoint on localhost.
+
+    python benchmarks/load_test_api.py [--clients 16] [--requests 2000]
+        [--url http://127.0.0.1:8766] [--json results.json]
+
+Without --url, a server is started with `car_api.py serve` on a free port and
+stopped afterwards. Each client thread keeps one connection open and sends
+random /models, /cheapest and /stats queries (seeded, so runs are comparable).
+Any response that is not 200 with a well-formed body counts as an error.
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_START_TIMEOUT = 30  # Seconds to wait for a started server to answer
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(connection, path):
+    """Returns (status, body) of a GET on an open connection."""
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+@contextlib.contextmanager
+def local_server(complete_file=None):
+    """Runs `car_api.py serve` on a free port; yields its base URL."""
+    port = free_port()
+    command = [sys.executable, "car_api.py"]
+    if complete_file:
+        command += ["--file", complete_file]
+    command += ["serve", "--port", str(port)]
+    process = subprocess.Popen(
+        command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                with contextlib.closing(connection):
+                    if get(connection, "/health")[0] == 200:
+                        break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise SystemExit("car_api.py serve did not start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def make_requests(health, count, seed):
+    """Random query paths over the brands and ranges the server reported."""
+    rng = random.Random(seed)
+    brands = health["brands"]
+    min_year, max_year = health["year_range"]
+    min_price, max_price = (int(price) for price in health["price_range"])
+    paths = []
+    for _ in range(count):
+        params = {"brand": rng.sample(brands, rng.randint(1, min(5, len(brands))))}
+        if rng.random() < 0.2:
+            params.pop("brand")  # All brands
+        year_min = rng.randint(min_year, max_year)
+        params["year_min"] = year_min
+        params["year_max"] = rng.randint(year_min, max_year)
+        price_min = rng.randint(min_price, max_price)
+        params["price_min"] = price_min
+        params["price_max"] = rng.randint(price_min, max_price)
+        if rng.random() < 0.2:
+            params["format"] = "csv"
+
+        endpoint = rng.choices(["/models", "/cheapest", "/stats"], [6, 3, 1])[0]
+        if endpoint == "/models":
+            params["sort"] = rng.choice(["price", "year", "brand", "model"])
+            params["order"] = rng.choice(["asc", "desc"])
+            params["limit"] = rng.choice([10, 50, 100])
+        elif endpoint == "/cheapest":
+            params["n"] = rng.choice([5, 10, 25])
+        paths.append(f"{endpoint}?{urlencode(params, doseq=True)}")
+    return paths
+
+
+def is_well_formed(path, body):
+    if "format=csv" in path:
+        return body.startswith(b"Brand,")
+    return isinstance(json.loads(body), list)
+
+
+def run(url, clients, request_count, seed=0):
+    address = urlsplit(url)
+    host, port = address.hostname, address.port or 80
+    with contextlib.closing(http.client.HTTPConnection(host, port)) as connection:
+        status, body = get(connection, "/health")
+    if status != 200:
+        raise SystemExit(f"{url}/health answered {status}")
+    paths = make_requests(json.loads(body), request_count, seed)
+
+    next_request = iter(range(len(paths)))
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        own_latencies = []
+        while True:
+            with lock:
+                index = next(next_request, None)
+            if index is None:
+                break
+            path = paths[index]
+            start = time.perf_counter()
+            try:
+                status, body = get(connection, path)
+                ok = status == 200 and is_well_formed(path, body)
+            except (OSError, http.client.HTTPException, ValueError) as error:
+                status, ok = repr(error), False
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+            own_latencies.append(time.perf_counter() - start)
+            if not ok:
+                with lock:
+                    errors.append({"path": path, "status": status})
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for future in [executor.submit(client) for _ in range(clients)]:
+            future.result()
+    wall_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "benchmark": "api_load",
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_seconds": wall_seconds,
+        "requests_per_second": len(latencies) / wall_seconds,
+        "latency_ms": {
+            "p50": percentiles[49] * 1000,
+            "p95": percentiles[94] * 1000,
+            "p99": percentiles[98] * 1000,
+            "max": latencies[-1] * 1000,
+        },
+    }
+
+
+def run_local(clients, request_count, complete_file=None):
+    """``run`` against a server started for the test."""
+    with local_server(complete_file) as url:
+        return run(url, clients, request_count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="A running server (default: start one).")
+    parser.add_argument("--file", help="Dataset for the started server.")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="At least 2.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    if args.url:
+        results = run(args.url, args.clients, args.requests, args.seed)
+    else:
+        with local_server(args.file) as url:
+            results = run(url, args.clients, args.requests, args.seed)
+
+    latency = results["latency_ms"]
+    print(
+        f"{results['requests']} requests from {results['clients']} clients "
+        f"in {results['wall_seconds']:.2f} s "
+        f"({results['requests_per_second']:.0f} req/s), {results['errors']} errors\n"
+        f"Latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, "
+        f"p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms"
+    )
+    for error in results["error_samples"]:
+        print(f"  {error['status']}: {error['path']}")
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=4)
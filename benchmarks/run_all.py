@@ -0,0 +1,56 @@
+"""
+Runs every benchmark and writes their results to one JSON file.
+
+    python benchmarks/run_all.py [--repeat 3] [--json benchmark_results.json]
+
+Compare two result files to spot a stage that regressed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import bench_cold_start  # noqa: E402
+import bench_extraction  # noqa: E402
+import bench_extractor  # noqa: E402
+import bench_import_time  # noqa: E402
+import bench_pipeline  # noqa: E402
+import load_test_api  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "benchmarks": [
+            bench_pipeline.run(args.data_dir, args.repeat),
+            bench_extraction.run(args.data_dir, args.repeat),
+            bench_extractor.run(
+                args.data_dir, os.path.join(ROOT_DIR, "complete.json"), args.repeat
+            ),
+            bench_cold_start.run(
+                os.path.join(ROOT_DIR, "complete.json"),
+                os.path.join(ROOT_DIR, "complete.parquet"),
+                args.repeat,
+            ),
+            bench_import_time.run(args.repeat, top=15),
+            load_test_api.run_local(clients=8, request_count=1000),
+        ],
+    }
+    with open(args.json, "w") as outfile:
+        json.dump(results, outfile, indent=4)
+
+    for result in results["benchmarks"]:
+        print(f"{result['benchmark']}: done")
+    print(f"Results written to: {args.json}")
@@ -0,0 +1,443 @@
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from car_dataset import find_complete_file, read_car_dataset
+from car_query import CarIndex
+from render_cache import LRUCache
+
+logger = logging.getLogger("car_api")
+
+DEFAULT_HOST = "127.0.0.1"  # Local only; there is no authentication
+DEFAULT_PORT = 8766  # stub_proxy.py defaults to 8765
+
+# Number of filter states (and sort orders) whose results are kept
+QUERY_CACHE_SIZE = 256
+
+OUTPUT_FORMATS = ("json", "csv")
+
+# Columns returned for each model
+MODEL_COLUMNS = ["Brand", "Year", "Model", "Price", "Price Max", "Price Outlier"]
+
+# Sort keys, most significant first; the first one takes the requested order
+SORT_KEYS = {
+    "price": ("Price", "Brand", "Year", "Model"),
+    "year": ("Year", "Brand", "Model", "Price"),
+    "brand": ("Brand", "Year", "Model", "Price"),
+    "model": ("Model", "Year", "Price", "Brand"),
+}
+
+ModelQuery = namedtuple(
+    "ModelQuery",
+    ["brands", "year_range", "price_range", "sort", "descending", "limit", "offset"],
+)
+ModelQuery.__doc__ = """
+A normalized models query; equal queries share cached results.
+
+Attributes:
+    brands (tuple): Sorted brand names as listed in the dataset.
+    year_range (tuple): Inclusive (min, max) model year.
+    price_range (tuple): Inclusive (min, max) price. Ends not given are None
+        if the dataset is empty.
+    sort (str): A key of SORT_KEYS.
+    descending (bool): Order of the first sort key.
+    limit (int): Rows to return at most, or None for all.
+    offset (int): Matching rows to skip first.
+"""
+
+
+class QueryError(ValueError):
+    """A query parameter is missing, malformed or out of range."""
+
+
+class CarQueryService:
+    """
+    Answers filter, sort and aggregate queries over the car dataset, loaded
+    once and kept in memory.
+
+    Queries go through ``CarIndex``; their results and sort orders are kept in
+    a shared ``LRUCache``, so the service can be used from many threads (the
+    HTTP server runs one per request).
+    """
+
+    def __init__(self, car_df, source=None, cache_size=QUERY_CACHE_SIZE):
+        self.index = CarIndex(car_df)
+        self.source = source
+        self.cache = LRUCache(max_entries=cache_size)
+        self.loaded_at = time.time()
+        self._brand_names = {brand.lower(): brand for brand in self.index.brands}
+
+    @classmethod
+    def from_file(cls, filepath=None, cache_size=QUERY_CACHE_SIZE):
+        """Loads complete.json or complete.ndjson (the newest by default)."""
+        filepath = filepath or find_complete_file()
+        return cls(read_car_dataset(filepath), source=filepath, cache_size=cache_size)
+
+    def make_query(
+        self,
+        brands=None,
+        year_range=None,
+        price_range=None,
+        sort="price",
+        descending=False,
+        limit=None,
+        offset=0,
+    ):
+        """
+        Validates query parameters and fills in the defaults (all brands, every
+        year and price).
+
+        Raises:
+            QueryError: If a brand is unknown or a parameter is out of range.
+
+        Returns:
+            ModelQuery
+        """
+        if brands:
+            unknown = [b for b in brands if b.lower() not in self._brand_names]
+            if unknown:
+                raise QueryError(f"Unknown brand(s): {', '.join(unknown)}")
+            brands = tuple(sorted({self._brand_names[b.lower()] for b in brands}))
+        else:
+            brands = tuple(self.index.brands)
+
+        year_range = _bounds(
+            year_range, self.index.min_year, self.index.max_year, "year"
+        )
+        price_range = _bounds(
+            price_range, self.index.min_price, self.index.max_price, "price"
+        )
+        if sort not in SORT_KEYS:
+            raise QueryError(
+                f"Unknown sort key {sort!r}; expected one of {', '.join(SORT_KEYS)}"
+            )
+        if limit is not None and limit < 0:
+            raise QueryError("limit must not be negative")
+        if offset < 0:
+            raise QueryError("offset must not be negative")
+        return ModelQuery(
+            brands, year_range, price_range, sort, bool(descending), limit, offset
+        )
+
+    def _result(self, query):
+        filter_key = (query.brands, query.year_range, query.price_range)
+        return filter_key, self.cache.get_or_build(
+            ("query", filter_key),
+            lambda: self.index.query(query.brands, query.year_range, query.price_range),
+        )
+
+    def models(self, query):
+        """
+        Returns the models matching ``query``, sorted, one page of them.
+
+        Returns:
+            tuple: (total number of matches, DataFrame of MODEL_COLUMNS)
+        """
+        filter_key, result = self._result(query)
+        by = SORT_KEYS[query.sort]
+        order = self.cache.get_or_build(
+            ("order", filter_key, query.sort, query.descending),
+            lambda: self.index.sorted_positions(
+                result.positions,
+                by=by,
+                ascending=(not query.descending,) + (True,) * (len(by) - 1),
+            ),
+        )
+        stop = None if query.limit is None else query.offset + query.limit
+        page = order[query.offset : stop]
+        columns = [c for c in MODEL_COLUMNS if c in self.index.car_df]
+        frame = self.index.car_df.iloc[page][columns].reset_index(drop=True)
+        return len(order), frame
+
+    def cheapest(self, n, **filters):
+        """The ``n`` cheapest models matching the filters (see ``make_query``)."""
+        return self.models(cheapest_query(self.make_query(**filters), n))
+
+    def stats(self, query):
+        """
+        Per-brand price statistics of the models matching ``query``.
+
+        Returns:
+            pandas.DataFrame: Brand, Models, Minimum Price, Maximum Price and
+            Average Price, one row per brand with matches.
+        """
+        _, result = self._result(query)
+        stats = result.stats.reset_index()
+        stats.columns = [
+            "Brand",
+            "Models",
+            "Minimum Price",
+            "Maximum Price",
+            "Average Price",
+        ]
+        stats["Average Price"] = stats["Average Price"].round(2)
+        return stats
+
+    def describe(self):
+        """What the service holds: source, size, brands and value ranges."""
+        return {
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "models": len(self.index.car_df),
+            "brands": self.index.brands,
+            "year_range": [self.index.min_year, self.index.max_year],
+            "price_range": [
+                None if price is None else float(price)
+                for price in (self.index.min_price, self.index.max_price)
+            ],
+            "cache": self.cache.stats(),
+        }
+
+
+def cheapest_query(query, n):
+    """
+    ``query`` narrowed to its ``n`` cheapest models.
+
+    Raises:
+        QueryError: If ``n`` is not a positive integer.
+    """
+    if isinstance(n, bool) or not isinstance(n, int) or n < 1:
+        raise QueryError(f"n must be a positive integer, got {n!r}")
+    return query._replace(sort="price", descending=False, limit=n, offset=0)
+
+
+def _bounds(value_range, lowest, highest, name):
+    """
+    Fills the missing ends of an inclusive (min, max) range. Ends are left as
+    None if the dataset is empty and the range does not give them.
+    """
+    low, high = value_range or (None, None)
+    for value in (low, high):
+        if value is not None and not math.isfinite(value):
+            raise QueryError(f"{name} bounds must be finite numbers, got {value!r}")
+    low = lowest if low is None else low
+    high = highest if high is None else high
+    if low is not None and high is not None and low > high:
+        raise QueryError(f"{name} range is empty: {low} > {high}")
+    convert = int if name == "year" else float
+    return tuple(None if value is None else convert(value) for value in (low, high))
+
+
+def format_frame(frame, output_format):
+    """Renders a result frame as a JSON array of objects or as CSV."""
+    if output_format == "csv":
+        return frame.to_csv(index=False)
+    return frame.to_json(orient="records")
+
+
+# --- HTTP ---
+
+
+def _single(params, name, convert=str, default=None):
+    values = params.get(name)
+    if not values or values[-1] == "":
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise QueryError(f"Invalid value for {name}: {values[-1]!r}")
+
+
+def query_from_params(service, params):
+    """
+    Builds a ModelQuery from URL query parameters: brand (repeated or
+    comma-separated), year_min, year_max, price_min, price_max, sort,
+    order (asc or desc), limit and offset.
+    """
+    brands = [
+        brand.strip()
+        for value in params.get("brand", [])
+        for brand in value.split(",")
+        if brand.strip()
+    ]
+    order = _single(params, "order", default="asc")
+    if order not in ("asc", "desc"):
+        raise QueryError("order must be asc or desc")
+    return service.make_query(
+        brands=brands,
+        year_range=(_single(params, "year_min", int), _single(params, "year_max", int)),
+        price_range=(
+            _single(params, "price_min", float),
+            _single(params, "price_max", float),
+        ),
+        sort=_single(params, "sort", default="price"),
+        descending=order == "desc",
+        limit=_single(params, "limit", int),
+        offset=_single(params, "offset", int, default=0),
+    )
+
+
+class CarQueryHandler(BaseHTTPRequestHandler):
+    """
+    Read-only endpoints over a CarQueryService (``self.server.service``):
+
+        GET /health      service description, brands and cache statistics
+        GET /models      filtered, sorted models (X-Total-Count: all matches)
+        GET /cheapest    the n (default 10) cheapest matching models
+        GET /stats       per-brand price statistics of the matching models
+
+    Results are JSON unless ``format=csv`` is given.
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse connections
+    # Headers and body are separate writes; without TCP_NODELAY the body waits
+    # for the client's delayed ACK on a kept-alive connection (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        service = self.server.service
+        try:
+            output_format = _single(params, "format", default="json")
+            if output_format not in OUTPUT_FORMATS:
+                raise QueryError(f"format must be one of {', '.join(OUTPUT_FORMATS)}")
+
+            if url.path == "/health":
+                self._send(200, json.dumps(service.describe()), "json")
+            elif url.path == "/models":
+                total, frame = service.models(query_from_params(service, params))
+                self._send(
+                    200,
+                    format_frame(frame, output_format),
+                    output_format,
+                    {"X-Total-Count": str(total)},
+                )
+            elif url.path == "/cheapest":
+                n = _single(params, "n", int, default=10)
+                query = cheapest_query(query_from_params(service, params), n)
+                total, frame = service.models(query)
+                self._send(
+                    200,
+                    format_frame(frame, output_format),
+                    output_format,
+                    {"X-Total-Count": str(total)},
+                )
+            elif url.path == "/stats":
+                stats = service.stats(query_from_params(service, params))
+                self._send(200, format_frame(stats, output_format), output_format)
+            else:
+                self._send(404, json.dumps({"error": "Not found"}), "json")
+        except QueryError as error:
+            self._send(400, json.dumps({"error": str(error)}), "json")
+
+    def _send(self, status, body, output_format, headers=None):
+        body = body.encode("utf-8")
+        content_type = "text/csv" if output_format == "csv" else "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Creates (without starting) a threaded HTTP server for ``service``; port 0
+    picks a free port (see ``server.server_address``).
+    """
+    server = ThreadingHTTPServer((host, port), CarQueryHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve_in_background(service, host=DEFAULT_HOST, port=0):
+    """Starts a server on a daemon thread; stop it with ``server.shutdown()``."""
+    server = make_server(service, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- CLI ---
+
+
+def _add_filter_arguments(parser):
+    parser.add_argument(
+        "--brand", action="append", help="Brand to include (repeatable; default all)."
+    )
+    parser.add_argument("--years", nargs=2, type=int, metavar=("MIN", "MAX"))
+    parser.add_argument("--prices", nargs=2, type=float, metavar=("MIN", "MAX"))
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Query the car dataset without the Streamlit app."
+    )
+    parser.add_argument(
+        "--file", help="complete.json or complete.ndjson (default: the newest)."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    models_parser = subparsers.add_parser("models", help="List matching models.")
+    _add_filter_arguments(models_parser)
+    models_parser.add_argument("--sort", choices=SORT_KEYS, default="price")
+    models_parser.add_argument("--desc", action="store_true")
+    models_parser.add_argument("--limit", type=int)
+    models_parser.add_argument("--offset", type=int, default=0)
+
+    cheapest_parser = subparsers.add_parser("cheapest", help="Top-N cheapest models.")
+    _add_filter_arguments(cheapest_parser)
+    cheapest_parser.add_argument("-n", type=int, default=10)
+
+    stats_parser = subparsers.add_parser("stats", help="Per-brand price statistics.")
+    _add_filter_arguments(stats_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve queries over HTTP.")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    service = CarQueryService.from_file(args.file)
+
+    if args.command == "serve":
+        server = make_server(service, args.host, args.port)
+        host, port = server.server_address[:2]
+        logger.info(
+            "Serving %d models from %s on http://%s:%d",
+            len(service.index.car_df),
+            service.source,
+            host,
+            port,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        sys.exit(0)
+
+    try:
+        filters = dict(brands=args.brand, year_range=args.years, price_range=args.prices)
+        if args.command == "models":
+            _, frame = service.models(
+                service.make_query(
+                    sort=args.sort,
+                    descending=args.desc,
+                    limit=args.limit,
+                    offset=args.offset,
+                    **filters,
+                )
+            )
+        elif args.command == "cheapest":
+            _, frame = service.cheapest(args.n, **filters)
+        else:
+            frame = service.stats(service.make_query(**filters))
+    except QueryError as error:
+        parser.error(str(error))
+    print(format_frame(frame, args.format).rstrip("\n"))
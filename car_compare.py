@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+# Percentiles reported as price bands
+BAND_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Default width of the "similar price" window, as a fraction of the price
+DEFAULT_TOLERANCE = 0.10
+
+
+def percentile_rank(sorted_prices, prices):
+    """
+    Percentile of each price among ``sorted_prices``: the share of prices below
+    it, counting equal prices as half below (so the median model is near 50).
+    """
+    if len(sorted_prices) == 0:
+        return np.full(np.shape(prices), np.nan)
+    below = np.searchsorted(sorted_prices, prices, side="left")
+    not_above = np.searchsorted(sorted_prices, prices, side="right")
+    return (below + not_above) / 2 / len(sorted_prices) * 100
+
+
+class PriceComparator:
+    """
+    Price comparisons across the whole catalogue, built once per dataset.
+
+    Prices are kept sorted (overall, per brand and per model year) with the
+    row position of each, so models within a price window come from two
+    binary searches. Percentiles of every row and the price bands of every
+    brand are computed up front.
+    """
+
+    def __init__(self, car_df):
+        self.car_df = car_df.reset_index(drop=True)
+        prices = self.car_df["Price"].to_numpy(dtype=float)
+        brands = self.car_df["Brand"].astype(str).to_numpy()
+        years = self.car_df["Year"].to_numpy()
+
+        priced = np.flatnonzero(~np.isnan(prices))
+        self.order = priced[np.argsort(prices[priced], kind="stable")]
+        self.sorted_prices = prices[self.order]
+
+        self._brand_prices = self._sorted_by_group(brands, prices, priced)
+        self._year_prices = self._sorted_by_group(years, prices, priced)
+
+        self.percentiles = pd.DataFrame(
+            {
+                "Overall": percentile_rank(self.sorted_prices, prices),
+                "Brand": self._group_percentiles(brands, prices, self._brand_prices),
+                "Year": self._group_percentiles(years, prices, self._year_prices),
+            }
+        )
+        self.percentiles.loc[np.isnan(prices)] = np.nan  # Unpriced rows
+
+        bands = {"All brands": self._bands(self.sorted_prices)}
+        for brand in sorted(self._brand_prices):
+            bands[brand] = self._bands(self._brand_prices[brand])
+        self.bands = pd.DataFrame.from_dict(
+            bands, orient="index", columns=[f"P{p}" for p in BAND_PERCENTILES]
+        )
+        self.bands.index.name = "Brand"
+
+    @staticmethod
+    def _sorted_by_group(keys, prices, priced):
+        """group -> its prices, sorted."""
+        priced_prices = prices[priced]
+        return {
+            group: np.sort(priced_prices[indices])
+            for group, indices in pd.Series(priced_prices)
+            .groupby(keys[priced])
+            .indices.items()
+        }
+
+    @staticmethod
+    def _group_percentiles(keys, prices, sorted_by_group):
+        percentiles = np.full(len(prices), np.nan)
+        for group, positions in pd.Series(keys).groupby(keys).indices.items():
+            if group in sorted_by_group:
+                percentiles[positions] = percentile_rank(
+                    sorted_by_group[group], prices[positions]
+                )
+        return percentiles
+
+    @staticmethod
+    def _bands(sorted_prices):
+        if len(sorted_prices) == 0:
+            return [np.nan] * len(BAND_PERCENTILES)
+        return list(np.percentile(sorted_prices, BAND_PERCENTILES))
+
+    def price_window(self, price, tolerance=DEFAULT_TOLERANCE):
+        """Row positions priced within ``price`` ± ``tolerance``, cheapest first."""
+        start = np.searchsorted(self.sorted_prices, price * (1 - tolerance), "left")
+        stop = np.searchsorted(self.sorted_prices, price * (1 + tolerance), "right")
+        return self.order[start:stop]
+
+    def neighbours(
+        self, position, tolerance=DEFAULT_TOLERANCE, other_brands=False, limit=None
+    ):
+        """
+        Models priced within ± ``tolerance`` of the model at row ``position``,
+        across all brands, closest in price first.
+
+        Args:
+            position (int): Row position of the model to compare against.
+            tolerance (float): Half-width of the window, as a fraction of price.
+            other_brands (bool): Leave out the model's own brand.
+            limit (int, optional): Return at most this many models.
+
+        Returns:
+            pandas.DataFrame: Brand, Year, Model, Price, Difference (USD) and
+            Difference (%) columns, plus the row positions as the index.
+        """
+        row = self.car_df.iloc[position]
+        price = row["Price"]
+        if pd.isna(price):
+            window = np.array([], dtype=int)
+        else:
+            window = self.price_window(price, tolerance)
+        window = window[window != position]
+        if other_brands:
+            window = window[
+                self.car_df["Brand"].to_numpy()[window] != row["Brand"]
+            ]
+
+        differences = self.car_df["Price"].to_numpy()[window] - price
+        closest = np.argsort(np.abs(differences), kind="stable")[:limit]
+        window, differences = window[closest], differences[closest]
+
+        neighbours = self.car_df.iloc[window][["Brand", "Year", "Model", "Price"]].copy()
+        neighbours["Difference (USD)"] = differences
+        neighbours["Difference (%)"] = (differences / price * 100).round(1)
+        return neighbours
@@ -0,0 +1,361 @@
+import json
+import os
+
+from file_utils import hash_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # The columnar artifact is optional; JSON remains the fallback
+    pa = None
+    pq = None
+
+COLUMNAR_FILEPATH = "complete.parquet"
+NDJSON_FILEPATH = "complete.ndjson"  # Streamed alternative to complete.json
+TRIMS_FILEPATH = "trims.ndjson"  # One trim per line, written by model_crawler.py
+
+# Rows per DataFrame chunk when reading complete.ndjson
+NDJSON_BATCH_SIZE = 10000
+
+# Columns of the car DataFrame as extracted, before normalization
+CAR_COLUMNS = ["Brand", "Year", "Model", "Price"]
+NORMALIZED_COLUMNS = CAR_COLUMNS + ["Price Max", "Price Outlier"]
+
+# Keys of complete.json that are not brands
+METADATA_KEYS = ["model", "price", "year"]
+
+# Schema metadata key holding the SHA-256 of the complete.json it was built from
+SOURCE_SHA256_KEY = b"source_sha256"
+
+
+def brand_display_name(brand):
+    """Turns a complete.json key (e.g., "Land_rover") into a label ("Land Rover")."""
+    return brand.replace("_", " ").title()
+
+
+def find_complete_file(candidates=(NDJSON_FILEPATH, "complete.json")):
+    """
+    Returns the most recently written of complete.ndjson and complete.json
+    (main_script.py writes one or the other), or complete.json if neither exists.
+    """
+    existing = [filepath for filepath in candidates if os.path.exists(filepath)]
+    if not existing:
+        return "complete.json"
+    return max(existing, key=os.path.getmtime)
+
+
+def iter_car_rows(company_cars_data):
+    """
+    Yields (Brand, Year, Model, Price) rows from complete.json-shaped data.
+
+    Year and Price are passed through as extracted (numbers, or text the
+    extraction could not convert); ``normalize_car_data`` types them.
+    """
+    for brand, models in company_cars_data.items():
+        # Skip if brand is a metadata field
+        if brand in METADATA_KEYS:
+            continue
+
+        display_brand = brand_display_name(brand)
+        for model_info in models:
+            yield (
+                display_brand,
+                model_info["year"],
+                model_info["model"],
+                model_info["price"],
+            )
+
+
+def normalize_car_data(company_cars_data, **options):
+    """
+    Builds the typed car DataFrame from complete.json-shaped data. ``options``
+    are passed on to ``car_normalize.normalize_car_frame``.
+
+    Returns:
+        NormalizedCars: See ``car_normalize.normalize_car_frame``.
+    """
+    import pandas as pd
+
+    from car_normalize import normalize_car_frame
+
+    raw_df = pd.DataFrame(
+        list(iter_car_rows(company_cars_data)), columns=CAR_COLUMNS, dtype=object
+    )
+    return normalize_car_frame(raw_df, **options)
+
+
+class NdjsonWriter:
+    """
+    Streams complete.json's data as NDJSON, one model per line:
+    {"brand": "Land_rover", "year": 2025, "model": "...", "price": 107900}.
+
+    Lines go to a temporary file that is flushed after every make and renamed
+    over ``filepath`` only when the writer is closed without an error. If the
+    build fails, the previous file is kept, and the temporary file holds
+    everything written up to the failure.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.tmp_filepath = f"{filepath}.tmp"
+        self.rows = 0
+        self._file = open(self.tmp_filepath, "w")
+
+    def write_make(self, brand, models):
+        """Appends the models of one brand (a complete.json key) and flushes."""
+        self._file.write(
+            "".join(
+                json.dumps({"brand": brand, **model_info}) + "\n"
+                for model_info in models
+            )
+        )
+        self._file.flush()
+        self.rows += len(models)
+
+    def commit(self):
+        """Syncs the file to disk and renames it into place."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_filepath, self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.commit()
+        else:
+            self._file.close()
+
+
+def iter_ndjson_batches(filepath, batch_size=NDJSON_BATCH_SIZE):
+    """
+    Reads complete.ndjson in chunks, so only one batch of parsed records is
+    held at a time.
+
+    Yields:
+        NormalizedCars: Up to ``batch_size`` rows, in file order, typed as
+        ``normalize_car_data`` types them. Price outliers are not flagged, as
+        that needs every row of a brand.
+    """
+    import pandas as pd
+
+    from car_normalize import normalize_car_frame
+
+    display_names = {}
+    rows = []
+    with open(filepath, "r") as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            brand = record["brand"]
+            if brand in METADATA_KEYS:
+                continue
+            display_brand = display_names.get(brand)
+            if display_brand is None:
+                display_brand = display_names[brand] = brand_display_name(brand)
+            rows.append((display_brand, record["year"], record["model"], record["price"]))
+            if len(rows) >= batch_size:
+                batch = pd.DataFrame(rows, columns=CAR_COLUMNS, dtype=object)
+                yield normalize_car_frame(batch, outlier_ratio=None)
+                rows = []
+    if rows:
+        batch = pd.DataFrame(rows, columns=CAR_COLUMNS, dtype=object)
+        yield normalize_car_frame(batch, outlier_ratio=None)
+
+
+def read_ndjson_dataset(filepath, batch_size=NDJSON_BATCH_SIZE):
+    """
+    Reads complete.ndjson into a DataFrame, built batch by batch.
+
+    Returns:
+        pandas.DataFrame: The same frame ``read_json_dataset`` returns for the
+        equivalent complete.json.
+    """
+    import pandas as pd
+
+    from car_normalize import flag_price_outliers, normalize_car_frame
+
+    frames = [batch.frame for batch in iter_ndjson_batches(filepath, batch_size)]
+    if not frames:
+        empty = pd.DataFrame(columns=CAR_COLUMNS, dtype=object)
+        return normalize_car_frame(empty).frame
+    car_df = pd.concat(frames, ignore_index=True)
+    car_df["Price Outlier"] = flag_price_outliers(car_df["Brand"], car_df["Price"])
+    return car_df
+
+
+def write_columnar_dataset(car_df, filepath, source_sha256=None):
+    """
+    Writes the typed columnar (Parquet) version of complete.json (or of
+    complete.ndjson; ``source_sha256`` is then that file's hash).
+
+    Args:
+        car_df (pandas.DataFrame): The frame of ``normalize_car_data``.
+        filepath (str): Path of the Parquet file.
+        source_sha256 (str, optional): Hash of the file ``car_df`` was read from.
+
+    Brand is dictionary-encoded with sorted categories (a pandas categorical
+    when read back), and the other columns keep their types. Price and Price
+    Max are float64 rather than integers, as normalization accepts prices with
+    cents ("$44,990.50"). The SHA-256 of the source complete.json is stored in
+    the schema metadata so readers can tell if the two drifted apart.
+
+    Returns:
+        bool: False if pyarrow is not installed and nothing was written.
+    """
+    if pa is None:
+        return False
+
+    import pandas as pd
+
+    # Categories in alphabetical order, so sorting by Brand stays alphabetical
+    categories = sorted(car_df["Brand"].unique())
+    brand_column = pa.DictionaryArray.from_arrays(
+        pa.array(pd.Categorical(car_df["Brand"], categories).codes, pa.int32()),
+        pa.array(categories, pa.string()),
+    )
+
+    table = pa.table(
+        {
+            "Brand": brand_column,
+            "Year": pa.array(car_df["Year"], pa.int64()),
+            "Model": pa.array(car_df["Model"], pa.string()),
+            "Price": pa.array(car_df["Price"], pa.float64()),
+            "Price Max": pa.array(car_df["Price Max"], pa.float64()),
+            "Price Outlier": pa.array(car_df["Price Outlier"], pa.bool_()),
+        }
+    )
+    if source_sha256:
+        table = table.replace_schema_metadata({SOURCE_SHA256_KEY: source_sha256})
+
+    tmp_filepath = f"{filepath}.tmp"
+    pq.write_table(table, tmp_filepath)
+    os.replace(tmp_filepath, filepath)
+    return True
+
+
+def _read_columnar_schema(filepath):
+    """
+    The schema of the columnar dataset, or None if pyarrow is missing, the file
+    is missing or it was written before normalization (and is rebuilt by
+    main_script.py).
+    """
+    if pq is None or not os.path.exists(filepath):
+        return None
+    schema = pq.read_schema(filepath)
+    if not set(NORMALIZED_COLUMNS) <= set(schema.names):
+        return None
+    return schema
+
+
+def columnar_source_sha256(filepath):
+    """
+    The SHA-256 recorded in the columnar dataset for the file it was built
+    from, or None if there is none or the dataset is unusable.
+    """
+    schema = _read_columnar_schema(filepath)
+    recorded = (schema.metadata or {}).get(SOURCE_SHA256_KEY) if schema else None
+    return recorded.decode() if recorded is not None else None
+
+
+def read_columnar_dataset(filepath, source_filepath=None):
+    """
+    Reads the columnar dataset into a DataFrame.
+
+    Args:
+        filepath (str): Path of the Parquet file.
+        source_filepath (str, optional): The complete.json it should match. If
+            given and its hash differs from the one recorded at build time, the
+            artifact is considered stale.
+
+    Returns:
+        pandas.DataFrame: The frame of ``normalize_car_data`` with Brand as a
+        categorical, or None if pyarrow is missing, the file is missing, or it
+        is stale or predates normalization.
+    """
+    schema = _read_columnar_schema(filepath)
+    if schema is None:
+        return None
+
+    if source_filepath is not None:
+        recorded = (schema.metadata or {}).get(SOURCE_SHA256_KEY)
+        if recorded is None or recorded.decode() != hash_file(source_filepath):
+            return None
+
+    return pq.read_table(filepath).to_pandas()
+
+
+def read_json_dataset(filepath):
+    """
+    Reads complete.json into a DataFrame.
+
+    Returns:
+        pandas.DataFrame: The frame of ``normalize_car_data``: Brand, Year,
+        Model, Price (float), Price Max and Price Outlier columns. Rows without
+        a usable year or price are left out.
+    """
+    with open(filepath, "r") as f:
+        car_data_json = json.load(f)
+
+    return normalize_car_data(car_data_json).frame
+
+
+def read_car_dataset(filepath, columnar_path=COLUMNAR_FILEPATH):
+    """
+    Reads the car DataFrame the cheapest way available: the columnar copy if it
+    was built from ``filepath``, else complete.ndjson in batches or complete.json.
+
+    Raises:
+        FileNotFoundError: If ``filepath`` does not exist.
+    """
+    car_df = read_columnar_dataset(columnar_path, source_filepath=filepath)
+    if car_df is None and filepath.endswith(".ndjson"):
+        car_df = read_ndjson_dataset(filepath)  # Built in batches
+    elif car_df is None:
+        car_df = read_json_dataset(filepath)
+    return car_df
+
+
+def read_trims_dataset(filepath=TRIMS_FILEPATH):
+    """
+    Reads trims.ndjson into a DataFrame.
+
+    Years are typed as ``normalize_car_data`` types them; trims without a
+    usable year are left out.
+
+    Returns:
+        pandas.DataFrame: Brand, Year (int64), Model, Trim, Price and Lineup
+        Price columns (prices as float).
+    """
+    import pandas as pd
+
+    from car_normalize import parse_years
+
+    columns = ["Brand", "Year", "Model", "Trim", "Price", "Lineup Price"]
+    rows = []
+    with open(filepath, "r") as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows.append(
+                (
+                    brand_display_name(record["brand"]),
+                    record["year"],
+                    record["model"],
+                    record["trim"],
+                    record["price"],
+                    record["lineup_price"],
+                )
+            )
+    trims_df = pd.DataFrame(rows, columns=columns, dtype=object)
+    years, _ = parse_years(trims_df["Year"])
+    trims_df = trims_df[years.notna()].assign(Year=years.dropna().astype("int64"))
+    trims_df["Price"] = pd.to_numeric(trims_df["Price"], errors="coerce")
+    trims_df["Lineup Price"] = pd.to_numeric(
+        trims_df["Lineup Price"], errors="coerce"
+    )
+    return trims_df.reset_index(drop=True)
@@ -0,0 +1,161 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# A price this many times the brand median (or this many times below it) is
+# flagged as an outlier
+OUTLIER_RATIO = 10.0
+
+# Model years accepted as plausible
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+# The first amount in a price text ("$44,990", "Starting at $44,990 MSRP"),
+# and a second one if the two form a range ("$39,990 - $45,990",
+# "$39,990 to $45,990"); the words around them are ignored
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?"
+_PRICE_PATTERN = (
+    rf"(?P<low>{_AMOUNT})(?:\s*(?:-|–|to)\s*\$?\s*(?P<high>{_AMOUNT}))?"
+)
+# Four digits that are not part of a longer number: "2025", "MY 2025", "MY2025"
+_YEAR_PATTERN = r"(?<!\d)(?P<year>(?:19|20)\d\d)(?!\d)"
+
+NormalizationReport = namedtuple(
+    "NormalizationReport",
+    ["rows", "coerced_years", "coerced_prices", "price_ranges", "quarantined", "outliers"],
+)
+NormalizationReport.__doc__ = """
+What normalization did to a dataset.
+
+Attributes:
+    rows (int): Rows kept.
+    coerced_years (int): Years parsed out of surrounding text ("MY 2025").
+        Numbers given as plain text ("2025") convert directly and are not
+        counted.
+    coerced_prices (int): Prices parsed out of formatted text ("$44,990",
+        ranges included).
+    price_ranges (int): Prices given as a range ("$39,990 - $45,990").
+    quarantined (int): Rows set aside for lacking a usable year or price.
+    outliers (int): Kept rows whose price is flagged as an outlier.
+"""
+
+NormalizedCars = namedtuple("NormalizedCars", ["frame", "quarantine", "report"])
+NormalizedCars.__doc__ = """
+Result of ``normalize_car_frame``.
+
+Attributes:
+    frame (pandas.DataFrame): Brand, Year (int64), Model, Price (float, the low
+        end of a range), Price Max (float) and Price Outlier (bool).
+    quarantine (pandas.DataFrame): The rows that were set aside, as given, with
+        a Reason column ("year" or "price").
+    report (NormalizationReport): Counts of what was coerced and set aside.
+"""
+
+
+def _unparsed_text(raw, parsed):
+    """The values of ``raw`` that ``pd.to_numeric`` could not parse, as text."""
+    return raw[parsed.isna() & raw.notna()].astype(str).str.lower()
+
+
+def parse_years(raw_years):
+    """
+    Parses a column of model years given as numbers or text ("2025", "MY 2025").
+
+    Returns:
+        tuple: (years as float with NaN where unusable, number parsed from text)
+    """
+    years = pd.to_numeric(raw_years, errors="coerce")
+    text = _unparsed_text(raw_years, years)
+    from_text = pd.to_numeric(text.str.extract(_YEAR_PATTERN)["year"], errors="coerce")
+    years = years.astype(float)
+    years.loc[from_text.index] = from_text
+    years = years.where(years.between(MIN_YEAR, MAX_YEAR) & (years % 1 == 0))
+    return years, int(from_text.notna().sum())
+
+
+def parse_prices(raw_prices):
+    """
+    Parses a column of prices given as numbers or text ("$44,990",
+    "$39,990 - $45,990", "MSRP TBD").
+
+    Returns:
+        tuple: (low, high, number parsed from text, number of ranges), where low
+        and high are float with NaN where unusable and equal unless the price
+        was a range.
+    """
+    low = pd.to_numeric(raw_prices, errors="coerce").astype(float)
+    high = low.copy()
+    text = _unparsed_text(raw_prices, low)
+    bounds = text.str.extract(_PRICE_PATTERN).replace(",", "", regex=True).astype(float)
+    low.loc[bounds.index] = bounds["low"]
+    high.loc[bounds.index] = bounds["high"].fillna(bounds["low"])
+
+    # Swapped bounds are reordered; non-positive prices are unusable
+    low, high = np.fmin(low, high), np.fmax(low, high)
+    usable = low > 0
+    return (
+        low.where(usable),
+        high.where(usable),
+        int(bounds["low"].notna().sum()),
+        int(bounds["high"].notna().sum()),
+    )
+
+
+def flag_price_outliers(brands, prices, ratio=OUTLIER_RATIO):
+    """
+    Flags prices at least ``ratio`` times above or below their brand's median.
+
+    Returns:
+        pandas.Series: Boolean flags aligned with ``prices``.
+    """
+    medians = prices.groupby(brands, observed=True, sort=False).transform("median")
+    relative = prices / medians
+    return ((relative >= ratio) | (relative <= 1 / ratio)).fillna(False).astype(bool)
+
+
+def normalize_car_frame(raw_df, outlier_ratio=OUTLIER_RATIO):
+    """
+    Types the Year and Price columns of a car DataFrame, whole columns at a
+    time, sets aside the rows that cannot be typed and flags price outliers.
+
+    Args:
+        raw_df (pandas.DataFrame): Brand, Year, Model and Price columns, with
+            years and prices as numbers or text.
+        outlier_ratio (float): See ``flag_price_outliers``. None leaves every
+            row unflagged, for batches that are flagged once concatenated.
+
+    Returns:
+        NormalizedCars: The typed frame (in the original row order), the
+        quarantined rows and a report.
+    """
+    years, coerced_years = parse_years(raw_df["Year"])
+    low, high, coerced_prices, price_ranges = parse_prices(raw_df["Price"])
+
+    reason = np.select(
+        [years.isna().to_numpy(), low.isna().to_numpy()], ["year", "price"], default=""
+    )
+    kept = reason == ""
+    quarantine = raw_df[~kept].assign(Reason=reason[~kept])
+
+    frame = raw_df.loc[kept, ["Brand", "Model"]]
+    frame.insert(1, "Year", years[kept].astype("int64"))
+    frame["Price"] = low[kept]
+    frame["Price Max"] = high[kept]
+    if outlier_ratio is None:
+        frame["Price Outlier"] = False
+    else:
+        frame["Price Outlier"] = flag_price_outliers(
+            frame["Brand"], frame["Price"], outlier_ratio
+        )
+    frame = frame.reset_index(drop=True)
+
+    report = NormalizationReport(
+        rows=len(frame),
+        coerced_years=coerced_years,
+        coerced_prices=coerced_prices,
+        price_ranges=price_ranges,
+        quarantined=len(quarantine),
+        outliers=int(frame["Price Outlier"].sum()),
+    )
+    return NormalizedCars(frame, quarantine.reset_index(drop=True), report)
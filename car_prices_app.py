@@ -1,12 +1,36 @@
 import streamlit as st
-import json
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
-from dotenv import load_dotenv
 import os
-
-load_dotenv()  # Load environment variables from .env file
+from car_compare import PriceComparator
+from car_dataset import (
+    COLUMNAR_FILEPATH,
+    TRIMS_FILEPATH,
+    find_complete_file,
+    read_car_dataset,
+    read_trims_dataset,
+)
+from car_query import CarIndex
+from car_search import SearchIndex
+from price_history import HISTORY_FILEPATH, connect, list_snapshots, price_trend
+from render_cache import LRUCache
+
+# Plotly is imported inside the chart builders: it is the slowest import of
+# the app and is not needed until there are filtered results to chart
+
+# Number of filter states whose query results, charts and tables are kept
+RENDER_CACHE_SIZE = 64
+
+# Vehicle Models table: rows per page, and the choices offered to the user
+TABLE_PAGE_SIZE = 100
+TABLE_PAGE_SIZE_OPTIONS = [25, 50, 100, 250, 1000]
+
+# Price comparison: cars offered in the picker, and similar-priced models shown
+COMPARE_CANDIDATES = 25
+COMPARE_NEIGHBOURS = 50
+
+# Sort keys of the Vehicle Models table, most significant first
+MODEL_SORT_COLUMNS = ("Price", "Brand", "Year", "Model")
 
 # Page Configuration
 st.set_page_config(page_title="Shop For Cars (2025)", page_icon="🚗", layout="wide")
@@ -14,39 +38,308 @@ st.set_page_config(page_title="Shop For Cars (2025)", page_icon="🚗", layout="
 
 # --- Load and Preprocess Data ---
 @st.cache_data
-def load_car_data(file_path):
+def load_car_data(file_path, columnar_path=COLUMNAR_FILEPATH):
     try:
-        with open(file_path, "r") as f:
-            car_data_json = json.load(f)
+        # Prefer the typed columnar artifact written by main_script.py, as long
+        # as it was built from the current JSON file
+        return read_car_dataset(file_path, columnar_path)
+
+    except FileNotFoundError:
+        st.error(
+            "Error: JSON file not found. Ensure the file is in the current directory."
+        )
+        return None
 
-        car_list = []
-        for brand, models in car_data_json.items():
-            # Skip if brand is a metadata field
-            if brand in ["model", "price", "year"]:
-                continue
 
-            for model_info in models:
-                car_list.append(
-                    {
-                        "Brand": brand.replace("_", " ").title(),
-                        "Year": int(model_info["year"]),
-                        "Model": model_info["model"],
-                        "Price": model_info["price"],
-                    }
-                )
+@st.cache_resource
+def load_car_index(file_path):
+    """Builds the query layer once per dataset and shares it across sessions."""
+    car_df = load_car_data(file_path)
+    if car_df is None:
+        return None
+    return CarIndex(car_df)
 
-        car_df = pd.DataFrame(car_list)
 
-        # Clean price data and convert to numeric
-        car_df["Price"] = car_df["Price"].astype(float)
+@st.cache_resource
+def load_search_index(file_path):
+    """Builds the model search index once per dataset and shares it across sessions."""
+    car_df = load_car_data(file_path)
+    if car_df is None:
+        return None
+    return SearchIndex(car_df)
 
-        return car_df
 
-    except FileNotFoundError:
-        st.error(
-            "Error: JSON file not found. Ensure the file is in the current directory."
+@st.cache_data
+def load_snapshot_dates(history_path, history_mtime):
+    """Dates of the recorded price snapshots (history_mtime keys the cache)."""
+    conn = connect(history_path, readonly=True)
+    try:
+        return sorted({taken_at[:10] for _, taken_at in list_snapshots(conn)})
+    finally:
+        conn.close()
+
+
+@st.cache_data
+def load_price_trend(history_path, history_mtime, brands, date_range, year_range):
+    """Per-brand price statistics per snapshot, for the filtered brands only."""
+    conn = connect(history_path, readonly=True)
+    try:
+        return price_trend(conn, brands, *date_range, year_range=year_range)
+    finally:
+        conn.close()
+
+
+def show_price_trends(brands, year_range, history_path=HISTORY_FILEPATH):
+    st.subheader("Price Trends")
+    if not os.path.exists(history_path):
+        st.info("No price history yet. Each main_script.py build adds a snapshot.")
+        return
+
+    history_mtime = os.path.getmtime(history_path)
+    snapshot_dates = load_snapshot_dates(history_path, history_mtime)
+    if len(snapshot_dates) < 2:
+        st.info("Price trends appear once snapshots from two dates are recorded.")
+        return
+
+    first_date = pd.Timestamp(snapshot_dates[0]).date()
+    last_date = pd.Timestamp(snapshot_dates[-1]).date()
+    date_range = st.date_input(
+        "Snapshot Dates",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date,
+    )
+    if len(date_range) != 2:
+        return  # Second date not picked yet
+
+    trend_df = load_price_trend(
+        history_path,
+        history_mtime,
+        brands,
+        tuple(date.isoformat() for date in date_range),
+        year_range,
+    )
+    if trend_df.empty:
+        st.info("No snapshots in the selected date range.")
+        return
+
+    import plotly.express as px
+
+    fig_trend = px.line(
+        trend_df,
+        x="Snapshot",
+        y="Average Price",
+        color="Brand",
+        markers=True,
+        title="Average Price by Brand Over Time",
+        labels={"Average Price": "Average Price (USD)"},
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    fig_trend.update_layout(yaxis_tickformat="$.0f", title_font_size=16, title_x=0.5)
+    st.plotly_chart(fig_trend, use_container_width=True)
+
+
+@st.cache_data
+def load_trims(trims_path, trims_mtime):
+    """Per-trim prices written by model_crawler.py (trims_mtime keys the cache)."""
+    return read_trims_dataset(trims_path)
+
+
+def show_trim_prices(brands, year_range, trims_path=TRIMS_FILEPATH):
+    """Trim-level prices of the filtered brands, if the model crawler has run."""
+    if not os.path.exists(trims_path):
+        return
+
+    trims_df = load_trims(trims_path, os.path.getmtime(trims_path))
+    trims_df = trims_df[
+        trims_df["Brand"].isin(brands)
+        & trims_df["Year"].between(year_range[0], year_range[1])
+    ]
+    if trims_df.empty:
+        return
+
+    st.subheader("Trim Prices")
+    spread = (
+        trims_df.groupby(["Brand", "Year", "Model"])["Price"]
+        .agg(["count", "min", "max"])
+        .rename(
+            columns={
+                "count": "Trims",
+                "min": "Lowest Trim Price",
+                "max": "Highest Trim Price",
+            }
         )
+        .reset_index()
+        .sort_values(by=["Brand", "Year", "Model"])
+    )
+    spread["Year"] = spread["Year"].astype(str)
+    st.dataframe(spread, use_container_width=True, hide_index=True)
+
+    with st.expander("All trims", expanded=False):
+        trim_display = trims_df[["Brand", "Year", "Model", "Trim", "Price"]].copy()
+        trim_display["Year"] = trim_display["Year"].astype(str)
+        st.dataframe(trim_display, use_container_width=True, hide_index=True)
+
+
+@st.cache_resource
+def load_price_comparator(file_path):
+    """Sorts prices and precomputes percentiles once per dataset."""
+    car_df = load_car_data(file_path)
+    if car_df is None:
         return None
+    return PriceComparator(car_df)
+
+
+def show_price_comparison(comparator, search_index, default_positions):
+    """
+    Compares one car against every brand: models within a price window and the
+    car's price percentiles overall, within its brand and within its model year.
+    """
+    st.subheader("Compare Prices Across Brands")
+    car_df = comparator.car_df
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        compare_text = st.text_input(
+            "Find a car to compare (or pick one from the table above)",
+            placeholder="e.g., tesla model y",
+        )
+    compare_query = " ".join(compare_text.lower().split())
+    if compare_query:
+        candidates = search_index.search(compare_query, limit=COMPARE_CANDIDATES)
+        candidates = candidates.positions
+    else:
+        candidates = default_positions[:COMPARE_CANDIDATES]
+    if len(candidates) == 0:
+        st.info(f'No models match "{compare_text}".')
+        return
+
+    with col1:
+        position = st.selectbox(
+            "Car",
+            [int(position) for position in candidates],
+            format_func=lambda position: (
+                f"{car_df.at[position, 'Year']} {car_df.at[position, 'Model']} "
+                f"(${car_df.at[position, 'Price']:,.0f})"
+            ),
+        )
+    with col2:
+        tolerance = st.slider("Price window (± %)", 1, 50, 10)
+    with col3:
+        other_brands = st.checkbox("Other brands only", value=True)
+
+    car = car_df.iloc[position]
+    percentiles = comparator.percentiles.iloc[position]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Price", f"${car['Price']:,.0f}")
+    col2.metric("Percentile, all brands", f"{percentiles['Overall']:.0f}")
+    col3.metric(f"Percentile, {car['Brand']}", f"{percentiles['Brand']:.0f}")
+    col4.metric(f"Percentile, {car['Year']} models", f"{percentiles['Year']:.0f}")
+
+    window = comparator.price_window(car["Price"], tolerance / 100)
+    neighbours = comparator.neighbours(
+        position, tolerance / 100, other_brands, limit=COMPARE_NEIGHBOURS
+    )
+    st.caption(
+        f"{len(window) - 1:,} other models are priced within ±{tolerance}% "
+        f"(${car['Price'] * (1 - tolerance / 100):,.0f}–"
+        f"${car['Price'] * (1 + tolerance / 100):,.0f}); "
+        f"the {len(neighbours)} closest in price"
+        f"{' from other brands' if other_brands else ''} are shown."
+    )
+    neighbours["Year"] = neighbours["Year"].astype(str)
+    st.dataframe(neighbours, use_container_width=True, hide_index=True)
+
+    st.caption("Price bands (percentiles of model prices)")
+    st.dataframe(
+        comparator.bands.loc[["All brands", str(car["Brand"])]],
+        use_container_width=True,
+    )
+
+
+@st.cache_resource
+def get_render_cache(file_path):
+    """One bounded cache of query results, figures and tables per dataset."""
+    return LRUCache(max_entries=RENDER_CACHE_SIZE)
+
+
+def paginate(positions, default_page_size=TABLE_PAGE_SIZE):
+    """
+    Shows page controls when ``positions`` does not fit on one page and returns
+    the positions of the selected page.
+    """
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox(
+            "Rows per page",
+            TABLE_PAGE_SIZE_OPTIONS,
+            index=TABLE_PAGE_SIZE_OPTIONS.index(default_page_size),
+        )
+    page_count = max(1, -(-len(positions) // page_size))  # Ceiling division
+    with col2:
+        page = st.number_input(
+            "Page", min_value=1, max_value=page_count, value=1, step=1
+        )
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(positions))
+    with col3:
+        st.caption(f"Showing {min(start + 1, stop):,}–{stop:,} of {len(positions):,} models")
+    return positions[start:stop]
+
+
+def search_matches(search_index, search_query, query_result):
+    """Positions of the search matches that pass the filters, best first."""
+    matches = search_index.search(search_query).positions
+    return matches[np.isin(matches, query_result.positions)]
+
+
+def build_price_box_figure(filtered_df):
+    import plotly.express as px
+
+    # Sort the DataFrame by 'Brand' alphabetically before plotting
+    sorted_filtered_df_box = filtered_df.sort_values(by="Brand")
+    fig_box = px.box(
+        sorted_filtered_df_box,
+        x="Brand",
+        y="Price",
+        title="Price Ranges by Brand",
+        labels={"Price": "Price (USD)"},
+        color="Brand",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        category_orders={"Brand": sorted_filtered_df_box["Brand"].unique()},
+    )
+    fig_box.update_layout(xaxis_tickangle=-45, title_font_size=16, title_x=0.5)
+    return fig_box
+
+
+def build_average_price_figure(brand_price_stats):
+    import plotly.express as px
+
+    avg_price_by_brand = brand_price_stats["mean"].sort_values(ascending=False)
+
+    fig_bar = px.bar(
+        x=avg_price_by_brand.index,
+        y=avg_price_by_brand.values,
+        title="Average Prices by Brand",
+        labels={"x": "Automotive Brand", "y": "Average Price (USD)"},
+        color=avg_price_by_brand.index,
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    fig_bar.update_layout(yaxis_tickformat="$.0f", title_font_size=16, title_x=0.5)
+    return fig_bar
+
+
+def build_brand_stats_table(brand_price_stats):
+    brand_stats = brand_price_stats[["count", "min", "max", "mean"]].copy()
+
+    brand_stats.columns = [
+        "Model Count",
+        "Minimum Price",
+        "Maximum Price",
+        "Average Price",
+    ]
+    brand_stats["Average Price"] = brand_stats["Average Price"].round(0)
+    return brand_stats
 
 
 def main():
@@ -54,8 +347,12 @@ def main():
     st.subheader("What's your next car?")
 
     # Load Data
-    car_df = load_car_data("complete.json")
-    if car_df is None:
+    data_file = find_complete_file()
+    car_index = load_car_index(data_file)
+    if car_index is None:
+        return
+    if not car_index.brands:
+        st.warning(f"No usable models in {data_file}.")
         return
 
     # --- Filters ---
@@ -64,7 +361,7 @@ def main():
 
         with col1:
             # Brand Multiselect - Now defaults to all if none selected
-            available_brands = sorted(car_df["Brand"].unique())
+            available_brands = car_index.brands
             selected_brands = st.multiselect(
                 "Filter by Brand (Leave empty to select all)",
                 available_brands,
@@ -77,8 +374,8 @@ def main():
 
         with col2:
             # Year Range Filter
-            min_year = car_df["Year"].min()
-            max_year = car_df["Year"].max()
+            min_year = car_index.min_year
+            max_year = car_index.max_year
             year_range = st.slider(
                 "Filter by Model Year",
                 min_value=min_year,
@@ -88,8 +385,8 @@ def main():
 
         with col3:
             # Price Range Filter
-            min_price = int(car_df["Price"].min())
-            max_price = int(car_df["Price"].max())
+            min_price = int(car_index.min_price)
+            max_price = int(car_index.max_price)
             price_range = st.slider(
                 "Filter by Price Range ($)",
                 min_value=min_price,
@@ -98,14 +395,21 @@ def main():
             )
 
     # --- Data Filtering ---
-    filtered_df = car_df[car_df["Brand"].isin(selected_brands)]
-    filtered_df = filtered_df[
-        (filtered_df["Year"] >= year_range[0]) & (filtered_df["Year"] <= year_range[1])
-    ]
-    filtered_df = filtered_df[
-        (filtered_df["Price"] >= price_range[0])
-        & (filtered_df["Price"] <= price_range[1])
-    ]
+    # Normalized filter state; charts and tables are cached under it, so reruns
+    # that leave the filters alone (e.g., flipping the sort order) reuse them
+    filter_key = (
+        tuple(sorted(selected_brands)),
+        (int(year_range[0]), int(year_range[1])),
+        (int(price_range[0]), int(price_range[1])),
+    )
+    render_cache = get_render_cache(data_file)
+
+    # Indexed lookups per brand and year instead of boolean masks over the frame
+    query_result = render_cache.get_or_build(
+        ("query", filter_key),
+        lambda: car_index.query(selected_brands, year_range, price_range),
+    )
+    filtered_df = query_result.frame
 
     # --- Visualizations ---
     if not filtered_df.empty:
@@ -123,19 +427,38 @@ def main():
         # Determine ascending or descending based on sort selection
         ascending_price = sort_by_price == "Ascending"
 
-        model_display = (
-            filtered_df[["Brand", "Year", "Model", "Price"]]
-            .sort_values(
-                by=["Price", "Brand", "Year", "Model"],
-                ascending=[
-                    ascending_price,
-                    True,
-                    True,
-                    True,
-                ],  # Sort Price based on radio input
-            )
-            .reset_index(drop=True)
+        # Typo-tolerant search by brand, model and year; matches are answered
+        # from the prebuilt index and shown best first
+        search_text = st.text_input(
+            "Search models",
+            placeholder="e.g., rang rovr sport, 2025 civic",
         )
+        search_query = " ".join(search_text.lower().split())
+
+        if search_query:
+            search_index = load_search_index(data_file)
+            sorted_positions = render_cache.get_or_build(
+                ("search", filter_key, search_query),
+                lambda: search_matches(search_index, search_query, query_result),
+            )
+        else:
+            # Sorted once per filter state and sort order; only the visible
+            # page of rows is copied out of the frame
+            sorted_positions = render_cache.get_or_build(
+                ("order", filter_key, ascending_price),
+                lambda: car_index.sorted_positions(
+                    query_result.positions,
+                    by=MODEL_SORT_COLUMNS,
+                    ascending=(ascending_price, True, True, True),
+                ),
+            )
+        if search_query and len(sorted_positions) == 0:
+            st.info(f'No models within the current filters match "{search_text}".')
+        page_positions = paginate(sorted_positions)
+
+        model_display = car_index.car_df.iloc[page_positions][
+            ["Brand", "Year", "Model", "Price"]
+        ].reset_index(drop=True)
 
         # Convert Year to a string for display purposes
         model_display["Year"] = model_display["Year"].astype(str)
@@ -144,60 +467,44 @@ def main():
 
         # Price Distribution Boxplot (Alphabetical Order)
         st.subheader("Price Distribution by Brand")
-        # Sort the DataFrame by 'Brand' alphabetically before plotting
-        sorted_filtered_df_box = filtered_df.sort_values(by="Brand")
-        fig_box = px.box(
-            sorted_filtered_df_box,
-            x="Brand",
-            y="Price",
-            title="Price Ranges by Brand",
-            labels={"Price": "Price (USD)"},
-            color="Brand",
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            category_orders={"Brand": sorted_filtered_df_box["Brand"].unique()},
+        fig_box = render_cache.get_or_build(
+            ("box", filter_key), lambda: build_price_box_figure(filtered_df)
         )
-        fig_box.update_layout(xaxis_tickangle=-45, title_font_size=16, title_x=0.5)
         st.plotly_chart(fig_box, use_container_width=True)
 
         # Average Price Bar Chart
         st.subheader("Average Price by Brand")
-        avg_price_by_brand = (
-            filtered_df.groupby("Brand")["Price"].mean().sort_values(ascending=False)
-        )
-
-        fig_bar = px.bar(
-            x=avg_price_by_brand.index,
-            y=avg_price_by_brand.values,
-            title="Average Prices by Brand",
-            labels={"x": "Automotive Brand", "y": "Average Price (USD)"},
-            color=avg_price_by_brand.index,
-            color_discrete_sequence=px.colors.qualitative.Pastel,
+        fig_bar = render_cache.get_or_build(
+            ("bar", filter_key), lambda: build_average_price_figure(query_result.stats)
         )
-        fig_bar.update_layout(yaxis_tickformat="$.0f", title_font_size=16, title_x=0.5)
         st.plotly_chart(fig_bar, use_container_width=True)
 
         # Brand-wise Price Summary (Maximized)
         st.subheader("Brand Price Analysis")
-        brand_stats = filtered_df.groupby("Brand")["Price"].agg(
-            ["count", "min", "max", "mean"]
+        brand_stats = render_cache.get_or_build(
+            ("stats", filter_key), lambda: build_brand_stats_table(query_result.stats)
         )
 
-        brand_stats.columns = [
-            "Model Count",
-            "Minimum Price",
-            "Maximum Price",
-            "Average Price",
-        ]
-        brand_stats["Average Price"] = brand_stats["Average Price"].round(0)
-
         # Removed the format_currency function and the mapping
         st.dataframe(brand_stats.set_index(brand_stats.index), use_container_width=True)
 
+        show_price_comparison(
+            load_price_comparator(data_file),
+            load_search_index(data_file),
+            page_positions,
+        )
+
     else:
         st.info(
             "No vehicle models match the current filter criteria. Adjust the filters above."
         )
 
+    show_trim_prices(filter_key[0], filter_key[1])
+    show_price_trends(filter_key[0], filter_key[1])
+
+    with st.expander("Render cache statistics", expanded=False):
+        st.json(render_cache.stats())
+
 
 # Run the app
 if __name__ == "__main__":
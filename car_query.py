@@ -0,0 +1,156 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+QueryResult = namedtuple("QueryResult", ["frame", "positions", "stats"])
+QueryResult.__doc__ = """
+Answer to a CarIndex query.
+
+Attributes:
+    frame (pandas.DataFrame): The matching rows, in their original order.
+    positions (numpy.ndarray): Row positions of the matches in the indexed frame.
+    stats (pandas.DataFrame): Per-brand count/min/max/mean of Price, indexed
+        by Brand in alphabetical order (brands without matches are left out).
+"""
+
+
+class _PriceGroup:
+    """The rows of one (brand, year), sorted by price, with running price sums."""
+
+    __slots__ = ("positions", "prices", "cumulative")
+
+    def __init__(self, positions, prices):
+        order = np.argsort(prices, kind="stable")  # NaN prices sort last
+        self.positions = positions[order]
+        self.prices = prices[order]
+        # cumulative[i] is the sum of the first i prices
+        self.cumulative = np.concatenate(([0.0], np.cumsum(self.prices, dtype=float)))
+
+    def price_slice(self, min_price, max_price):
+        """Returns the [start, stop) range of rows priced within the bounds."""
+        start = np.searchsorted(self.prices, min_price, side="left")
+        stop = np.searchsorted(self.prices, max_price, side="right")
+        return start, max(start, stop)
+
+
+class CarIndex:
+    """
+    Query layer over the car DataFrame, built once per dataset.
+
+    Rows are grouped by brand and model year, and each group keeps its prices
+    sorted. A brand/year/price filter becomes a binary search per selected
+    (brand, year) group, and per-brand count/min/max/mean come from the ends
+    of the matched slices and running sums, without a pass over the full frame.
+
+    An empty frame (e.g., every row quarantined) gives an index without
+    brands whose year and price bounds are None.
+    """
+
+    def __init__(self, car_df):
+        self.car_df = car_df.reset_index(drop=True)
+
+        brands = self.car_df["Brand"].astype(str).to_numpy()
+        years = self.car_df["Year"].to_numpy()
+        prices = self.car_df["Price"].to_numpy()
+
+        self.brands = sorted(set(brands))
+        if len(self.car_df):
+            self.min_year = int(years.min())
+            self.max_year = int(years.max())
+            self.min_price = np.nanmin(prices)
+            self.max_price = np.nanmax(prices)
+        else:  # Nothing to bound; every query comes back empty
+            self.min_year = self.max_year = None
+            self.min_price = self.max_price = None
+
+        self._sort_orders = {}  # (by, ascending) -> row positions in sorted order
+
+        # brand -> list of (year, _PriceGroup), years ascending
+        self._groups = {brand: [] for brand in self.brands}
+        group_keys = pd.MultiIndex.from_arrays([brands, years])
+        for (brand, year), positions in (
+            pd.Series(np.arange(len(brands))).groupby(group_keys).indices.items()
+        ):
+            self._groups[brand].append(
+                (int(year), _PriceGroup(positions, prices[positions]))
+            )
+        for groups in self._groups.values():
+            groups.sort(key=lambda item: item[0])
+
+    def query(self, brands, year_range, price_range):
+        """
+        Returns the rows matching a brand set, a year range and a price range.
+
+        Args:
+            brands (iterable): Brands to include.
+            year_range (tuple): Inclusive (min, max) model year.
+            price_range (tuple): Inclusive (min, max) price.
+
+        Returns:
+            QueryResult: The matching rows and per-brand price statistics.
+        """
+        min_year, max_year = year_range
+        min_price, max_price = price_range
+
+        matched = []
+        stats = {}
+        for brand in sorted(set(brands)):
+            count = 0
+            total = 0.0
+            brand_min = brand_max = None
+            for year, group in self._groups.get(brand, ()):
+                if year < min_year or year > max_year:
+                    continue
+                start, stop = group.price_slice(min_price, max_price)
+                if start == stop:
+                    continue
+                matched.append(group.positions[start:stop])
+                count += stop - start
+                total += group.cumulative[stop] - group.cumulative[start]
+                low, high = group.prices[start], group.prices[stop - 1]
+                brand_min = low if brand_min is None else min(brand_min, low)
+                brand_max = high if brand_max is None else max(brand_max, high)
+            if count:
+                stats[brand] = (count, brand_min, brand_max, total / count)
+
+        positions = np.sort(np.concatenate(matched)) if matched else np.array([], int)
+        stats_df = pd.DataFrame.from_dict(
+            stats, orient="index", columns=["count", "min", "max", "mean"]
+        )
+        stats_df.index.name = "Brand"
+        return QueryResult(self.car_df.iloc[positions], positions, stats_df)
+
+    def sort_order(self, by, ascending):
+        """
+        Returns every row position sorted by ``by`` (computed once per key).
+
+        Args:
+            by (tuple): Column names, most significant first.
+            ascending (tuple): Sort direction per column.
+
+        Returns:
+            numpy.ndarray: Row positions, sorted like ``DataFrame.sort_values``
+            (stable, missing values last).
+        """
+        key = (tuple(by), tuple(ascending))
+        order = self._sort_orders.get(key)
+        if order is None:
+            order = self.car_df.sort_values(
+                by=list(by), ascending=list(ascending), kind="stable"
+            ).index.to_numpy()
+            self._sort_orders[key] = order
+        return order
+
+    def sorted_positions(self, positions, by, ascending):
+        """
+        Orders a subset of rows (e.g., ``QueryResult.positions``) without
+        sorting it: the cached full sort order is filtered down to the subset.
+
+        Returns:
+            numpy.ndarray: ``positions`` in the order given by ``by``/``ascending``.
+        """
+        order = self.sort_order(by, ascending)
+        selected = np.zeros(len(self.car_df), dtype=bool)
+        selected[positions] = True
+        return order[selected[order]]
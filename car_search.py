@@ -0,0 +1,180 @@
+import re
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+import numpy as np
+
+_PUNCTUATION = re.compile(r"[^a-z0-9]+")
+_YEAR_TOKEN = re.compile(r"(19|20)\d\d")
+
+# Scores of a query token against an indexed token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9  # The query token starts the indexed token (typing in progress)
+MIN_SIMILARITY = 0.45  # Lowest trigram similarity accepted as a typo match
+
+SearchResult = namedtuple("SearchResult", ["positions", "scores"])
+SearchResult.__doc__ = """
+Rows matching a search, best first.
+
+Attributes:
+    positions (numpy.ndarray): Row positions in the indexed frame.
+    scores (numpy.ndarray): Relevance of each row, from 0 to 1.
+"""
+
+
+def tokenize(text):
+    """
+    Lower-cased words with their punctuation stripped, so "F-150", "F150"
+    and "f150" are the same token ("Ford F-150 XL" -> ford, f150, xl).
+    """
+    tokens = (_PUNCTUATION.sub("", word) for word in text.lower().split())
+    return [token for token in tokens if token]
+
+
+def index_tokens(text):
+    """
+    The tokens of ``text`` plus the parts of words split by punctuation
+    ("Mercedes-AMG GT" -> mercedesamg, mercedes, amg, gt), so a query can
+    name one part of such a word.
+    """
+    tokens = tokenize(text)
+    for word in text.lower().split():
+        parts = [part for part in _PUNCTUATION.split(word) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def trigrams(token):
+    """Character trigrams of a token, padded so short tokens and ends count."""
+    padded = f"$${token}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Typo-tolerant search over the Brand and Model (and Trim, if present)
+    columns of the car DataFrame, built once per dataset.
+
+    Rows sharing the same text (the same model across years, say) are indexed
+    once as a single document. Each distinct token is indexed by its trigrams,
+    so a misspelled query token is matched to the tokens sharing the most
+    trigrams with it rather than by scanning every row. A four-digit year in
+    the query filters on the Year column instead of being matched as text.
+    """
+
+    def __init__(self, car_df, columns=None, min_similarity=MIN_SIMILARITY):
+        if columns is None:
+            columns = [column for column in ("Brand", "Model", "Trim") if column in car_df]
+        self.min_similarity = min_similarity
+        self.years = car_df["Year"].to_numpy() if "Year" in car_df else None
+
+        texts = [" ".join(values) for values in zip(*(car_df[c].astype(str) for c in columns))]
+        doc_ids = {}
+        doc_positions = []
+        for position, text in enumerate(texts):
+            doc_id = doc_ids.get(text)
+            if doc_id is None:
+                doc_id = doc_ids[text] = len(doc_positions)
+                doc_positions.append([])
+            doc_positions[doc_id].append(position)
+        self._doc_positions = [np.array(positions) for positions in doc_positions]
+
+        # token -> documents containing it; trigram -> tokens containing it
+        self._postings = {}
+        for text, doc_id in doc_ids.items():
+            for token in set(index_tokens(text)):
+                self._postings.setdefault(token, []).append(doc_id)
+        self._vocabulary = sorted(self._postings)
+        self._trigram_counts = {}
+        self._trigram_index = {}
+        for token in self._vocabulary:
+            token_trigrams = trigrams(token)
+            self._trigram_counts[token] = len(token_trigrams)
+            for trigram in token_trigrams:
+                self._trigram_index.setdefault(trigram, []).append(token)
+
+    def match_tokens(self, query_token):
+        """
+        Returns {indexed token: score} for the tokens a query token can stand
+        for: itself, tokens it is a prefix of, and tokens similar enough by
+        trigram (Dice) similarity.
+        """
+        matches = {}
+        if query_token in self._postings:
+            matches[query_token] = EXACT_SCORE
+
+        if len(query_token) >= 2:
+            start = bisect_left(self._vocabulary, query_token)
+            for token in self._vocabulary[start:]:
+                if not token.startswith(query_token):
+                    break
+                matches.setdefault(token, PREFIX_SCORE)
+
+        query_trigrams = trigrams(query_token)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._trigram_index.get(trigram, ()))
+        for token, count in shared.items():
+            similarity = 2 * count / (len(query_trigrams) + self._trigram_counts[token])
+            if similarity >= self.min_similarity and similarity > matches.get(token, 0):
+                matches[token] = similarity
+        return matches
+
+    def search(self, query, limit=None):
+        """
+        Finds the rows matching every word of ``query``.
+
+        Args:
+            query (str): Free text such as "rang rovr sport" or "2024 civic".
+            limit (int, optional): Return at most this many rows.
+
+        Returns:
+            SearchResult: Matching rows ordered by relevance (ties keep frame
+            order).
+        """
+        tokens = tokenize(query)
+        years = [int(token) for token in tokens if _YEAR_TOKEN.fullmatch(token)]
+        if self.years is not None:
+            tokens = [token for token in tokens if not _YEAR_TOKEN.fullmatch(token)]
+        if not tokens:
+            if not years:
+                return SearchResult(np.array([], dtype=int), np.array([]))
+            positions = np.flatnonzero(np.isin(self.years, years))[:limit]
+            return SearchResult(positions, np.zeros(len(positions)))
+
+        doc_scores = None  # doc -> summed score, for docs matching every token
+        for token in tokens:
+            token_scores = {}
+            for match, score in self.match_tokens(token).items():
+                for doc_id in self._postings[match]:
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+            if doc_scores is None:
+                doc_scores = token_scores
+            else:
+                doc_scores = {
+                    doc_id: total + token_scores[doc_id]
+                    for doc_id, total in doc_scores.items()
+                    if doc_id in token_scores
+                }
+            if not doc_scores:
+                return SearchResult(np.array([], dtype=int), np.array([]))
+
+        ranked = sorted(doc_scores.items(), key=lambda item: (-item[1], item[0]))
+        positions = []
+        scores = []
+        for doc_id, total in ranked:
+            doc_positions = self._doc_positions[doc_id]
+            if years:
+                doc_positions = doc_positions[np.isin(self.years[doc_positions], years)]
+            positions.append(doc_positions)
+            scores.append(np.full(len(doc_positions), total / len(tokens)))
+            if limit is not None and sum(map(len, positions)) >= limit:
+                break
+
+        positions = np.concatenate(positions) if positions else np.array([], dtype=int)
+        scores = np.concatenate(scores) if scores else np.array([])
+        if limit is not None:
+            positions, scores = positions[:limit], scores[:limit]
+        return SearchResult(positions, scores)
@@ -0,0 +1,22 @@
+import hashlib
+import json
+import os
+
+
+def hash_file(filepath, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as infile:
+        for chunk in iter(lambda: infile.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(filepath, data, indent=4):
+    """Writes JSON to a temporary file, syncs it and renames it into place."""
+    tmp_filepath = f"{filepath}.tmp"
+    with open(tmp_filepath, "w") as outfile:
+        json.dump(data, outfile, indent=indent)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmp_filepath, filepath)
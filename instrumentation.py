@@ -0,0 +1,211 @@
+import contextlib
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import time
+import tracemalloc
+
+from lineup_parser import SKIP_REASONS
+
+logger = logging.getLogger("car_build")
+
+# -q, default, -v
+VERBOSITY_LEVELS = {0: logging.WARNING, 1: logging.INFO, 2: logging.DEBUG}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per event: ts, level, event and the event's fields."""
+
+    def format(self, record):
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """``event key=value ...`` lines for reading in a terminal."""
+
+    def format(self, record):
+        fields = getattr(record, "fields", {})
+        parts = [record.getMessage()]
+        parts.extend(f"{key}={value}" for key, value in fields.items())
+        line = " ".join(parts)
+        if record.levelno >= logging.WARNING:
+            line = f"{record.levelname}: {line}"
+        return line
+
+
+def configure_logging(verbosity=1, json_lines=False, stream=None):
+    """
+    Sends build events to ``stream`` (stderr by default).
+
+    Args:
+        verbosity (int): 0 for warnings only, 1 for progress, 2 to also dump
+            every lineup card.
+        json_lines (bool): Emit JSON lines instead of text.
+        stream (file, optional): Where to write.
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonLinesFormatter() if json_lines else TextFormatter())
+    logger.handlers[:] = [handler]
+    logger.setLevel(VERBOSITY_LEVELS[max(0, min(verbosity, 2))])
+    logger.propagate = False
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Logs a named event with structured fields."""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+class MakeStats:
+    """Timings and counters for extracting one make."""
+
+    __slots__ = (
+        "make",
+        "load_seconds",
+        "parse_seconds",
+        "extract_seconds",
+        "cards",
+        "models",
+        "skipped_cards",
+        "year_errors",
+        "price_errors",
+        "missing_prices",
+    )
+
+    def __init__(self, make):
+        self.make = make
+        self.load_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.extract_seconds = 0.0
+        self.cards = 0
+        self.models = 0
+        self.skipped_cards = dict.fromkeys(SKIP_REASONS, 0)
+        self.year_errors = 0
+        self.price_errors = 0
+        self.missing_prices = 0
+
+    @property
+    def seconds(self):
+        """Total time spent on the make."""
+        return self.load_seconds + self.parse_seconds + self.extract_seconds
+
+    def to_dict(self):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["seconds"] = self.seconds
+        return fields
+
+
+def summarize(make_stats):
+    """
+    Adds up per-make statistics.
+
+    Args:
+        make_stats (iterable): MakeStats of the extracted makes.
+
+    Returns:
+        dict: Make count, summed timings and counters, and the slowest make.
+    """
+    summary = {
+        "makes": 0,
+        "load_seconds": 0.0,
+        "parse_seconds": 0.0,
+        "extract_seconds": 0.0,
+        "cards": 0,
+        "models": 0,
+        "skipped_cards": dict.fromkeys(SKIP_REASONS, 0),
+        "year_errors": 0,
+        "price_errors": 0,
+        "missing_prices": 0,
+        "slowest_make": None,
+    }
+    slowest = None
+    for stats in make_stats:
+        summary["makes"] += 1
+        for name in (
+            "load_seconds",
+            "parse_seconds",
+            "extract_seconds",
+            "cards",
+            "models",
+            "year_errors",
+            "price_errors",
+            "missing_prices",
+        ):
+            summary[name] += getattr(stats, name)
+        for reason, count in stats.skipped_cards.items():
+            summary["skipped_cards"][reason] += count
+        if slowest is None or stats.seconds > slowest.seconds:
+            slowest = stats
+    if slowest is not None:
+        summary["slowest_make"] = slowest.make
+    return summary
+
+
+@contextlib.contextmanager
+def profiling(profile_filepath=None, trace_memory=False, top=10):
+    """
+    Profiles the enclosed block.
+
+    Args:
+        profile_filepath (str, optional): Write cProfile stats here (open with
+            ``python -m pstats`` or snakeviz). The top functions by cumulative
+            time are also logged.
+        trace_memory (bool): Trace allocations with tracemalloc and log the
+            peak and the top allocation sites.
+        top (int): How many functions / allocation sites to log.
+    """
+    profiler = cProfile.Profile() if profile_filepath else None
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_seconds = time.perf_counter() - start
+
+        if profiler is not None:
+            profiler.dump_stats(profile_filepath)
+            stats = pstats.Stats(profiler).sort_stats("cumulative")
+            functions = []
+            for function in stats.fcn_list[:top]:
+                _, _, total_time, cumulative_time, _ = stats.stats[function]
+                filename, line, name = function
+                functions.append(
+                    {
+                        "function": f"{filename}:{line}({name})",
+                        "tottime": round(total_time, 4),
+                        "cumtime": round(cumulative_time, 4),
+                    }
+                )
+            log_event(
+                "profile_written",
+                path=profile_filepath,
+                wall_seconds=round(wall_seconds, 3),
+                top_cumulative=functions,
+            )
+
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            sites = tracemalloc.take_snapshot().statistics("lineno")[:top]
+            tracemalloc.stop()
+            log_event(
+                "memory_trace",
+                current_bytes=current,
+                peak_bytes=peak,
+                top_sites=[
+                    {"site": str(site.traceback), "bytes": site.size}
+                    for site in sites
+                ],
+            )
@@ -0,0 +1,303 @@
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# Class that marks a model card in the cars.com lineup
+LINEUP_CARD_CLASS = "new-car-lineup-model-card"
+
+# Why a lineup card produced no record, as passed to ``on_skip``
+SKIP_REASONS = ("no_model_element", "no_link", "no_name")
+
+# Opening and closing <spark-card> tags (but not <spark-card-carousel> and friends)
+_SPARK_CARD_TAG = re.compile(r"<(/?)spark-card(?=[\s/>])([^>]*)>", re.IGNORECASE)
+_CLASS_ATTR = re.compile(
+    r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+
+
+def _is_lineup_card(tag_attrs):
+    """Returns True if the attribute text of a <spark-card> tag has the lineup class."""
+    match = _CLASS_ATTR.search(tag_attrs)
+    if not match:
+        return False
+    classes = next(group for group in match.groups() if group is not None)
+    return LINEUP_CARD_CLASS in classes.split()
+
+
+def iter_card_fragments(html_content):
+    """
+    Yields the markup of each lineup card in a research page.
+
+    Only the <spark-card> tags are scanned for, so the scripts, styles,
+    navigation and ads around the lineup are skipped without being tokenized.
+
+    Args:
+        html_content (str): The HTML content of the research page.
+
+    Yields:
+        str: The markup of one card, from its opening to its closing tag.
+    """
+    matches = _SPARK_CARD_TAG.finditer(html_content)
+    for match in matches:
+        if match.group(1) or not _is_lineup_card(match.group(2)):
+            continue
+
+        start = match.start()
+        end = len(html_content)  # Unclosed card runs to the end of the page
+        depth = 1
+        for inner in matches:  # Advance the same scanner to the matching close
+            depth += -1 if inner.group(1) else 1
+            if depth == 0:
+                end = inner.end()
+                break
+        yield html_content[start:end]
+
+
+def serialize_lineup(html_content):
+    """
+    Returns just the lineup cards of a research page as one HTML fragment.
+
+    The fragment parses to the same cards as the full page, so it can be stored
+    in place of the page and re-extracted later.
+    """
+    return "\n".join(iter_card_fragments(html_content))
+
+
+class LineupCard:
+    """
+    What was found inside one lineup card.
+
+    Attributes:
+        html (str): The card markup.
+        has_model_element (bool): A div with the make's data-qa prefix was found.
+        has_link (bool): An <a data-card-link> was found inside that div.
+        link (str): That link's href (the model's research page), or None.
+        name (str): Stripped text of the model name div, or None if missing.
+        price (str): Stripped text of the price div, or None if missing.
+    """
+
+    __slots__ = ("html", "has_model_element", "has_link", "link", "name", "price")
+
+    def __init__(self, html):
+        self.html = html
+        self.has_model_element = False
+        self.has_link = False
+        self.link = None
+        self.name = None
+        self.price = None
+
+
+class _CardParser(HTMLParser):
+    """
+    Event-based parser for a single card fragment.
+
+    Mirrors the BeautifulSoup lookups used by the scraper: the first div whose
+    data-qa starts with the make prefix, the first <a data-card-link> inside it,
+    the first name div inside that link, and the first price div in the card.
+    """
+
+    def __init__(self, card, data_qa_prefix):
+        super().__init__(convert_charrefs=True)
+        self.card = card
+        self.data_qa_prefix = data_qa_prefix
+        self._model_depth = 0  # Open divs inside the data-qa div
+        self._in_link = False
+        self._name_depth = 0  # Open divs inside the name div
+        self._price_depth = 0  # Open divs inside the price div
+        self._name_parts = []
+        self._price_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        card = self.card
+        if tag == "a":
+            if self._model_depth and not card.has_link:
+                if any(key == "data-card-link" and not value for key, value in attrs):
+                    card.has_link = True
+                    card.link = dict(attrs).get("href")
+                    self._in_link = True
+            return
+        if tag != "div":
+            return
+
+        if self._model_depth:
+            self._model_depth += 1
+        if self._name_depth:
+            self._name_depth += 1
+        if self._price_depth:
+            self._price_depth += 1
+
+        attributes = dict(attrs)
+        classes = (attributes.get("class") or "").split()
+
+        if card.price is None and not self._price_depth:
+            if "new-car-model-card-price" in classes:
+                self._price_depth = 1
+
+        if not card.has_model_element:
+            data_qa = attributes.get("data-qa")
+            if data_qa and data_qa.startswith(self.data_qa_prefix):
+                card.has_model_element = True
+                self._model_depth = 1
+        elif self._in_link and card.name is None and not self._name_depth:
+            if "new-car-model-card-name" in classes:
+                self._name_depth = 1
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._in_link = False
+            return
+        if tag != "div":
+            return
+
+        if self._model_depth:
+            self._model_depth -= 1
+            if not self._model_depth:
+                self._in_link = False
+        if self._name_depth:
+            self._name_depth -= 1
+            if not self._name_depth:
+                self.card.name = "".join(self._name_parts).strip()
+        if self._price_depth:
+            self._price_depth -= 1
+            if not self._price_depth:
+                self.card.price = "".join(self._price_parts).strip()
+
+    def handle_data(self, data):
+        if self._name_depth:
+            self._name_parts.append(data)
+        if self._price_depth:
+            self._price_parts.append(data)
+
+    def close(self):
+        super().close()
+        # Elements left open at the end of the fragment still count as found
+        if self._name_depth:
+            self.card.name = "".join(self._name_parts).strip()
+        if self._price_depth:
+            self.card.price = "".join(self._price_parts).strip()
+
+
+def iter_lineup_cards(html_content, data_qa_prefix):
+    """
+    Parses the lineup cards of a research page without building a document tree.
+
+    Args:
+        html_content (str): The HTML content of the research page.
+        data_qa_prefix (str): Prefix of the model div's data-qa attribute
+            (e.g., "land_rover-").
+
+    Yields:
+        LineupCard: One result per lineup card, in page order.
+    """
+    for fragment in iter_card_fragments(html_content):
+        card = LineupCard(fragment)
+        parser = _CardParser(card, data_qa_prefix)
+        parser.feed(fragment)
+        parser.close()
+        yield card
+
+
+LineupRecord = namedtuple("LineupRecord", ["year", "model", "price"])
+LineupRecord.__doc__ = """
+One model extracted from a lineup card.
+
+Attributes:
+    year (int): Model year, or the original text if it is not a number.
+    model (str): Model name without the year.
+    price (int): Starting price in dollars, None if the card shows no price, or
+        the original text if it is not a number.
+"""
+
+
+def parse_price(text):
+    """Turns "$44,990" into 44990; text that is not a number is returned as is."""
+    try:
+        return int(text.replace("$", "").replace(",", ""))
+    except ValueError:
+        return text
+
+
+def data_qa_prefix(make):
+    """Returns the data-qa prefix of a make's model divs (e.g., "land_rover-")."""
+    return f"{make.lower().replace(' ', '_')}-"
+
+
+class LineupExtractor:
+    """
+    Extracts typed model records from the lineup of one make's research page.
+
+    The make's data-qa prefix is computed once, so one extractor serves any
+    number of pages of that make. Pages may be given as str or as UTF-8 bytes.
+    """
+
+    __slots__ = ("make", "data_qa_prefix")
+
+    _cache = {}
+
+    def __init__(self, make):
+        self.make = make
+        self.data_qa_prefix = data_qa_prefix(make)
+
+    @classmethod
+    def for_make(cls, make):
+        """Returns a shared extractor for ``make``."""
+        extractor = cls._cache.get(make)
+        if extractor is None:
+            extractor = cls._cache[make] = cls(make)
+        return extractor
+
+    def iter_cards(self, html_content):
+        """Yields a LineupCard per lineup card of the page."""
+        if isinstance(html_content, (bytes, bytearray, memoryview)):
+            html_content = bytes(html_content).decode("utf-8")
+        return iter_lineup_cards(html_content, self.data_qa_prefix)
+
+    def iter_card_records(self, cards, on_skip=None):
+        """
+        Turns parsed cards into records.
+
+        Args:
+            cards (iterable): LineupCard objects, e.g., from ``iter_cards``.
+            on_skip (callable, optional): Called as ``on_skip(card, reason)``
+                for each card without a model, reason being one of SKIP_REASONS.
+
+        Yields:
+            LineupRecord: One per card with a model name, in page order.
+        """
+        for card in cards:
+            if not card.has_model_element:
+                reason = "no_model_element"
+            elif not card.has_link:
+                reason = "no_link"
+            elif card.name is None:
+                reason = "no_name"
+            else:
+                yield self.record(card.name, card.price)
+                continue
+            if on_skip is not None:
+                on_skip(card, reason)
+
+    def iter_records(self, html_content, on_skip=None):
+        """Yields a LineupRecord per model on the page (see ``iter_card_records``)."""
+        return self.iter_card_records(self.iter_cards(html_content), on_skip)
+
+    @staticmethod
+    def record(name, price):
+        """
+        Builds a record from the text of a card's name and price divs.
+
+        The name is split at its first space into year ("YYYY") and model; the
+        price has "$" and "," removed. Values that are not numbers are kept as
+        text.
+        """
+        parts = name.split(" ", 1)  # Split at the first space
+        year = parts[0]
+        model = parts[1] if len(parts) > 1 else name  # Full name if no space
+        try:
+            year = int(year)
+        except ValueError:
+            pass
+
+        if price is not None:
+            price = parse_price(price)
+        return LineupRecord(year, model, price)
@@ -1,8 +1,37 @@
 import os
-from pprint import pprint
-from bs4 import BeautifulSoup
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import logging
 import json  # Import json to load existing data
 from dotenv import load_dotenv
+from car_dataset import (
+    COLUMNAR_FILEPATH,
+    NDJSON_FILEPATH,
+    NdjsonWriter,
+    columnar_source_sha256,
+    normalize_car_data,
+    write_columnar_dataset,
+)
+from file_utils import hash_file, write_json_atomic
+from instrumentation import (
+    MakeStats,
+    configure_logging,
+    log_event,
+    logger,
+    profiling,
+    summarize,
+)
+from lineup_parser import LineupExtractor
+from page_store import find_raw_page, list_stored_makes, load_raw_page
+from price_history import (
+    HISTORY_FILEPATH,
+    connect,
+    describe_models,
+    duplicate_models,
+    record_snapshot,
+    snapshot_sha256,
+)
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -13,178 +42,510 @@ PASSWORD = os.environ.get("PASSWORD")
 # Base URL for cars.com research - you can change the make here
 BASE_URL = "https://www.cars.com/research/"
 
-data_dir = "data"
-os.makedirs(data_dir, exist_ok=True)
-
-# Dynamically determine MAKES from files in the data directory
-MAKES = []
-for filename in os.listdir(data_dir):
-    if filename.endswith(".json"):
-        make = filename[:-5]  # Remove ".json" extension
-        MAKES.append(make)
-
-company_cars_data = {}  # Initialize a dictionary to store data, keyed by company
-
-if USERNAME and PASSWORD:  # Check if USERNAME and PASSWORD are loaded
-    for make in MAKES:
-        filename = f"{make}.json"
-        filepath = os.path.join(data_dir, filename)
-
-        if os.path.exists(filepath):
-            print(
-                f"Data file for {make.capitalize()} exists: {filepath}"
-            )  # Adjusted print statement
-            # Load existing data from JSON file
-            with open(filepath, "r") as infile:
-                make_data = json.load(infile)  # More generic variable name
-                # Assuming your make.json has the structure from your example,
-                # extract the HTML content from the 'results' -> 'content'
-                if (
-                    "results" and make_data["results"]
-                ):  # Check if 'results' key exists and is not empty
-                    html_content = make_data["results"][0]["content"]
-
-                    soup = BeautifulSoup(html_content, "html.parser")
-                    models_data = (
-                        []
-                    )  # Not really needed anymore, but keeping for now, we will directly add to company_cars_data
-                    model_list_items = soup.find_all(
-                        "spark-card", class_="new-car-lineup-model-card"
-                    )
-
-                    for item in model_list_items:
-                        model_name_element = item.find(
-                            "div", {"data-qa": lambda x: x and x.startswith(f"{make}-")}
-                        )
-                        if model_name_element:
-                            # Debugging: Print the model_name_element to inspect its content
-                            print("\n--- model_name_element content ---")
-                            print(model_name_element)
-
-                            link_element = model_name_element.find(
-                                "a", {"data-card-link": ""}
-                            )  # refined selector
-
-                            if (
-                                link_element
-                            ):  # Check if link_element is found before proceeding
-                                model_name_div = link_element.find(
-                                    "div", class_="new-car-model-card-name"
-                                )  # find the div inside 'a'
-                                if model_name_div:  # Check if model_name_div is found
-                                    model_year_model_name = (
-                                        model_name_div.text.strip()
-                                    )  # extract text from the div
-
-                                    # Splitting to get Year and Model Name (assuming format "YYYY Make Model")
-                                    parts = model_year_model_name.split(
-                                        " ", 1
-                                    )  # Split at the first space
-                                    model_year_str = (  # Renamed to model_year_str
-                                        parts[0] if parts else "Year N/A"
-                                    )  # Year is the first part
-                                    model_name = (
-                                        parts[1]
-                                        if len(parts) > 1
-                                        else model_year_model_name
-                                    )  # Model is the rest, or full name if no space
-
-                                    price_element = item.find(
-                                        "div", class_="new-car-model-card-price"
-                                    )
-                                    price_str = (  # Renamed to price_str
-                                        price_element.text.strip()
-                                        if price_element
-                                        else "Price not found"
-                                    )
-
-                                    car_data = {
-                                        "year": model_year_str,  # Initially string
-                                        "model": model_name,
-                                        "price": price_str,  # Initially string
-                                    }  # Car data dict
-
-                                    # Convert year to integer
-                                    try:
-                                        car_data["year"] = int(car_data["year"])
-                                    except ValueError:
-                                        print(
-                                            f"Warning: Could not convert year '{car_data['year']}' to integer for model '{model_name}'. Keeping as string."
-                                        )
-                                        # If conversion fails, it remains as string
-
-                                    # Convert price to integer, removing '$' and ','
-                                    if car_data["price"] != "Price not found":
-                                        price_value = (
-                                            car_data["price"]
-                                            .replace("$", "")
-                                            .replace(",", "")
-                                        )
-                                        try:
-                                            car_data["price"] = int(price_value)
-                                        except ValueError:
-                                            print(
-                                                f"Warning: Could not convert price '{car_data['price']}' to integer for model '{model_name}'. Keeping as string."
-                                            )
-                                            # If conversion fails, it remains as string
-                                    else:
-                                        car_data["price"] = (
-                                            None  # Or keep "Price not found" as string, or 0, depending on desired behavior
-                                        )
-
-                                    company_name = (
-                                        make.capitalize()
-                                    )  # Company name for key
-                                    if (
-                                        company_name not in company_cars_data
-                                    ):  # Initialize list if company key doesn't exist
-                                        company_cars_data[company_name] = []
-                                    company_cars_data[company_name].append(
-                                        car_data
-                                    )  # Append car data to company's list
-
-                                else:
-                                    print(
-                                        "Warning: 'div' tag with class 'new-car-model-card-name' not found inside 'a' tag."
-                                    )
-                                    continue  # Skip to the next model if inner div is missing
-
-                            else:
-                                print(
-                                    "Warning: 'a' tag with data-card-link not found in model_name_element."
-                                )
-                                continue  # Skip to the next model if <a> tag is missing
-
-                    # Output the extracted data to console for each make (still printing models_data, but it's not used for final output)
-                    print(f"\nExtracted data for {make.capitalize()} from JSON:")
-                    pprint(
-                        company_cars_data.get(make.capitalize(), [])
-                    )  # Print from company_cars_data directly
-
-                else:
-                    print(
-                        f"Warning: 'results' key not found or empty in {filename}. Skipping file content extraction."
-                    )
+DATA_DIR = "data"
+COMPLETE_FILEPATH = "complete.json"  # Saved in the root directory
 
+# Per-make content hashes and extracted cars from the last build, one manifest
+# per output format so each output is brought up to date by its own builds
+MANIFEST_FILEPATH = "build_manifest.json"
+MANIFEST_FILEPATHS = {"json": MANIFEST_FILEPATH, "ndjson": "build_manifest_ndjson.json"}
+MANIFEST_VERSION = 2  # Bump when extraction changes so old manifests are ignored
+
+# Warnings for lineup cards that hold no model (cards without the make's
+# data-qa div are other makes' or promos and are skipped silently)
+SKIP_WARNINGS = {
+    "no_link": "'a' tag with data-card-link not found in model_name_element",
+    "no_name": "'div' tag with class 'new-car-model-card-name' not found inside 'a' tag",
+}
+
+
+def discover_makes(data_dir):
+    """Dynamically determine MAKES from the raw pages (.page or .json) in the data directory."""
+    return list_stored_makes(data_dir)
+
+
+def extract_make(make, data_dir, debug=True):
+    """
+    Loads the raw page saved for a make and extracts its lineup.
+
+    Args:
+        make (str): The make, as named by its file in ``data_dir`` (e.g., "land_rover").
+        data_dir (str): Directory holding the raw pages.
+        debug (bool): Dump every lineup card as a debug event when logging at
+            verbosity 2.
+
+    Returns:
+        tuple: (list of car data dicts, MakeStats with the load, parse and
+        extract timings and the skip/conversion counters).
+    """
+    stats = MakeStats(make)
+    cars = []
+
+    start = time.perf_counter()
+    filepath = find_raw_page(data_dir, make)
+    if filepath is None:
+        stats.load_seconds = time.perf_counter() - start
+        log_event(
+            "raw_page_missing",
+            logging.WARNING,
+            make=make,
+            hint=f"Make sure {make}.page or {make}.json is in the data directory.",
+        )
+        return cars, stats
+
+    log_event("raw_page_found", logging.DEBUG, make=make, path=filepath)
+    # Load the HTML from the compact .page file or the legacy {"results": [{"content": ...}]} dump
+    html_content = load_raw_page(filepath)
+    stats.load_seconds = time.perf_counter() - start
+    if html_content is None:
+        log_event(
+            "raw_page_empty",
+            logging.WARNING,
+            make=make,
+            path=filepath,
+            hint="'results' key not found or empty; skipping content extraction.",
+        )
+        return cars, stats
+
+    extractor = LineupExtractor.for_make(make)
+    start = time.perf_counter()
+    cards = list(extractor.iter_cards(html_content))
+    stats.parse_seconds = time.perf_counter() - start
+    stats.cards = len(cards)
+
+    if debug and logger.isEnabledFor(logging.DEBUG):
+        # Debugging: the markup of every lineup card
+        for card in cards:
+            if card.has_model_element:
+                log_event("lineup_card", logging.DEBUG, make=make, html=card.html)
+
+    def skipped(card, reason):
+        stats.skipped_cards[reason] += 1
+        if reason in SKIP_WARNINGS:
+            log_event(
+                "card_skipped", logging.WARNING, make=make, reason=SKIP_WARNINGS[reason]
+            )
+
+    start = time.perf_counter()
+    for record in extractor.iter_card_records(cards, skipped):
+        # Year and price are ints unless the card text was not a number
+        if isinstance(record.year, str):
+            stats.year_errors += 1
+            log_event(
+                "year_conversion_failed",
+                logging.WARNING,
+                make=make,
+                model=record.model,
+                value=record.year,
+            )
+        if record.price is None:
+            stats.missing_prices += 1
+        elif isinstance(record.price, str):
+            stats.price_errors += 1
+            log_event(
+                "price_conversion_failed",
+                logging.WARNING,
+                make=make,
+                model=record.model,
+                value=record.price,
+            )
+
+        cars.append(record._asdict())
+
+    stats.models = len(cars)
+    stats.extract_seconds = time.perf_counter() - start
+    return cars, stats
+
+
+def _extract_make_quietly(make, data_dir):
+    """Process pool entry point: extract_make without the per-card debug dumps."""
+    return extract_make(make, data_dir, debug=False)
+
+
+def extract_makes(makes, data_dir, workers=1):
+    """
+    Extracts several makes, in a process pool when ``workers`` > 1. Workers
+    skip the per-card debug dumps so their output does not interleave.
+
+    Yields:
+        tuple: (make, list of car data dicts, MakeStats), in the order of
+        ``makes`` whichever worker finishes first.
+    """
+    if workers > 1 and len(makes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _extract_make_quietly, makes, [data_dir] * len(makes)
+            )
+            for make, (cars, stats) in zip(makes, results):
+                yield make, cars, stats
+        return
+
+    for make in makes:
+        cars, stats = extract_make(make, data_dir)
+        yield make, cars, stats
+
+
+def log_make_extracted(make, cars, stats):
+    """Logs the timings and counters of an extracted make (its cars at debug level)."""
+    log_event("make_extracted", **stats.to_dict())
+    log_event("make_cars", logging.DEBUG, make=make, cars=cars)
+
+
+def merge_company_cars_data(makes, cars_by_make):
+    """
+    Merges per-make car lists into company_cars_data, keyed by company.
+
+    Keys follow the order of ``makes``; makes without any models get no key.
+    """
+    company_cars_data = {}  # Initialize a dictionary to store data, keyed by company
+    for make in makes:
+        cars = cars_by_make.get(make)
+        if cars:
+            company_name = make.capitalize()  # Company name for key
+            company_cars_data.setdefault(company_name, []).extend(cars)
+    return company_cars_data
+
+
+def build_company_cars_data(makes, data_dir, workers=1):
+    """
+    Extracts every make and merges the results, keyed by company.
+
+    With ``workers`` > 1 the makes are fanned out to a process pool. Results are
+    merged in the order of ``makes``, so the output is identical to a serial build.
+
+    Args:
+        makes (list): Makes to extract, as named by their files in ``data_dir``.
+        data_dir (str): Directory holding the raw pages.
+        workers (int): Number of worker processes (1 builds in this process).
+
+    Returns:
+        tuple: (company_cars_data dict, dict of make -> MakeStats).
+    """
+    cars_by_make = {}
+    make_stats = {}
+    for make, cars, stats in extract_makes(makes, data_dir, workers):
+        cars_by_make[make] = cars
+        make_stats[make] = stats
+        log_make_extracted(make, cars, stats)
+
+    return merge_company_cars_data(makes, cars_by_make), make_stats
+
+
+def load_manifest(manifest_filepath):
+    """
+    Loads the build manifest, or an empty one if it is missing, unreadable or
+    was written by a different extractor version.
+    """
+    try:
+        with open(manifest_filepath, "r") as infile:
+            manifest = json.load(infile)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "makes": {}}
+    return manifest
+
+
+def build_incremental(
+    makes,
+    data_dir,
+    manifest_filepath=MANIFEST_FILEPATH,
+    workers=1,
+    full=False,
+    on_make=None,
+):
+    """
+    Rebuilds company_cars_data, re-parsing only makes whose raw page changed.
+
+    The manifest keeps the size, mtime and SHA-256 of every raw page together
+    with the cars extracted from it. A page whose size and mtime match is
+    trusted without reading it; otherwise its hash decides. A manifest saved
+    for another data directory is ignored. Only the changed
+    makes are extracted, then everything is merged in the order of ``makes``,
+    so the result is identical to a full build.
+
+    Args:
+        makes (list): Makes to build, as named by their files in ``data_dir``.
+        data_dir (str): Directory holding the raw pages.
+        manifest_filepath (str): Where the manifest is kept.
+        workers (int): Number of worker processes for the changed makes.
+        full (bool): Ignore the manifest and re-parse every make.
+        on_make (callable, optional): Called as ``on_make(company_name, cars)``
+            for every make with models, in the order of ``makes``, as soon as
+            that make and all before it are done, for streaming the output.
+
+    Returns:
+        tuple: (company_cars_data dict, dict of make -> MakeStats for the
+        re-parsed makes, list of the re-parsed and removed makes, the updated
+        manifest).
+        The manifest is not written; see ``save_manifest``. Its
+        "output_sha256" still holds the hash of the output the previous
+        manifest was saved with.
+    """
+    manifest = load_manifest(manifest_filepath)
+    same_data_dir = manifest.get("data_dir") == os.path.abspath(data_dir)
+    entries = manifest["makes"] if same_data_dir and not full else {}
+
+    changed = {}  # make -> file state of the pages that need parsing
+    for make in makes:
+        filepath = find_raw_page(data_dir, make)
+        if filepath is None:
+            changed[make] = None
+            continue
+
+        stat = os.stat(filepath)
+        entry = entries.get(make)
+        if (
+            entry
+            and entry["filename"] == os.path.basename(filepath)
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            continue  # Untouched since the last build
+
+        state = {
+            "filename": os.path.basename(filepath),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        state["sha256"] = hash_file(filepath)
+        if entry and entry["sha256"] == state["sha256"]:
+            entry.update(state)  # Touched but identical content
+            continue
+        changed[make] = state
+
+    # Makes whose raw page was removed since the last build are dropped from
+    # the manifest (and so from the output) without being extracted
+    removed_makes = [make for make in entries if make not in makes]
+    if removed_makes:
+        log_event("makes_removed", makes=removed_makes)
+
+    make_stats = {}
+    changed_makes = list(changed)
+    new_entries = {make: entries[make] for make in makes if make in entries}
+
+    pending = set(changed_makes)
+    emitted = 0  # makes[:emitted] have been passed to on_make
+
+    def emit_ready():
+        nonlocal emitted
+        while emitted < len(makes) and makes[emitted] not in pending:
+            entry = new_entries.get(makes[emitted])
+            if entry and entry["cars"]:
+                on_make(makes[emitted].capitalize(), entry["cars"])
+            emitted += 1
+
+    if on_make is not None:
+        emit_ready()  # Unchanged makes ahead of the first changed one
+    for make, cars, stats in extract_makes(changed_makes, data_dir, workers):
+        make_stats[make] = stats
+        log_make_extracted(make, cars, stats)
+
+        if changed[make] is None:
+            new_entries.pop(make, None)  # Listed but its page is missing
+        else:
+            new_entries[make] = dict(changed[make], cars=cars)
+        pending.discard(make)
+        if on_make is not None:
+            emit_ready()
+
+    cars_by_make = {make: entry["cars"] for make, entry in new_entries.items()}
+    manifest = dict(manifest, data_dir=os.path.abspath(data_dir), makes=new_entries)
+    return (
+        merge_company_cars_data(makes, cars_by_make),
+        make_stats,
+        changed_makes + removed_makes,
+        manifest,
+    )
+
+
+def save_manifest(manifest_filepath, manifest, output_sha256):
+    """
+    Writes the manifest returned by ``build_incremental`` with the SHA-256 of
+    the output built from it. Call it only once that output is in place, so a
+    build that dies in between leaves the old manifest and its changed makes
+    are re-parsed next time.
+    """
+    write_json_atomic(
+        manifest_filepath, dict(manifest, output_sha256=output_sha256), indent=None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build complete.json from data/.")
+    parser.add_argument(
+        "--data-dir", default=DATA_DIR, help="Directory holding the raw pages."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing (1 = serial, 0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-parse every make instead of only those whose raw page changed.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["json", "ndjson"],
+        default="json",
+        help=f"Write {COMPLETE_FILEPATH}, or stream one model per line to "
+        f"{NDJSON_FILEPATH} as each make is extracted.",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=1,
+        help="More output; -v also dumps every lineup card and extracted car.",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Only report problems."
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="Progress as text or as JSON lines.",
+    )
+    parser.add_argument(
+        "--profile", metavar="PATH", help="Profile the build with cProfile into PATH."
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Trace allocations with tracemalloc and report the peak.",
+    )
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    configure_logging(
+        0 if args.quiet else args.verbose, json_lines=args.log_format == "json"
+    )
+
+    if not (USERNAME and PASSWORD):  # Check if USERNAME and PASSWORD are loaded
+        log_event(
+            "credentials_missing",
+            logging.ERROR,
+            hint="USERNAME and PASSWORD environment variables not set. "
+            "Make sure you have a .env file with USERNAME and PASSWORD defined.",
+        )
+        return
+
+    with profiling(args.profile, args.trace_memory):
+        build(workers, args.full, args.output_format, args.data_dir)
+
+
+def build(workers=1, full=False, output_format="json", data_dir=DATA_DIR):
+    """
+    Builds complete.json (or complete.ndjson), its columnar copy and a price
+    snapshot from the raw pages in ``data_dir``.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    makes = discover_makes(data_dir)
+    manifest_filepath = MANIFEST_FILEPATHS[output_format]
+    log_event("build_started", makes=len(makes), workers=workers, full=full)
+
+    start = time.perf_counter()
+    if output_format == "ndjson":
+        output_filepath = NDJSON_FILEPATH
+        # Each make is flushed as soon as it is extracted; the file only
+        # replaces the previous one once the whole build has succeeded
+        with NdjsonWriter(NDJSON_FILEPATH) as writer:
+            company_cars_data, make_stats, changed_makes, manifest = build_incremental(
+                makes,
+                data_dir,
+                manifest_filepath,
+                workers=workers,
+                full=full,
+                on_make=writer.write_make,
+            )
+        wall_seconds = time.perf_counter() - start
+        log_event("complete_written", path=NDJSON_FILEPATH, models=writer.rows)
+    else:
+        output_filepath = COMPLETE_FILEPATH
+        company_cars_data, make_stats, changed_makes, manifest = build_incremental(
+            makes, data_dir, manifest_filepath, workers=workers, full=full
+        )
+        wall_seconds = time.perf_counter() - start
+
+        # Rewritten unless no make changed and the file on disk is the one the
+        # manifest was saved with (not, e.g., restored or edited since)
+        if (
+            not changed_makes
+            and os.path.exists(COMPLETE_FILEPATH)
+            and hash_file(COMPLETE_FILEPATH) == manifest.get("output_sha256")
+        ):
+            log_event("complete_up_to_date", path=COMPLETE_FILEPATH)
+        else:
+            # After processing all makes, save company_cars_data to complete.json in the root directory
+            write_json_atomic(
+                COMPLETE_FILEPATH, company_cars_data
+            )  # Save company_cars_data to JSON
+            log_event(
+                "complete_written",
+                path=COMPLETE_FILEPATH,
+                reparsed=len(make_stats),
+                makes=len(makes),
+            )
+    # Only now that the output is in place are the re-parsed makes up to date
+    output_sha256 = hash_file(output_filepath)
+    save_manifest(manifest_filepath, manifest, output_sha256)
+
+    # Years and prices typed a column at a time; rows that cannot be typed are
+    # set aside and price outliers flagged, for the columnar copy and history
+    normalized = normalize_car_data(company_cars_data)
+    log_event("normalized", **normalized.report._asdict())
+    if normalized.report.quarantined:
+        log_event(
+            "rows_quarantined",
+            logging.WARNING,
+            **normalized.quarantine["Reason"].value_counts().to_dict(),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            for row in normalized.quarantine.itertuples(index=False):
+                log_event("row_quarantined", logging.DEBUG, **row._asdict())
+
+    if columnar_source_sha256(COLUMNAR_FILEPATH) != output_sha256:
+        # Typed columnar copy for the app, so it can skip the JSON-to-DataFrame step
+        if write_columnar_dataset(normalized.frame, COLUMNAR_FILEPATH, output_sha256):
+            log_event("columnar_written", path=COLUMNAR_FILEPATH)
         else:
-            print(
-                f"Data file for {make.capitalize()} does not exist.  Make sure {filename} is in the data directory."  # Adjusted print statement
+            log_event(
+                "columnar_skipped",
+                logging.WARNING,
+                path=COLUMNAR_FILEPATH,
+                reason="pyarrow is not installed",
             )
 
-    # After processing all makes, save company_cars_data to complete.json in the root directory
-    complete_filepath = "complete.json"  # Changed to save in root directory
-    with open(complete_filepath, "w") as outfile:
-        json.dump(
-            company_cars_data, outfile, indent=4
-        )  # Save company_cars_data to JSON
-
-    print(
-        f"\nAll car data from all makes saved to: {complete_filepath}"
-    )  # Adjusted print statement
-    print("\nProcess complete.")
-
-else:
-    print(
-        "Error: USERNAME and PASSWORD environment variables not set. "
-        "Make sure you have a .env file with USERNAME and PASSWORD defined."
+    # Dated snapshot for trend queries; skipped if the prices are the same as in
+    # the latest one, whichever output format either was built with. It holds
+    # one price per model, so repeated models keep their first row
+    snapshot_df = normalized.frame
+    duplicates = duplicate_models(snapshot_df)
+    if len(duplicates):
+        log_event(
+            "duplicate_models",
+            logging.WARNING,
+            rows=len(duplicates),
+            models=describe_models(duplicates),
+        )
+        snapshot_df = snapshot_df.drop(duplicates.index)
+    history = connect(HISTORY_FILEPATH)
+    snapshot_id = record_snapshot(history, snapshot_df, snapshot_sha256(snapshot_df))
+    history.close()
+    if snapshot_id is not None:
+        log_event("snapshot_recorded", path=HISTORY_FILEPATH, snapshot_id=snapshot_id)
+
+    log_event(
+        "build_summary",
+        wall_seconds=round(wall_seconds, 3),
+        workers=workers,
+        **summarize(make_stats.values()),
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from html.parser import HTMLParser
+from pprint import pprint
+from dotenv import load_dotenv
+
+from car_dataset import TRIMS_FILEPATH, NdjsonWriter
+from file_utils import write_json_atomic
+from lineup_parser import LineupExtractor, parse_price
+from page_store import MODEL_PAGE_DIR, find_raw_page, list_stored_makes, load_raw_page
+from scraper_module import (
+    OXYLABS_ENDPOINT,
+    create_session,
+    fetch_page_content_with_retry,
+    research_url,
+    save_page_content,
+)
+
+load_dotenv()  # Load environment variables from .env file
+
+BASE_URL = "https://www.cars.com/research/"
+
+# Per-model lineup prices, fetch times and trims from the last crawl
+CRAWL_INDEX_FILEPATH = "model_crawl.json"
+
+# Markup of the trim list on a model research page: a card element per trim,
+# holding an element with the trim name and one with its starting price.
+# PLACEHOLDERS: no cars.com model page has been captured, so these class names
+# are guesses and have not been checked against the live site. The offline
+# tests use a fixture written to match them, so they only cover the parsing.
+# Crawls report pages where they match nothing ("no_trims"); replace them from
+# a page saved under data/models/ before relying on the trim prices
+TRIM_CARD_CLASS = "trim-card"
+TRIM_NAME_CLASS = "trim-card-name"
+TRIM_PRICE_CLASS = "trim-card-price"
+
+# Work queue priorities: models whose lineup price changed (or are new) first
+PRIORITY_CHANGED = 0
+PRIORITY_UNCHANGED = 1
+
+ModelTask = namedtuple(
+    "ModelTask", ["priority", "order", "slug", "make", "year", "model", "lineup_price"]
+)
+ModelTask.__doc__ = """
+A model research page to crawl. Tasks sort by (priority, order), so the work
+queue hands out changed models first and otherwise keeps lineup order.
+"""
+
+CrawlResult = namedtuple("CrawlResult", ["task", "trims", "status"])
+CrawlResult.__doc__ = """
+Outcome of crawling one model page.
+
+status is one of "fetched" (through the proxy), "loaded" (from a saved page,
+offline), "no_trims" (the page was read but no element matched the TRIM_*
+classes, so trims is empty) or "failed" (trims is None).
+"""
+
+
+def model_slug(link):
+    """Turns a card link ("/research/tesla-model_y-2025/") into its slug."""
+    return link.rstrip("/").rsplit("/", 1)[-1].lower()
+
+
+class _TrimParser(HTMLParser):
+    """Collects (name, price text) for every trim card of a model page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.trims = []
+        self._card = None  # [tag, depth] of the open trim card
+        self._field = None  # [tag, depth, name of the field, text parts]
+        self._name = None
+        self._price = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._card is not None and tag == self._card[0]:
+            self._card[1] += 1
+        if self._field is not None and tag == self._field[0]:
+            self._field[1] += 1
+
+        classes = (dict(attrs).get("class") or "").split()
+        if self._card is None:
+            if TRIM_CARD_CLASS in classes:
+                self._card = [tag, 1]
+                self._name = self._price = None
+        elif self._field is None:
+            if TRIM_NAME_CLASS in classes and self._name is None:
+                self._field = [tag, 1, "name", []]
+            elif TRIM_PRICE_CLASS in classes and self._price is None:
+                self._field = [tag, 1, "price", []]
+
+    def handle_endtag(self, tag):
+        if self._field is not None and tag == self._field[0]:
+            self._field[1] -= 1
+            if not self._field[1]:
+                text = "".join(self._field[3]).strip()
+                if self._field[2] == "name":
+                    self._name = text
+                else:
+                    self._price = text
+                self._field = None
+        if self._card is not None and tag == self._card[0]:
+            self._card[1] -= 1
+            if not self._card[1]:
+                if self._name:
+                    self.trims.append((self._name, self._price))
+                self._card = None
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._field[3].append(data)
+
+
+def parse_trims(html_content):
+    """
+    Extracts the trims listed on a model research page.
+
+    Returns:
+        list: {"trim", "price"} dicts in page order; price is an int, None if
+        the card shows none, or the original text if it is not a number.
+    """
+    parser = _TrimParser()
+    parser.feed(html_content)
+    parser.close()
+    return [
+        {"trim": name, "price": parse_price(price) if price else None}
+        for name, price in parser.trims
+    ]
+
+
+class ModelCrawler:
+    """
+    Follows lineup card links into per-model research pages and extracts their
+    trims.
+
+    Pages are fetched by a fixed number of worker threads from a priority work
+    queue: models whose lineup price changed since the last crawl (or that were
+    never crawled) come first. Every slug is crawled at most once per run.
+    Fetched pages are saved under ``data_dir/models/``; with ``offline`` they
+    are read from there instead, so no proxy is needed.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        username=None,
+        password=None,
+        base_url=BASE_URL,
+        index_filepath=CRAWL_INDEX_FILEPATH,
+        endpoint=OXYLABS_ENDPOINT,
+        timeout=60,
+        retries=3,
+        backoff=1.0,
+        max_workers=8,
+        offline=False,
+    ):
+        """
+        Args:
+            data_dir (str): Directory holding the lineup pages.
+            username (str): Oxylabs username (not needed offline).
+            password (str): Oxylabs password (not needed offline).
+            base_url (str): Base URL for cars.com research.
+            index_filepath (str): Where the crawl index is kept.
+            endpoint (str): Oxylabs realtime endpoint URL (or a local stub).
+            timeout (float): Request timeout per page in seconds.
+            retries (int): Retries per page for transient errors.
+            backoff (float): Base delay for the exponential backoff.
+            max_workers (int): Pages fetched concurrently.
+            offline (bool): Read model pages saved in ``data_dir/models/``.
+        """
+        self.data_dir = data_dir
+        self.model_dir = os.path.join(data_dir, MODEL_PAGE_DIR)
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.index_filepath = index_filepath
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.offline = offline
+
+        self._lock = threading.Lock()
+        self._session = None  # Shared by the workers during a crawl
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_filepath, "r") as infile:
+                return json.load(infile)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        write_json_atomic(self.index_filepath, self._index)
+
+    def plan(self, makes):
+        """
+        Lists the model pages linked from the stored lineup pages of ``makes``.
+
+        Returns:
+            list: ModelTask objects without duplicate slugs, in priority order.
+        """
+        tasks = []
+        seen = set()
+        for make in makes:
+            filepath = find_raw_page(self.data_dir, make)
+            html_content = load_raw_page(filepath) if filepath else None
+            if html_content is None:
+                continue
+            extractor = LineupExtractor.for_make(make)
+            for card in extractor.iter_cards(html_content):
+                if not card.link or card.name is None:
+                    continue
+                slug = model_slug(card.link)
+                if slug in seen:
+                    continue
+                seen.add(slug)
+
+                record = extractor.record(card.name, card.price)
+                entry = self._index.get(slug)
+                changed = entry is None or entry["lineup_price"] != record.price
+                tasks.append(
+                    ModelTask(
+                        PRIORITY_CHANGED if changed else PRIORITY_UNCHANGED,
+                        len(tasks),
+                        slug,
+                        make,
+                        record.year,
+                        record.model,
+                        record.price,
+                    )
+                )
+        return sorted(tasks)
+
+    def _load_page(self, task):
+        """Returns (html, status) for a task, or (None, "failed")."""
+        if self.offline:
+            filepath = find_raw_page(self.model_dir, task.slug)
+            html_content = load_raw_page(filepath) if filepath else None
+            if html_content is None:
+                print(f"No saved page for {task.slug} in {self.model_dir}")
+                return None, "failed"
+            return html_content, "loaded"
+
+        try:
+            html_content = fetch_page_content_with_retry(
+                task.slug,
+                self.username,
+                self.password,
+                self.base_url,
+                self._session,
+                self.endpoint,
+                self.timeout,
+                self.retries,
+                self.backoff,
+            )
+        except Exception as e:
+            print(f"Error fetching {task.slug}: {type(e).__name__}: {e}")
+            return None, "failed"
+        os.makedirs(self.model_dir, exist_ok=True)
+        save_page_content(
+            task.slug,
+            html_content,
+            self.model_dir,
+            url=research_url(task.slug, self.base_url),
+        )
+        return html_content, "fetched"
+
+    def _crawl_one(self, task):
+        html_content, status = self._load_page(task)
+        if html_content is None:
+            return CrawlResult(task, None, status)
+
+        trims = parse_trims(html_content)
+        if not trims:
+            # Kept under data/models/, so a fix to the TRIM_* classes can be
+            # checked with --offline
+            print(f"No trims found on the page for {task.slug}")
+            status = "no_trims"
+        with self._lock:
+            self._index[task.slug] = {
+                "make": task.make,
+                "year": task.year,
+                "model": task.model,
+                "lineup_price": task.lineup_price,
+                "fetched_at": time.time(),
+                "trims": trims,
+            }
+        return CrawlResult(task, trims, status)
+
+    def crawl(self, tasks, max_pages=None):
+        """
+        Crawls the given tasks through the priority work queue.
+
+        Args:
+            tasks (iterable): ModelTask objects (e.g., from ``plan``).
+            max_pages (int, optional): Crawl at most this many pages, taking
+                the highest-priority ones.
+
+        Returns:
+            dict: slug -> CrawlResult, for the crawled pages.
+        """
+        work = queue.PriorityQueue()
+        seen = set()
+        for task in sorted(tasks):
+            if task.slug in seen:
+                continue
+            if max_pages is not None and len(seen) >= max_pages:
+                break
+            seen.add(task.slug)
+            work.put(task)
+
+        results = {}
+        self._session = None if self.offline else create_session(self.max_workers)
+
+        def worker():
+            while True:
+                try:
+                    task = work.get_nowait()
+                except queue.Empty:
+                    return
+                result = self._crawl_one(task)
+                with self._lock:
+                    results[task.slug] = result
+
+        threads = [
+            threading.Thread(target=worker, daemon=True)
+            for _ in range(min(self.max_workers, len(seen)))
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if self._session is not None:
+                self._session.close()
+
+        with self._lock:
+            self._save_index()
+        return results
+
+    def write_trims(self, filepath=TRIMS_FILEPATH, slugs=None):
+        """
+        Writes the trims of every crawled model (from the index) as NDJSON.
+
+        Args:
+            filepath (str): Output path.
+            slugs (iterable, optional): Only these models (e.g., the ones in
+                the current lineup), in this order.
+
+        Returns:
+            int: The number of trim records written.
+        """
+        with self._lock:
+            entries = dict(self._index)
+        if slugs is not None:
+            entries = {slug: entries[slug] for slug in slugs if slug in entries}
+
+        with NdjsonWriter(filepath) as writer:
+            for slug, entry in entries.items():
+                writer.write_make(
+                    entry["make"].capitalize(),
+                    [
+                        {
+                            "year": entry["year"],
+                            "model": entry["model"],
+                            "trim": trim["trim"],
+                            "price": trim["price"],
+                            "lineup_price": entry["lineup_price"],
+                            "slug": slug,
+                        }
+                        for trim in entry["trims"]
+                    ],
+                )
+        return writer.rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crawl the model research pages linked from the stored lineups."
+    )
+    parser.add_argument("makes", nargs="*", help="Makes to crawl (default: all stored).")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-pages", type=int, help="Crawl at most this many pages.")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Skip models whose lineup price is unchanged since the last crawl.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Read model pages saved in data/models/ instead of fetching them.",
+    )
+    parser.add_argument("--endpoint", default=OXYLABS_ENDPOINT)
+    args = parser.parse_args()
+
+    USERNAME = os.environ.get("USERNAME")  # Get Oxylabs username from .env
+    PASSWORD = os.environ.get("PASSWORD")  # Get Oxylabs password from .env
+    data_dir = "data"
+
+    if not args.offline and not (USERNAME and PASSWORD):
+        print(
+            "Error: USERNAME and PASSWORD environment variables not set. "
+            "Make sure you have a .env file with USERNAME and PASSWORD defined, "
+            "or use --offline."
+        )
+    else:
+        crawler = ModelCrawler(
+            data_dir,
+            USERNAME,
+            PASSWORD,
+            endpoint=args.endpoint,
+            max_workers=args.workers,
+            offline=args.offline,
+        )
+        planned = crawler.plan(args.makes or list_stored_makes(data_dir))
+        tasks = planned
+        if args.changed_only:
+            tasks = [task for task in tasks if task.priority == PRIORITY_CHANGED]
+        results = crawler.crawl(tasks, args.max_pages)
+        # Every model in the lineup, in lineup order, with its latest trims
+        lineup_slugs = [task.slug for task in sorted(planned, key=lambda t: t.order)]
+        trim_count = crawler.write_trims(TRIMS_FILEPATH, lineup_slugs)
+
+        counts = {}
+        for result in results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        print(f"\nCrawled {len(results)} of {len(tasks)} model pages:")
+        pprint(counts)
+        print(f"{trim_count} trims saved to: {TRIMS_FILEPATH}")
+        if counts.get("no_trims"):
+            print(
+                f"{counts['no_trims']} pages had no trims; if the page markup "
+                "changed, update the TRIM_* classes and re-run with --offline."
+            )
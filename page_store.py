@@ -0,0 +1,310 @@
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+
+from lineup_parser import serialize_lineup
+
+try:
+    import zstandard  # Optional: faster decompression than gzip
+except ImportError:
+    zstandard = None
+
+# Layout of a .page file:
+#   8 bytes   magic
+#   4 bytes   big-endian length of the JSON header
+#   N bytes   UTF-8 JSON header (make, url, fetched_at, kind, codec, sizes, sha256, ...)
+#   rest      the HTML, compressed with the codec named in the header
+PAGE_MAGIC = b"CARPAGE1"
+PAGE_EXTENSION = ".page"
+LEGACY_EXTENSION = ".json"  # {"results": [{"content": html}]} dumps
+_HEADER_LENGTH = struct.Struct(">I")
+_PREFIX_SIZE = len(PAGE_MAGIC) + _HEADER_LENGTH.size
+CODECS = ("gzip", "zstd")
+FULL_PAGE_DIR = "full"  # Sub-directory for full pages kept next to lineup-only ones
+MODEL_PAGE_DIR = "models"  # Sub-directory for per-model research pages (by slug)
+
+
+class PageFormatError(ValueError):
+    """Raised when a file is not a valid .page file."""
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise PageFormatError(
+            "The zstd codec needs the 'zstandard' package (pip install zstandard)"
+        )
+
+
+def _compress(raw, codec, level):
+    if codec == "gzip":
+        return gzip.compress(raw, compresslevel=level or 6, mtime=0)
+    if codec == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=level or 10).compress(raw)
+    raise PageFormatError(f"Unknown codec {codec!r}; expected one of {CODECS}")
+
+
+def _decompress(body, codec, filepath):
+    if codec == "gzip":
+        try:
+            return gzip.decompress(body)
+        except (OSError, EOFError, zlib.error) as error:
+            raise PageFormatError(f"Corrupt gzip body in {filepath}: {error}") from error
+    if codec == "zstd":
+        _require_zstandard()
+        try:
+            return zstandard.ZstdDecompressor().decompress(body)
+        except zstandard.ZstdError as error:
+            raise PageFormatError(f"Corrupt zstd body in {filepath}: {error}") from error
+    raise PageFormatError(f"Unsupported codec {codec!r} in {filepath}")
+
+
+def write_page(filepath, html_content, metadata=None, codec="gzip", level=None):
+    """
+    Writes HTML to a compressed .page file with a small metadata header.
+
+    The file is written next to its destination and renamed into place, so
+    readers never see a half-written page.
+
+    Args:
+        filepath (str): Destination path (should end in ``.page``).
+        html_content (str): The page HTML.
+        metadata (dict, optional): Extra header fields (e.g., make, url).
+        codec (str): "gzip" (standard library) or "zstd" (needs ``zstandard``).
+        level (int, optional): Compression level (defaults: gzip 6, zstd 10).
+
+    Returns:
+        dict: The header that was written.
+    """
+    raw = html_content.encode("utf-8")
+    header = dict(metadata or {})
+    header.setdefault("fetched_at", datetime.now(timezone.utc).isoformat())
+    header.setdefault("kind", "full")
+    header.update(
+        {
+            "codec": codec,
+            "content_bytes": len(raw),
+            "sha256": hashlib.sha256(raw).hexdigest(),
+        }
+    )
+    body = _compress(raw, codec, level)
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+
+    tmp_filepath = f"{filepath}.tmp"
+    with open(tmp_filepath, "wb") as outfile:
+        outfile.write(PAGE_MAGIC)
+        outfile.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        outfile.write(header_bytes)
+        outfile.write(body)
+    os.replace(tmp_filepath, filepath)
+    return header
+
+
+def write_lineup_page(filepath, html_content, metadata=None, codec="gzip", level=None):
+    """
+    Writes only the lineup cards of a research page to a .page file.
+
+    The header records ``"kind": "lineup"`` plus the size and SHA-256 of the
+    full page, so the stored fragment can be traced back to the page it was
+    cut from.
+
+    Returns:
+        dict: The header that was written.
+    """
+    raw = html_content.encode("utf-8")
+    header = dict(metadata or {})
+    header.update(
+        {
+            "kind": "lineup",
+            "page_bytes": len(raw),
+            "page_sha256": hashlib.sha256(raw).hexdigest(),
+        }
+    )
+    return write_page(filepath, serialize_lineup(html_content), header, codec, level)
+
+
+def _parse_prefix(prefix, filepath):
+    """Validates the magic and returns the header length."""
+    if len(prefix) < _PREFIX_SIZE or prefix[: len(PAGE_MAGIC)] != PAGE_MAGIC:
+        raise PageFormatError(f"{filepath} is not a .page file")
+    (header_length,) = _HEADER_LENGTH.unpack_from(prefix, len(PAGE_MAGIC))
+    return header_length
+
+
+def read_page(filepath):
+    """
+    Reads a .page file through a memory map.
+
+    The compressed body is decompressed straight from the mapped file, without
+    first copying it into a bytes object.
+
+    Returns:
+        tuple: (header dict, HTML str).
+
+    Raises:
+        PageFormatError: If the file is empty, truncated or corrupt.
+    """
+    with open(filepath, "rb") as infile:
+        if os.fstat(infile.fileno()).st_size < _PREFIX_SIZE:
+            raise PageFormatError(f"{filepath} is not a .page file")
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header_length = _parse_prefix(mapped[:_PREFIX_SIZE], filepath)
+            body_offset = _PREFIX_SIZE + header_length
+            try:
+                header = json.loads(mapped[_PREFIX_SIZE:body_offset])
+            except ValueError as error:
+                raise PageFormatError(f"Corrupt header in {filepath}") from error
+            if not isinstance(header, dict):
+                raise PageFormatError(f"Corrupt header in {filepath}")
+            with memoryview(mapped)[body_offset:] as body:
+                raw = _decompress(body, header.get("codec"), filepath)
+    return header, raw.decode("utf-8")
+
+
+def find_raw_page(data_dir, make):
+    """
+    Returns the path of the raw page stored for a make, preferring the compact
+    .page format over a legacy .json dump, or None if neither exists.
+    """
+    for extension in (PAGE_EXTENSION, LEGACY_EXTENSION):
+        filepath = os.path.join(data_dir, make + extension)
+        if os.path.exists(filepath):
+            return filepath
+    return None
+
+
+def load_raw_page(filepath):
+    """
+    Loads the HTML of a raw page in either storage format.
+
+    Returns:
+        str: The HTML, or None if a legacy dump has no results.
+    """
+    if filepath.endswith(PAGE_EXTENSION):
+        return read_page(filepath)[1]
+
+    with open(filepath, "r") as infile:
+        make_data = json.load(infile)
+    if not make_data.get("results"):
+        return None
+    return make_data["results"][0]["content"]
+
+
+def list_stored_makes(data_dir):
+    """Returns the makes with a raw page in ``data_dir``, in directory order."""
+    makes = []
+    for filename in os.listdir(data_dir):
+        make, extension = os.path.splitext(filename)
+        if extension in (PAGE_EXTENSION, LEGACY_EXTENSION) and make not in makes:
+            makes.append(make)
+    return makes
+
+
+def migrate_legacy_pages(data_dir, keep=False, codec="gzip", lineup_only=False):
+    """
+    Converts every legacy ``<make>.json`` dump in ``data_dir`` to ``<make>.page``.
+
+    Each converted page is read back and compared with the original before the
+    legacy file is removed.
+
+    Args:
+        data_dir (str): Directory holding the raw pages.
+        keep (bool): Keep the legacy .json files after converting them.
+        codec (str): Compression codec for the new pages.
+        lineup_only (bool): Store only the lineup cards of each page.
+
+    Returns:
+        dict: Totals for the migration (files, bytes and load seconds before and after).
+    """
+    stats = {
+        "files": 0,
+        "json_bytes": 0,
+        "page_bytes": 0,
+        "json_load_seconds": 0.0,
+        "page_load_seconds": 0.0,
+    }
+
+    for json_filepath in sorted(glob.glob(os.path.join(data_dir, "*" + LEGACY_EXTENSION))):
+        make = os.path.basename(json_filepath)[: -len(LEGACY_EXTENSION)]
+
+        start = time.perf_counter()
+        html_content = load_raw_page(json_filepath)
+        json_seconds = time.perf_counter() - start
+        if html_content is None:
+            print(f"Skipping {json_filepath}: no results to migrate.")
+            continue
+
+        page_filepath = os.path.join(data_dir, make + PAGE_EXTENSION)
+        metadata = {
+            "make": make,
+            "fetched_at": datetime.fromtimestamp(
+                os.path.getmtime(json_filepath), timezone.utc
+            ).isoformat(),
+            "migrated_from": os.path.basename(json_filepath),
+        }
+        if lineup_only:
+            write_lineup_page(page_filepath, html_content, metadata, codec=codec)
+            expected = serialize_lineup(html_content)
+        else:
+            write_page(page_filepath, html_content, metadata, codec=codec)
+            expected = html_content
+
+        start = time.perf_counter()
+        _, round_trip = read_page(page_filepath)
+        page_seconds = time.perf_counter() - start
+        if round_trip != expected:
+            os.remove(page_filepath)
+            raise PageFormatError(f"Round trip mismatch for {json_filepath}")
+
+        stats["files"] += 1
+        stats["json_bytes"] += os.path.getsize(json_filepath)
+        stats["page_bytes"] += os.path.getsize(page_filepath)
+        stats["json_load_seconds"] += json_seconds
+        stats["page_load_seconds"] += page_seconds
+
+        if not keep:
+            os.remove(json_filepath)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raw page storage tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Convert legacy .json dumps to compressed .page files."
+    )
+    migrate_parser.add_argument("data_dir", nargs="?", default="data")
+    migrate_parser.add_argument(
+        "--keep", action="store_true", help="Keep the legacy .json files."
+    )
+    migrate_parser.add_argument("--codec", choices=CODECS, default="gzip")
+    migrate_parser.add_argument(
+        "--lineup-only",
+        action="store_true",
+        help="Store only the lineup cards (plus a hash of the full page).",
+    )
+    args = parser.parse_args()
+
+    stats = migrate_legacy_pages(
+        args.data_dir, keep=args.keep, codec=args.codec, lineup_only=args.lineup_only
+    )
+    if stats["files"]:
+        print(f"Migrated {stats['files']} pages in {args.data_dir}")
+        print(
+            f"Size: {stats['json_bytes'] / 1e6:.1f} MB -> {stats['page_bytes'] / 1e6:.2f} MB "
+            f"({stats['json_bytes'] / stats['page_bytes']:.1f}x smaller)"
+        )
+        print(
+            f"Load: {stats['json_load_seconds']:.3f}s -> {stats['page_load_seconds']:.3f}s"
+        )
+    else:
+        print(f"No legacy .json pages found in {args.data_dir}")
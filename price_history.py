@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+
+from car_dataset import read_json_dataset, read_ndjson_dataset
+
+HISTORY_FILEPATH = "price_history.sqlite"
+
+# Snapshots are append-only: one row per build, and one prices row per model in
+# it. prices is clustered on (brand, model, year, snapshot_id), so per-model
+# histories are contiguous; the (brand, snapshot_id) index serves trend queries
+# that read a few brands over a window of snapshots, and the (snapshot_id, ...)
+# index reads one snapshot's rows for diffs between snapshots.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    taken_at TEXT NOT NULL,
+    source_sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS snapshots_taken_at ON snapshots (taken_at);
+CREATE TABLE IF NOT EXISTS prices (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    brand TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    price INTEGER,
+    PRIMARY KEY (brand, model, year, snapshot_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_brand_snapshot ON prices (brand, snapshot_id);
+CREATE INDEX IF NOT EXISTS prices_snapshot ON prices (snapshot_id, brand, model, year);
+"""
+
+# Columns that identify a model within a snapshot
+MODEL_KEY = ["Brand", "Model", "Year"]
+
+
+def connect(filepath=HISTORY_FILEPATH, readonly=False):
+    """
+    Opens the price history, creating the schema if needed.
+
+    Args:
+        filepath (str): Path of the SQLite database.
+        readonly (bool): Open without write access (the database must exist).
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    if readonly:
+        return sqlite3.connect(f"file:{filepath}?mode=ro", uri=True)
+    conn = sqlite3.connect(filepath)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def duplicate_models(car_df):
+    """
+    Rows of ``car_df`` that repeat the Brand, Model and Year of an earlier row.
+    A snapshot holds one price per model, so these have to be dropped (after
+    reporting them) before ``record_snapshot``.
+    """
+    return car_df[car_df.duplicated(MODEL_KEY)]
+
+
+def snapshot_sha256(car_df):
+    """
+    SHA-256 of the models and prices a snapshot of ``car_df`` holds, the same
+    whether they were read from complete.json or complete.ndjson.
+    """
+    rows = car_df[MODEL_KEY + ["Price"]].astype({"Brand": str})
+    rows = rows.sort_values(MODEL_KEY, kind="stable")
+    return hashlib.sha256(rows.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+def record_snapshot(conn, car_df, source_sha256=None, taken_at=None):
+    """
+    Appends a dated snapshot of the car data.
+
+    Args:
+        conn (sqlite3.Connection): Open price history.
+        car_df (pandas.DataFrame): The normalized car frame (see
+            ``car_dataset.normalize_car_data``).
+        source_sha256 (str, optional): Hash of the data (see
+            ``snapshot_sha256``). A snapshot is not recorded if the latest one
+            has the same hash.
+        taken_at (str, optional): ISO 8601 timestamp; defaults to now (UTC).
+
+    Returns:
+        int: The new snapshot id, or None if nothing was recorded.
+
+    Raises:
+        ValueError: If a model appears more than once (see ``duplicate_models``).
+    """
+    duplicates = duplicate_models(car_df)
+    if len(duplicates):
+        raise ValueError(
+            f"{len(duplicates)} rows repeat a model already in the snapshot, "
+            f"e.g. {describe_models(duplicates)}"
+        )
+
+    if source_sha256 is not None:
+        latest = conn.execute(
+            "SELECT source_sha256 FROM snapshots ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if latest is not None and latest[0] == source_sha256:
+            return None
+
+    taken_at = taken_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with conn:
+        snapshot_id = conn.execute(
+            "INSERT INTO snapshots (taken_at, source_sha256) VALUES (?, ?)",
+            (taken_at, source_sha256),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO prices (snapshot_id, brand, year, model, price) "
+            "VALUES (?, ?, ?, ?, ?)",
+            zip(
+                [snapshot_id] * len(car_df),
+                car_df["Brand"].astype(str).tolist(),
+                car_df["Year"].tolist(),
+                car_df["Model"].tolist(),
+                car_df["Price"].round().astype("int64").tolist(),
+            ),
+        )
+    return snapshot_id
+
+
+def describe_models(car_df, limit=5):
+    """The first ``limit`` models of ``car_df`` as "Brand Model (Year)" text."""
+    models = [
+        f"{brand} {model} ({year})"
+        for brand, model, year in car_df[MODEL_KEY].head(limit).itertuples(index=False)
+    ]
+    if len(car_df) > limit:
+        models.append(f"and {len(car_df) - limit} more")
+    return ", ".join(models)
+
+
+def list_snapshots(conn):
+    """Returns [(id, taken_at), ...] in the order they were recorded."""
+    return conn.execute("SELECT id, taken_at FROM snapshots ORDER BY id").fetchall()
+
+
+def price_trend(conn, brands, start=None, end=None, year_range=None):
+    """
+    Per-brand price statistics for each snapshot in a date range.
+
+    Only the rows of the requested brands within the snapshot window are read.
+
+    Args:
+        conn (sqlite3.Connection): Open price history.
+        brands (iterable): Brand display names (e.g., "Land Rover").
+        start (str, optional): Earliest snapshot date, inclusive (YYYY-MM-DD).
+        end (str, optional): Latest snapshot date, inclusive (YYYY-MM-DD).
+        year_range (tuple, optional): Inclusive (min, max) model year.
+
+    Returns:
+        pandas.DataFrame: Snapshot, Brand, Models, Minimum Price, Maximum Price
+        and Average Price, ordered by snapshot and brand.
+    """
+    import pandas as pd
+
+    columns = [
+        "Snapshot",
+        "Brand",
+        "Models",
+        "Minimum Price",
+        "Maximum Price",
+        "Average Price",
+    ]
+    brands = sorted(set(brands))
+    if not brands:
+        return pd.DataFrame(columns=columns)
+
+    query = (
+        "SELECT s.taken_at, p.brand, COUNT(p.price), MIN(p.price), MAX(p.price), "
+        "AVG(p.price) FROM prices p JOIN snapshots s ON s.id = p.snapshot_id "
+        f"WHERE p.brand IN ({_placeholders(brands)})"
+    )
+    params = list(brands)
+    if start is not None:
+        query += " AND s.taken_at >= ?"
+        params.append(str(start))
+    if end is not None:
+        query += " AND s.taken_at < date(?, '+1 day')"
+        params.append(str(end))
+    if year_range is not None:
+        query += " AND p.year BETWEEN ? AND ?"
+        params.extend(int(year) for year in year_range)
+    query += " GROUP BY s.id, p.brand ORDER BY s.id, p.brand"
+
+    trend_df = pd.DataFrame(conn.execute(query, params).fetchall(), columns=columns)
+    trend_df["Snapshot"] = pd.to_datetime(trend_df["Snapshot"])
+    return trend_df
+
+
+def price_changes(conn, last_n=2, brands=None):
+    """
+    Price change per model between the first and last of the latest snapshots.
+
+    Args:
+        conn (sqlite3.Connection): Open price history.
+        last_n (int): How many of the most recent snapshots to compare across.
+        brands (iterable, optional): Restrict to these brands.
+
+    Returns:
+        pandas.DataFrame: Brand, Year, Model, First Price, Last Price, Change and
+        Change % for models priced in both the first and last snapshot of the
+        window, largest absolute change first.
+    """
+    import pandas as pd
+
+    columns = ["Brand", "Year", "Model", "First Price", "Last Price"]
+    window = conn.execute(
+        "SELECT MIN(id), MAX(id) FROM "
+        "(SELECT id FROM snapshots ORDER BY id DESC LIMIT ?)",
+        (last_n,),
+    ).fetchone()
+    first_id, last_id = window
+    if first_id is None or first_id == last_id:
+        return pd.DataFrame(columns=columns + ["Change", "Change %"])
+
+    query = (
+        "SELECT f.brand, f.year, f.model, f.price, l.price FROM prices f "
+        "JOIN prices l ON l.brand = f.brand AND l.model = f.model "
+        "AND l.year = f.year AND l.snapshot_id = ? "
+        "WHERE f.snapshot_id = ? AND f.price IS NOT NULL AND l.price IS NOT NULL"
+    )
+    params = [last_id, first_id]
+    if brands is not None:
+        brands = sorted(set(brands))
+        query += f" AND f.brand IN ({_placeholders(brands)})"
+        params.extend(brands)
+
+    changes_df = pd.DataFrame(conn.execute(query, params).fetchall(), columns=columns)
+    changes_df["Change"] = changes_df["Last Price"] - changes_df["First Price"]
+    changes_df["Change %"] = (
+        changes_df["Change"] / changes_df["First Price"] * 100
+    ).round(1)
+    return changes_df.sort_values(
+        by="Change", key=lambda change: change.abs(), ascending=False
+    ).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the price history.")
+    parser.add_argument("--history", default=HISTORY_FILEPATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser(
+        "record", help="Append a snapshot of complete.json."
+    )
+    record_parser.add_argument("complete_file", nargs="?", default="complete.json")
+    subparsers.add_parser("snapshots", help="List recorded snapshots.")
+    changes_parser = subparsers.add_parser(
+        "changes", help="Show price changes across the latest snapshots."
+    )
+    changes_parser.add_argument("--last", type=int, default=2)
+    changes_parser.add_argument("--brand", action="append")
+    args = parser.parse_args()
+
+    conn = connect(args.history)
+    if args.command == "record":
+        if args.complete_file.endswith(".ndjson"):
+            car_df = read_ndjson_dataset(args.complete_file)
+        else:
+            car_df = read_json_dataset(args.complete_file)
+        duplicates = duplicate_models(car_df)
+        if len(duplicates):
+            print(
+                f"Warning: dropping {len(duplicates)} repeated models, keeping "
+                f"the first of each: {describe_models(duplicates)}"
+            )
+            car_df = car_df.drop(duplicates.index)
+        snapshot_id = record_snapshot(conn, car_df, snapshot_sha256(car_df))
+        if snapshot_id is None:
+            print("complete.json matches the latest snapshot; nothing recorded.")
+        else:
+            print(f"Recorded snapshot {snapshot_id}.")
+    elif args.command == "snapshots":
+        for snapshot_id, taken_at in list_snapshots(conn):
+            print(f"{snapshot_id:>5}  {taken_at}")
+    else:
+        print(price_changes(conn, args.last, args.brand).to_string(index=False))
+    conn.close()
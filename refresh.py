@@ -0,0 +1,370 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pprint import pprint
+from dotenv import load_dotenv
+
+from file_utils import write_json_atomic
+from instrumentation import configure_logging
+from scraper_module import (
+    MAKES,
+    OXYLABS_ENDPOINT,
+    create_session,
+    fetch_page_content_with_retry,
+    parse_models_data,
+    research_url,
+    save_page_content,
+)
+
+load_dotenv()  # Load environment variables from .env file
+
+# Progress of the current refresh run, rewritten after every make
+CHECKPOINT_FILEPATH = "refresh_checkpoint.json"
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class EmptyLineupError(Exception):
+    """The page was fetched but no model could be extracted from it."""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _key(make):
+    return make.lower().replace(" ", "_")
+
+
+class RefreshRun:
+    """
+    Checkpointed refresh of the whole catalogue: scrape and extract every make,
+    then build complete.json once all of them are done.
+
+    Each make's outcome is written to the checkpoint file as soon as it is
+    known, so a run that dies (proxy errors, rate limits, a killed container)
+    resumes with only the makes that are not done. Failures keep their error
+    class (e.g., "HTTPError" with its status code, "Timeout") for a retry pass
+    limited to them. A page is only saved once models were extracted from it,
+    so a failed make keeps its previous raw page, and the final build (which
+    is incremental) re-parses only the pages that changed.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        username,
+        password,
+        base_url,
+        checkpoint_filepath=CHECKPOINT_FILEPATH,
+        endpoint=OXYLABS_ENDPOINT,
+        timeout=60,
+        retries=3,
+        backoff=1.0,
+        storage="page",
+        max_workers=8,
+    ):
+        self.data_dir = data_dir
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.checkpoint_filepath = checkpoint_filepath
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.storage = storage
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_filepath, "r") as infile:
+                return json.load(infile)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_checkpoint(self):
+        """Writes the checkpoint atomically. Call with the lock held."""
+        write_json_atomic(self.checkpoint_filepath, self.checkpoint)
+
+    @property
+    def in_progress(self):
+        """True if a run was started and its build has not completed."""
+        return (
+            self.checkpoint is not None
+            and self.checkpoint["build"]["status"] != DONE
+        )
+
+    def start(self, makes):
+        """Starts a new run over ``makes``, discarding any previous checkpoint."""
+        with self._lock:
+            self.checkpoint = {
+                "started_at": _now(),
+                "makes": {
+                    _key(make): {"make": make, "status": PENDING, "attempts": 0}
+                    for make in makes
+                },
+                "build": {"status": PENDING},
+            }
+            self._save_checkpoint()
+
+    def makes_with_status(self, status, error_classes=None):
+        """Makes of the run with ``status``; failed ones optionally by error class."""
+        return [
+            entry["make"]
+            for entry in self.checkpoint["makes"].values()
+            if entry["status"] == status
+            and (not error_classes or entry.get("error_class") in error_classes)
+        ]
+
+    def makes_to_refresh(self, retry_failed=False, error_classes=None):
+        """
+        The makes a resumed run still has to scrape: the pending and failed
+        ones, or with ``retry_failed`` only the failed ones, optionally only
+        those that failed with one of ``error_classes``.
+        """
+        if retry_failed:
+            return self.makes_with_status(FAILED, error_classes)
+        return self.makes_with_status(PENDING) + self.makes_with_status(FAILED)
+
+    def _record(self, make, **fields):
+        with self._lock:
+            entry = self.checkpoint["makes"][_key(make)]
+            for field in ("error_class", "error", "status_code"):
+                entry.pop(field, None)
+            entry.update(fields, finished_at=_now())
+            self._save_checkpoint()
+
+    def _refresh_make(self, make, session):
+        """Scrapes and extracts one make, checkpointing the outcome."""
+        with self._lock:
+            self.checkpoint["makes"][_key(make)]["attempts"] += 1
+        try:
+            html_content = fetch_page_content_with_retry(
+                make,
+                self.username,
+                self.password,
+                self.base_url,
+                session,
+                self.endpoint,
+                self.timeout,
+                self.retries,
+                self.backoff,
+            )
+            models_data = parse_models_data(html_content, make)
+            if not models_data:
+                raise EmptyLineupError(f"No models found on the page for {make}")
+            save_page_content(
+                make,
+                html_content,
+                self.data_dir,
+                self.storage,
+                research_url(make, self.base_url),
+            )
+        except Exception as e:
+            print(f"Error refreshing {make.capitalize()}: {type(e).__name__}: {e}")
+            response = getattr(e, "response", None)
+            self._record(
+                make,
+                status=FAILED,
+                error_class=type(e).__name__,
+                error=str(e),
+                status_code=getattr(response, "status_code", None),
+            )
+            return False
+
+        self._record(make, status=DONE, models=len(models_data))
+        return True
+
+    def refresh(self, makes):
+        """
+        Scrapes and extracts ``makes`` concurrently over one pooled session.
+
+        Returns:
+            dict: make -> True if it is now done.
+        """
+        if not makes:
+            return {}
+        max_workers = max(1, min(self.max_workers, len(makes)))
+        session = create_session(max_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    make: executor.submit(self._refresh_make, make, session)
+                    for make in makes
+                }
+                return {make: future.result() for make, future in futures.items()}
+        finally:
+            session.close()
+
+    def build(self, workers=1, output_format="json"):
+        """
+        Runs main_script's incremental build (once every make is done, or
+        with failures accepted).
+
+        Returns:
+            bool: True if the build completed.
+        """
+        from main_script import build
+
+        with self._lock:
+            self.checkpoint["build"] = {"status": PENDING, "started_at": _now()}
+            self._save_checkpoint()
+        try:
+            build(
+                workers, full=False, output_format=output_format, data_dir=self.data_dir
+            )
+        except Exception as e:
+            print(f"Build failed: {type(e).__name__}: {e}")
+            with self._lock:
+                self.checkpoint["build"].update(
+                    status=FAILED, error_class=type(e).__name__, error=str(e)
+                )
+                self._save_checkpoint()
+            return False
+
+        with self._lock:
+            self.checkpoint["build"].update(status=DONE, finished_at=_now())
+            self._save_checkpoint()
+        return True
+
+    def summary(self):
+        """Counts of makes per status, failures per error class, and the build."""
+        counts = {}
+        error_classes = {}
+        for entry in self.checkpoint["makes"].values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+            if entry["status"] == FAILED:
+                error_class = entry["error_class"]
+                error_classes[error_class] = error_classes.get(error_class, 0) + 1
+        return {
+            "started_at": self.checkpoint["started_at"],
+            "makes": counts,
+            "failed_by_error_class": error_classes,
+            "build": self.checkpoint["build"]["status"],
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh every make and rebuild, resuming an interrupted run."
+    )
+    parser.add_argument(
+        "makes", nargs="*", help="Makes for a new run (default: all of MAKES)."
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start a new run even if the last one did not finish.",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only retry the failed makes of the current run, not pending ones.",
+    )
+    parser.add_argument(
+        "--error-class",
+        action="append",
+        help="With --retry-failed, only makes that failed with this error class "
+        "(repeatable, e.g. HTTPError, Timeout, EmptyLineupError).",
+    )
+    parser.add_argument(
+        "--allow-failed",
+        action="store_true",
+        help="Build even if some makes failed; they keep their previous raw pages.",
+    )
+    parser.add_argument("--status", action="store_true", help="Show the checkpoint.")
+    parser.add_argument("--no-build", action="store_true", help="Scrape only.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent scrapes.")
+    parser.add_argument("--build-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output-format", choices=["json", "ndjson"], default="json")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--endpoint", default=OXYLABS_ENDPOINT)
+    parser.add_argument(
+        "--storage", choices=["page", "lineup", "json"], default="page"
+    )
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILEPATH)
+    parser.add_argument(
+        "--data-dir", default="data", help="Directory the raw pages are saved to."
+    )
+    args = parser.parse_args()
+
+    USERNAME = os.environ.get("USERNAME")  # Get Oxylabs username from .env
+    PASSWORD = os.environ.get("PASSWORD")  # Get Oxylabs password from .env
+    BASE_URL = "https://www.cars.com/research/"
+    data_dir = args.data_dir
+    os.makedirs(data_dir, exist_ok=True)
+
+    run = RefreshRun(
+        data_dir,
+        USERNAME,
+        PASSWORD,
+        BASE_URL,
+        checkpoint_filepath=args.checkpoint,
+        endpoint=args.endpoint,
+        timeout=args.timeout,
+        retries=args.retries,
+        storage=args.storage,
+        max_workers=args.workers,
+    )
+    if args.status:
+        if run.checkpoint is None:
+            print("No refresh run recorded.")
+        else:
+            pprint(run.summary(), sort_dicts=False)
+        sys.exit(0)
+
+    if not (USERNAME and PASSWORD):  # Check if USERNAME and PASSWORD are loaded
+        print(
+            "Error: USERNAME and PASSWORD environment variables not set. "
+            "Make sure you have a .env file with USERNAME and PASSWORD defined."
+        )
+        sys.exit(1)
+
+    if args.makes and run.in_progress and not args.restart:
+        parser.error("a refresh run is in progress; add --restart to start a new one")
+    if args.restart or not run.in_progress:
+        run.start(args.makes or MAKES)
+        print(f"Started a refresh of {len(run.checkpoint['makes'])} makes.")
+    else:
+        print(f"Resuming the refresh started at {run.checkpoint['started_at']}.")
+
+    makes = run.makes_to_refresh(args.retry_failed, args.error_class)
+    start = time.perf_counter()
+    results = run.refresh(makes)
+    print(
+        f"Refreshed {sum(results.values())} of {len(results)} makes "
+        f"in {time.perf_counter() - start:.1f}s."
+    )
+
+    summary = run.summary()
+    remaining = summary["makes"].get(PENDING, 0)
+    if not args.allow_failed:
+        remaining += summary["makes"].get(FAILED, 0)
+    if remaining:
+        pprint(summary, sort_dicts=False)
+        print(
+            f"{remaining} makes are not done yet; run again to resume, "
+            "with --retry-failed [--error-class CLASS] for the failed ones, or "
+            "with --allow-failed to build with their previous pages."
+        )
+        sys.exit(1)
+
+    if args.no_build:
+        print("Makes refreshed; skipping the build (--no-build).")
+        sys.exit(0)
+    configure_logging(1)
+    if not run.build(args.build_workers, args.output_format):
+        sys.exit(1)
+    print("Refresh complete.")
@@ -0,0 +1,335 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pprint import pprint
+from dotenv import load_dotenv
+
+from file_utils import write_json_atomic
+from lineup_parser import serialize_lineup
+from page_store import find_raw_page
+from scraper_module import (
+    MAKES,
+    OXYLABS_ENDPOINT,
+    create_session,
+    fetch_page_content_with_retry,
+    parse_models_data,
+    research_url,
+    save_page_content,
+)
+
+load_dotenv()  # Load environment variables from .env file
+
+# Per-make fetch times, lineup fingerprints and models from the last scrape
+CACHE_INDEX_FILEPATH = "scrape_cache.json"
+DEFAULT_TTL = 24 * 60 * 60  # Seconds a stored page counts as fresh
+
+CacheResult = namedtuple("CacheResult", ["make", "models_data", "status"])
+CacheResult.__doc__ = """
+Outcome of a cached scrape.
+
+status is one of:
+    "fresh"     - served from the cache, nothing fetched
+    "stale"     - served from the cache while a background refresh runs, or
+                  because the refresh failed
+    "unchanged" - fetched, but the lineup matches the stored fingerprint
+    "changed"   - fetched and the lineup changed (raw page rewritten)
+    "failed"    - fetch failed and nothing usable was cached (models_data is None)
+"""
+
+
+def lineup_fingerprint(html_content):
+    """SHA-256 of the serialized lineup cards, ignoring the rest of the page."""
+    return hashlib.sha256(serialize_lineup(html_content).encode("utf-8")).hexdigest()
+
+
+class ScrapeCache:
+    """
+    Freshness policy in front of ``scrape_car_models``.
+
+    Each make has a TTL. A make scraped within its TTL is served from the cache
+    without touching the proxy. Past the TTL, but within the stale-while-
+    revalidate window, the cached models are served at once while a refresh
+    runs in the background. Past both, the make is fetched before returning.
+
+    A refresh whose lineup fingerprint matches the stored one only renews the
+    fetch time. The raw page in ``data_dir`` is left untouched, so the
+    incremental build in main_script has nothing to re-parse.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        username,
+        password,
+        base_url,
+        index_filepath=CACHE_INDEX_FILEPATH,
+        default_ttl=DEFAULT_TTL,
+        ttls=None,
+        stale_while_revalidate=0,
+        endpoint=OXYLABS_ENDPOINT,
+        timeout=60,
+        retries=3,
+        backoff=1.0,
+        storage="page",
+        max_workers=8,
+        clock=time.time,
+    ):
+        """
+        Args:
+            data_dir (str): Directory holding the raw pages.
+            username (str): Oxylabs username.
+            password (str): Oxylabs password.
+            base_url (str): Base URL for cars.com research.
+            index_filepath (str): Where the cache index is kept.
+            default_ttl (float): Seconds a make stays fresh.
+            ttls (dict, optional): make -> TTL in seconds, overriding the default.
+            stale_while_revalidate (float): Seconds past the TTL during which
+                cached models are served while refreshing in the background.
+            endpoint (str): Oxylabs realtime endpoint URL.
+            timeout (float): Request timeout per make in seconds.
+            retries (int): Retries per make for transient errors.
+            backoff (float): Base delay for the exponential backoff.
+            storage (str): Raw page format passed to ``save_page_content``.
+            max_workers (int): Concurrent fetches (foreground and background).
+            clock (callable): Returns the current time in seconds.
+        """
+        self.data_dir = data_dir
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.index_filepath = index_filepath
+        self.default_ttl = default_ttl
+        self.ttls = {make.lower(): ttl for make, ttl in (ttls or {}).items()}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.storage = storage
+        self.clock = clock
+
+        self._session = create_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._revalidating = {}  # make key -> background future
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_filepath, "r") as infile:
+                return json.load(infile)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        """Writes the index atomically. Call with the lock held."""
+        write_json_atomic(self.index_filepath, self._index)
+
+    @staticmethod
+    def _key(make):
+        return make.lower().replace(" ", "_")
+
+    def ttl_for(self, make):
+        """Returns the TTL in seconds for a make."""
+        return self.ttls.get(self._key(make), self.default_ttl)
+
+    def status(self, make):
+        """Returns "fresh", "stale", "expired" or "missing" for a make."""
+        entry = self._index.get(self._key(make))
+        if entry is None:
+            return "missing"
+        age = self.clock() - entry["fetched_at"]
+        ttl = self.ttl_for(make)
+        if age < ttl:
+            return "fresh"
+        if age < ttl + self.stale_while_revalidate:
+            return "stale"
+        return "expired"
+
+    def _refresh(self, make):
+        """Fetches a make and updates the cache. Returns a CacheResult."""
+        key = self._key(make)
+        try:
+            html_content = fetch_page_content_with_retry(
+                make,
+                self.username,
+                self.password,
+                self.base_url,
+                self._session,
+                self.endpoint,
+                self.timeout,
+                self.retries,
+                self.backoff,
+            )
+            fingerprint = lineup_fingerprint(html_content)
+            models_data = parse_models_data(html_content, make)
+        except Exception as e:
+            print(f"Error refreshing {make.capitalize()}: {type(e).__name__}: {e}")
+            with self._lock:
+                entry = self._index.get(key)
+            if entry is None:
+                return CacheResult(make, None, "failed")
+            return CacheResult(make, entry["models_data"], "stale")  # Keep serving it
+
+        with self._lock:
+            entry = self._index.get(key)
+            unchanged = (
+                entry is not None
+                and entry["fingerprint"] == fingerprint
+                and find_raw_page(self.data_dir, key) is not None
+            )
+            if not unchanged:
+                save_page_content(
+                    make,
+                    html_content,
+                    self.data_dir,
+                    self.storage,
+                    research_url(make, self.base_url),
+                )
+            self._index[key] = {
+                "fetched_at": self.clock(),
+                "fingerprint": fingerprint,
+                "models_data": models_data,
+            }
+            self._save_index()
+
+        if unchanged:
+            print(f"Lineup for {make.capitalize()} unchanged; raw page kept.")
+        return CacheResult(make, models_data, "unchanged" if unchanged else "changed")
+
+    def _revalidate_in_background(self, make):
+        key = self._key(make)
+        with self._lock:
+            if key in self._revalidating:
+                return  # Already refreshing
+            future = self._executor.submit(self._refresh, make)
+            self._revalidating[key] = future
+
+        def _done(_):
+            with self._lock:
+                self._revalidating.pop(key, None)
+
+        future.add_done_callback(_done)
+
+    def scrape(self, make):
+        """
+        Returns the models for a make, fetching only when the policy requires it.
+
+        Returns:
+            CacheResult: The models and how they were obtained.
+        """
+        status = self.status(make)
+        if status == "fresh":
+            entry = self._index[self._key(make)]
+            return CacheResult(make, entry["models_data"], "fresh")
+        if status == "stale":
+            entry = self._index[self._key(make)]
+            self._revalidate_in_background(make)
+            return CacheResult(make, entry["models_data"], "stale")
+        return self._refresh(make)
+
+    def scrape_many(self, makes):
+        """
+        Runs ``scrape`` for several makes, fetching the due ones concurrently.
+
+        Returns:
+            dict: make -> CacheResult, in the order of ``makes``.
+        """
+        futures = {make: self._executor.submit(self.scrape, make) for make in makes}
+        return {make: future.result() for make, future in futures.items()}
+
+    def wait(self):
+        """Blocks until background refreshes have finished."""
+        while True:
+            with self._lock:
+                pending = list(self._revalidating.values())
+            if not pending:
+                return
+            for future in pending:
+                future.result()
+
+    def close(self):
+        """Waits for background refreshes and releases the session."""
+        self.wait()
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parse_ttl_overrides(values):
+    """Parses ["tesla=6", "ferrari=168"] (hours) into {make: seconds}."""
+    ttls = {}
+    for value in values:
+        make, _, hours = value.partition("=")
+        ttls[make] = float(hours) * 3600
+    return ttls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scrape makes through the Oxylabs proxy, skipping fresh ones."
+    )
+    parser.add_argument("--ttl", type=float, default=24, help="Default TTL in hours.")
+    parser.add_argument(
+        "--ttl-for",
+        action="append",
+        default=[],
+        metavar="MAKE=HOURS",
+        help="TTL override for one make (repeatable).",
+    )
+    parser.add_argument(
+        "--stale-while-revalidate",
+        type=float,
+        default=0,
+        help="Hours past the TTL during which cached data is served while refreshing.",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--endpoint", default=OXYLABS_ENDPOINT)
+    parser.add_argument(
+        "--storage", choices=["page", "lineup", "json"], default="page"
+    )
+    args = parser.parse_args()
+
+    USERNAME = os.environ.get("USERNAME")  # Get Oxylabs username from .env
+    PASSWORD = os.environ.get("PASSWORD")  # Get Oxylabs password from .env
+    BASE_URL = "https://www.cars.com/research/"
+    data_dir = "data"
+    os.makedirs(data_dir, exist_ok=True)
+
+    if USERNAME and PASSWORD:  # Check if USERNAME and PASSWORD are loaded
+        with ScrapeCache(
+            data_dir,
+            USERNAME,
+            PASSWORD,
+            BASE_URL,
+            default_ttl=args.ttl * 3600,
+            ttls=_parse_ttl_overrides(args.ttl_for),
+            stale_while_revalidate=args.stale_while_revalidate * 3600,
+            endpoint=args.endpoint,
+            storage=args.storage,
+            max_workers=args.workers,
+        ) as cache:
+            results = cache.scrape_many(MAKES)
+
+        counts = {}
+        for result in results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        print("\nScrape results by status:")
+        pprint(counts)
+        if not counts.get("changed") and not counts.get("stale"):
+            print("No lineup changed; main_script.py has nothing to rebuild.")
+    else:
+        print(
+            "Error: USERNAME and PASSWORD environment variables not set. "
+            "Make sure you have a .env file with USERNAME and PASSWORD defined."
+        )
@@ -1,102 +1,275 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 from dotenv import load_dotenv
+from lineup_parser import LineupExtractor
+from page_store import (
+    FULL_PAGE_DIR,
+    LEGACY_EXTENSION,
+    PAGE_EXTENSION,
+    write_lineup_page,
+    write_page,
+)
 
 load_dotenv()  # Load environment variables from .env file
 
+# Oxylabs realtime endpoint - can be pointed at a local stub (see stub_proxy.py)
+OXYLABS_ENDPOINT = "https://realtime.oxylabs.io/v1/queries"
 
-def scrape_car_models(make, username, password, base_url, data_dir):
+# HTTP status codes worth retrying (rate limiting and transient proxy errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+MAKES = [
+    "Acura",
+    "Alfa_Romeo",
+    "Aston_Martin",
+    "Audi",
+    "Bentley",
+    "BMW",
+    "Bugatti",
+    "Buick",
+    "Cadillac",
+    "Chevrolet",
+    "Chrysler",
+    "Dodge",
+    "Ferrari",
+    "FIAT",
+    "Fisker",
+    "Ford",
+    "Genesis",
+    "GMC",
+    "Honda",
+    "Hyundai",
+    "INEOS",
+    "INFINITI",
+    "Jaguar",
+    "Jeep",
+    "Kia",
+    "Lamborghini",
+    "Land_Rover",
+    "Lexus",
+    "Lincoln",
+    "Lotus",
+    "Lucid",
+    "Maserati",
+    "Mazda",
+    "McLaren",
+    "Mercedes_Benz",
+    "MINI",
+    "Mitsubishi",
+    "Nissan",
+    "Polestar",
+    "Porsche",
+    "RAM",
+    "Rivian",
+    "Rolls_Royce",
+    "Subaru",
+    "Suzuki",
+    "Tesla",
+    "Toyota",
+    "VinFast",
+    "Volkswagen",
+    "Volvo",
+]
+
+
+def research_url(make, base_url):
+    """Returns the cars.com research URL for a make."""
+    url_make = make.replace(" ", "_").lower()  # Convert make to URL-friendly format
+    return base_url + url_make + "/"
+
+
+def fetch_page_content(
+    make,
+    username,
+    password,
+    base_url,
+    session=None,
+    endpoint=OXYLABS_ENDPOINT,
+    timeout=None,
+):
     """
-    Scrapes car models and prices for a given make from cars.com research page
-    using Oxylabs proxy and saves the data to a JSON file.
+    Fetches the raw cars.com research page HTML for a make through the Oxylabs proxy.
 
     Args:
-        make (str): The car make to scrape (e.g., "tesla").
+        make (str): The car make to fetch (e.g., "tesla").
         username (str): Oxylabs username.
         password (str): Oxylabs password.
         base_url (str): Base URL for cars.com research.
-        data_dir (str): Directory to save the JSON output.
+        session (requests.Session, optional): Session to send the request with.
+            Falls back to a one-off ``requests.request`` call when not given.
+        endpoint (str): Oxylabs realtime endpoint URL.
+        timeout (float, optional): Request timeout in seconds.
 
     Returns:
-        list: A list of dictionaries containing model and price data, or None if scraping fails.
+        str: The HTML content of the page.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails.
+        json.JSONDecodeError: If the proxy response is not valid JSON.
     """
-    url_make = make.replace(" ", "_").lower()  # Convert make to URL-friendly format
-    url_to_scrape = base_url + url_make + "/"
+    url_to_scrape = research_url(make, base_url)
     payload = {"source": "universal", "url": url_to_scrape}
 
-    try:  # Add try-except block for request
-        response = requests.request(
-            "POST",
-            "https://realtime.oxylabs.io/v1/queries",
-            auth=(
-                username,
-                password,
-            ),  # Using the username and password passed as arguments
-            json=payload,
-        )
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+    http = session if session is not None else requests
+    response = http.request(
+        "POST",
+        endpoint,
+        auth=(
+            username,
+            password,
+        ),  # Using the username and password passed as arguments
+        json=payload,
+        timeout=timeout,
+    )
+    response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
 
-        html_content = response.json()["results"][0]["content"]
-        soup = BeautifulSoup(html_content, "html.parser")
+    return response.json()["results"][0]["content"]
 
-        models_data = []
-        model_list_items = soup.find_all(
-            "spark-card", class_="new-car-lineup-model-card"
-        )
 
-        for item in model_list_items:
-            model_name_element = item.find(
-                "div",
-                {
-                    "data-qa": lambda x: x
-                    and x.startswith(f"{make.lower().replace(' ', '_')}-")
-                },
-            )  # URL-safe make for data-qa prefix
-            if model_name_element:
-                link_element = model_name_element.find("a", {"data-card-link": ""})
-                if link_element:
-                    model_name_div = link_element.find(
-                        "div", class_="new-car-model-card-name"
-                    )
-                    if model_name_div:
-                        model_year_model_name = model_name_div.text.strip()
-                        parts = model_year_model_name.split(" ", 1)
-                        model_year = parts[0] if parts else "Year N/A"
-                        model_name = (
-                            parts[1] if len(parts) > 1 else model_year_model_name
-                        )
-
-                        price_element = item.find(
-                            "div", class_="new-car-model-card-price"
-                        )
-                        price = (
-                            price_element.text.strip()
-                            if price_element
-                            else "Price not found"
-                        )
-
-                        models_data.append(
-                            {"year": model_year, "model": model_name, "price": price}
-                        )
-                    else:
-                        print(
-                            f"Warning: 'div' tag with class 'new-car-model-card-name' not found inside 'a' tag for {make}."
-                        )  # More specific warning
-                else:
-                    print(
-                        f"Warning: 'a' tag with data-card-link not found in model_name_element for {make}."
-                    )  # More specific warning
-
-        filename = f"{make.lower().replace(' ', '_')}.json"  # URL-safe filename
-        filepath = os.path.join(data_dir, filename)
+def parse_models_data(html_content, make):
+    """
+    Extracts model and price data from the lineup cards of a research page.
+
+    Args:
+        html_content (str or bytes): The HTML content of the research page.
+        make (str): The car make the page belongs to.
+
+    Returns:
+        list: A list of {"year", "model", "price"} dicts, with year and price
+        converted to int where possible (price is None if not shown).
+    """
+
+    def warn(card, reason):
+        if reason == "no_link":
+            print(
+                f"Warning: 'a' tag with data-card-link not found in model_name_element for {make}."
+            )  # More specific warning
+        elif reason == "no_name":
+            print(
+                f"Warning: 'div' tag with class 'new-car-model-card-name' not found inside 'a' tag for {make}."
+            )  # More specific warning
+
+    extractor = LineupExtractor.for_make(make)
+    return [record._asdict() for record in extractor.iter_records(html_content, warn)]
+
+
+def save_page_content(
+    make, html_content, data_dir, storage="page", url=None, keep_full_page=False
+):
+    """
+    Saves the raw page content for a make to ``data_dir``.
+
+    Args:
+        make (str): The car make the page belongs to.
+        html_content (str): The HTML content of the page.
+        data_dir (str): Directory to save the page in.
+        storage (str): "page" for the full page in a compressed ``<make>.page``
+            file (see page_store.py), "lineup" for only the serialized lineup
+            cards in that file, or "json" for the legacy ``<make>.json`` dump.
+        url (str, optional): The scraped URL, recorded in the .page header.
+        keep_full_page (bool): With "lineup" storage, also save the full page
+            under ``data_dir/full/`` for debugging.
+
+    Returns:
+        str: The path of the written file.
+    """
+    url_safe_make = make.lower().replace(" ", "_")  # URL-safe filename
+    metadata = {"make": url_safe_make, "url": url}
+
+    if storage in ("page", "lineup"):
+        filepath = os.path.join(data_dir, url_safe_make + PAGE_EXTENSION)
+        if storage == "lineup":
+            full_header = write_lineup_page(filepath, html_content, metadata)
+            if keep_full_page:
+                full_dir = os.path.join(data_dir, FULL_PAGE_DIR)
+                os.makedirs(full_dir, exist_ok=True)
+                write_page(
+                    os.path.join(full_dir, url_safe_make + PAGE_EXTENSION),
+                    html_content,
+                    dict(metadata, fetched_at=full_header["fetched_at"]),
+                )
+        else:
+            write_page(filepath, html_content, metadata)
+        # Drop a legacy dump for the make so it cannot shadow the fresh page
+        legacy_filepath = os.path.join(data_dir, url_safe_make + LEGACY_EXTENSION)
+        if os.path.exists(legacy_filepath):
+            os.remove(legacy_filepath)
+    elif storage == "json":
+        filepath = os.path.join(data_dir, url_safe_make + LEGACY_EXTENSION)
         with open(filepath, "w") as outfile:
             json.dump(
                 {"results": [{"content": html_content}]}, outfile, indent=4
             )  # Save full content for debugging if needed
-        print(f"Data for {make.capitalize()} saved to: {filepath}")
+    else:
+        raise ValueError(f"Unknown storage format: {storage!r}")
+    print(f"Data for {make.capitalize()} saved to: {filepath}")
+    return filepath
+
+
+def scrape_car_models(
+    make,
+    username,
+    password,
+    base_url,
+    data_dir,
+    session=None,
+    endpoint=OXYLABS_ENDPOINT,
+    timeout=None,
+    storage="page",
+    keep_full_page=False,
+    retries=0,
+    backoff=1.0,
+):
+    """
+    Scrapes car models and prices for a given make from cars.com research page
+    using Oxylabs proxy and saves the raw page to ``data_dir``.
+
+    Args:
+        make (str): The car make to scrape (e.g., "tesla").
+        username (str): Oxylabs username.
+        password (str): Oxylabs password.
+        base_url (str): Base URL for cars.com research.
+        data_dir (str): Directory to save the raw page in.
+        session (requests.Session, optional): Session to reuse pooled connections.
+        endpoint (str): Oxylabs realtime endpoint URL.
+        timeout (float, optional): Request timeout in seconds.
+        storage (str): Raw page format: "page" (compressed), "lineup" (lineup
+            cards only) or "json" (legacy).
+        keep_full_page (bool): With "lineup" storage, also save the full page.
+        retries (int): Retries for rate limits, 5xx and connection errors (see
+            ``fetch_page_content_with_retry``).
+        backoff (float): Base delay in seconds for the exponential backoff.
+
+    Returns:
+        list: A list of dictionaries containing model and price data, or None if scraping fails.
+    """
+    try:  # Add try-except block for request
+        html_content = fetch_page_content_with_retry(
+            make,
+            username,
+            password,
+            base_url,
+            session,
+            endpoint,
+            timeout,
+            retries,
+            backoff,
+        )
+        models_data = parse_models_data(html_content, make)
+        save_page_content(
+            make,
+            html_content,
+            data_dir,
+            storage,
+            research_url(make, base_url),
+            keep_full_page,
+        )
 
         return models_data  # Return the scraped data
 
@@ -111,69 +284,191 @@ def scrape_car_models(make, username, password, base_url, data_dir):
         return None
 
 
+def create_session(pool_size):
+    """
+    Creates a ``requests.Session`` whose connection pool can serve ``pool_size``
+    concurrent requests to the proxy.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _is_retryable(error):
+    """Returns True for request errors that are worth another attempt."""
+    if isinstance(error, requests.exceptions.HTTPError):
+        return (
+            error.response is not None
+            and error.response.status_code in RETRY_STATUS_CODES
+        )
+    return isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    )
+
+
+def fetch_page_content_with_retry(
+    make,
+    username,
+    password,
+    base_url,
+    session=None,
+    endpoint=OXYLABS_ENDPOINT,
+    timeout=None,
+    retries=3,
+    backoff=1.0,
+):
+    """
+    ``fetch_page_content`` with retries for rate limits, 5xx and connection
+    errors, using exponential backoff with jitter.
+
+    Raises:
+        The last exception once the retries are used up, or straight away for
+        errors that are not worth retrying.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fetch_page_content(
+                make, username, password, base_url, session, endpoint, timeout
+            )
+        except requests.exceptions.RequestException as e:
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            delay = backoff * (2**attempt) * (1 + random.random())
+            print(
+                f"Retrying {make.capitalize()} in {delay:.1f}s "
+                f"(attempt {attempt + 1} of {retries}): {e}"
+            )
+            time.sleep(delay)
+
+
+def scrape_car_models_batch(
+    makes,
+    username,
+    password,
+    base_url,
+    data_dir,
+    max_workers=8,
+    timeout=60,
+    retries=3,
+    backoff=1.0,
+    endpoint=OXYLABS_ENDPOINT,
+    storage="page",
+    keep_full_page=False,
+):
+    """
+    Scrapes several makes concurrently over one pooled HTTP session.
+
+    Args:
+        makes (list): The car makes to scrape.
+        username (str): Oxylabs username.
+        password (str): Oxylabs password.
+        base_url (str): Base URL for cars.com research.
+        data_dir (str): Directory to save the raw pages in.
+        max_workers (int): Maximum number of requests in flight at once.
+        timeout (float or dict): Request timeout in seconds for each make, or a
+            dict of make -> timeout (makes missing from the dict get 60 seconds).
+        retries (int): Retries per make for rate limits, 5xx and connection errors.
+        backoff (float): Base delay in seconds for the exponential backoff.
+        endpoint (str): Oxylabs realtime endpoint URL.
+        storage (str): Raw page format: "page" (compressed), "lineup" (lineup
+            cards only) or "json" (legacy).
+        keep_full_page (bool): With "lineup" storage, also save the full pages.
+
+    Returns:
+        dict: make -> list of model dictionaries (as returned by
+        ``scrape_car_models``), or None for makes that failed. Keys follow the
+        order of ``makes``.
+    """
+    max_workers = max(1, min(max_workers, len(makes) or 1))
+    session = create_session(max_workers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                make: executor.submit(
+                    scrape_car_models,
+                    make,
+                    username,
+                    password,
+                    base_url,
+                    data_dir,
+                    session,
+                    endpoint,
+                    timeout.get(make, 60) if isinstance(timeout, dict) else timeout,
+                    storage,
+                    keep_full_page,
+                    retries,
+                    backoff,
+                )
+                for make in makes
+            }
+            return {make: future.result() for make, future in futures.items()}
+    finally:
+        session.close()
+
+
 if __name__ == "__main__":
     # Example usage if you want to run the scraper module directly for testing
+    parser = argparse.ArgumentParser(description="Scrape cars.com lineups via Oxylabs.")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent requests to the proxy."
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="Request timeout per make (s)."
+    )
+    parser.add_argument(
+        "--retries", type=int, default=3, help="Retries for transient errors."
+    )
+    parser.add_argument(
+        "--endpoint", default=OXYLABS_ENDPOINT, help="Oxylabs realtime endpoint."
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["page", "lineup", "json"],
+        default="page",
+        help="Raw page format: compressed full .page (default), lineup cards "
+        "only, or legacy .json.",
+    )
+    parser.add_argument(
+        "--keep-full-page",
+        action="store_true",
+        help="With --storage lineup, also save full pages to data/full/ for debugging.",
+    )
+    args = parser.parse_args()
+
     USERNAME = os.environ.get("USERNAME")  # Get Oxylabs username from .env
     PASSWORD = os.environ.get("PASSWORD")  # Get Oxylabs password from .env
     BASE_URL = "https://www.cars.com/research/"
-    MAKES = [
-        "Acura",
-        "Alfa_Romeo",
-        "Aston_Martin",
-        "Audi",
-        "Bentley",
-        "BMW",
-        "Bugatti",
-        "Buick",
-        "Cadillac",
-        "Chevrolet",
-        "Chrysler",
-        "Dodge",
-        "Ferrari",
-        "FIAT",
-        "Fisker",
-        "Ford",
-        "Genesis",
-        "GMC",
-        "Honda",
-        "Hyundai",
-        "INEOS",
-        "INFINITI",
-        "Jaguar",
-        "Jeep",
-        "Kia",
-        "Lamborghini",
-        "Land_Rover",
-        "Lexus",
-        "Lincoln",
-        "Lotus",
-        "Lucid",
-        "Maserati",
-        "Mazda",
-        "McLaren",
-        "Mercedes_Benz",
-        "MINI",
-        "Mitsubishi",
-        "Nissan",
-        "Polestar",
-        "Porsche",
-        "RAM",
-        "Rivian",
-        "Rolls_Royce",
-        "Subaru",
-        "Suzuki",
-        "Tesla",
-        "Toyota",
-        "VinFast",
-        "Volkswagen",
-        "Volvo",
-    ]
     data_dir = "data"
     os.makedirs(data_dir, exist_ok=True)
 
     if USERNAME and PASSWORD:  # Check if USERNAME and PASSWORD are loaded
-        for make in MAKES:
-            scrape_car_models(make, USERNAME, PASSWORD, BASE_URL, data_dir)
+        start = time.perf_counter()
+        results = scrape_car_models_batch(
+            MAKES,
+            USERNAME,
+            PASSWORD,
+            BASE_URL,
+            data_dir,
+            max_workers=args.workers,
+            timeout=args.timeout,
+            retries=args.retries,
+            endpoint=args.endpoint,
+            storage=args.storage,
+            keep_full_page=args.keep_full_page,
+        )
+        failed = [make for make, models_data in results.items() if models_data is None]
+        print(
+            f"\nScraped {len(results) - len(failed)} of {len(results)} makes "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
+        if failed:
+            print("Failed makes:")
+            pprint(failed)
     else:
         print(
             "Error: USERNAME and PASSWORD environment variables not set. "
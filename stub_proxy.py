@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from page_store import MODEL_PAGE_DIR, find_raw_page, load_raw_page
+
+DEFAULT_PORT = 8765  # For the CLI; start_stub_proxy picks a free port
+
+
+class StubProxyHandler(BaseHTTPRequestHandler):
+    """
+    Answers Oxylabs realtime queries from the raw pages saved in ``data_dir``.
+
+    The make is taken from the last path segment of the requested cars.com URL,
+    so ``https://www.cars.com/research/land_rover/`` is served from
+    ``data/land_rover.page`` or ``data/land_rover.json``. Model pages such as
+    ``/research/tesla-model_y-2025/`` are served from ``data/models/``.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"message": "Invalid JSON payload"})
+            return
+
+        make = payload.get("url", "").rstrip("/").rsplit("/", 1)[-1].lower()
+        server = self.server
+
+        with server.lock:
+            server.request_counts[make] = server.request_counts.get(make, 0) + 1
+            attempt = server.request_counts[make]
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        if attempt <= server.failures.get(make, 0):
+            self._send(503, {"message": f"Simulated failure for {make}"})
+            return
+
+        filepath = find_raw_page(
+            os.path.join(server.data_dir, MODEL_PAGE_DIR), make
+        ) or find_raw_page(server.data_dir, make)
+        html_content = load_raw_page(filepath) if filepath else None
+        if html_content is None:
+            self._send(404, {"message": f"No saved page for {make}"})
+            return
+
+        self._send(200, {"results": [{"content": html_content}]})
+
+    def _send(self, status, payload):
+        self._send_bytes(status, json.dumps(payload).encode("utf-8"))
+
+    def _send_bytes(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test and benchmark output quiet
+
+
+def start_stub_proxy(data_dir="data", host="127.0.0.1", port=0, delay=0.0, failures=None):
+    """
+    Starts a local stand-in for the Oxylabs realtime endpoint in a background thread.
+
+    Args:
+        data_dir (str): Directory holding the saved raw pages to serve.
+        host (str): Interface to bind to.
+        port (int): Port to bind to (0 picks a free port).
+        delay (float): Seconds to wait before answering each request, to mimic
+            proxy latency.
+        failures (dict, optional): make -> number of initial requests that should
+            fail with HTTP 503, for exercising retries.
+
+    Returns:
+        tuple: (server, endpoint_url). Call ``server.shutdown()`` when done.
+    """
+    server = ThreadingHTTPServer((host, port), StubProxyHandler)
+    server.daemon_threads = True
+    server.data_dir = data_dir
+    server.delay = delay
+    server.failures = {make.lower(): count for make, count in (failures or {}).items()}
+    server.request_counts = {}
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    endpoint = f"http://{host}:{server.server_address[1]}/v1/queries"
+    return server, endpoint
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved pages as a stub Oxylabs proxy.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, endpoint = start_stub_proxy(args.data_dir, port=args.port, delay=args.delay)
+    print(f"Stub proxy serving {args.data_dir} at {endpoint}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+
+
+@pytest.fixture
+def stub_proxy():
+    """
+    Starts stub proxies; yields ``start(data_dir=DATA_DIR, **options)``, which
+    returns (server, endpoint) as ``stub_proxy.start_stub_proxy`` does. Every
+    proxy started is shut down after the test.
+    """
+    from stub_proxy import start_stub_proxy
+
+    servers = []
+
+    def start(data_dir=DATA_DIR, **options):
+        server, endpoint = start_stub_proxy(str(data_dir), **options)
+        servers.append(server)
+        return server, endpoint
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
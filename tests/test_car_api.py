@@ -0,0 +1,203 @@
+import http.client
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import stub_proxy
+from car_api import DEFAULT_PORT, CarQueryService, QueryError, serve_in_background
+from conftest import ROOT_DIR
+
+
+@pytest.fixture(scope="module")
+def service():
+    return CarQueryService.from_file(f"{ROOT_DIR}/complete.json")
+
+
+def start_client(service):
+    server = serve_in_background(service)
+    port = server.server_address[1]
+
+    def get(path):
+        """Returns (status, body, headers); JSON bodies are decoded."""
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read().decode("utf-8")
+            headers = dict(response.getheaders())
+            if headers["Content-Type"].startswith("application/json"):
+                body = json.loads(body)
+            return response.status, body, headers
+        finally:
+            connection.close()
+
+    return server, get
+
+
+@pytest.fixture(scope="module")
+def get(service):
+    server, get = start_client(service)
+    yield get
+    server.shutdown()
+    server.server_close()
+
+
+def filtered(car_df, brands, years, prices):
+    """The plain pandas filter the service's queries should agree with."""
+    return car_df[
+        car_df["Brand"].isin(brands)
+        & car_df["Year"].between(*years)
+        & car_df["Price"].between(*prices)
+    ]
+
+
+def test_models_match_a_pandas_filter(get, service):
+    status, models, headers = get(
+        "/models?brand=tesla,bmw&year_min=2025&price_min=40000&price_max=90000"
+    )
+
+    expected = filtered(
+        service.index.car_df, ["Bmw", "Tesla"], (2025, 2100), (40000, 90000)
+    )
+    assert status == 200
+    assert int(headers["X-Total-Count"]) == len(expected) == len(models)
+    assert sorted(model["Model"] for model in models) == sorted(expected["Model"])
+    prices = [model["Price"] for model in models]
+    assert prices == sorted(prices)
+
+
+def test_models_are_paged_in_sort_order(get):
+    _, everything, _ = get("/models?brand=bmw&sort=year&order=desc")
+    _, page, headers = get("/models?brand=bmw&sort=year&order=desc&limit=5&offset=3")
+
+    assert int(headers["X-Total-Count"]) == len(everything)
+    assert page == everything[3:8]
+    years = [model["Year"] for model in everything]
+    assert years == sorted(years, reverse=True)
+
+
+def test_stats_match_a_pandas_groupby(get, service):
+    status, stats, _ = get("/stats?brand=audi&brand=tesla")
+
+    car_df = service.index.car_df
+    expected = (
+        car_df[car_df["Brand"].isin(["Audi", "Tesla"])]
+        .groupby("Brand", observed=True)["Price"]
+        .agg(["count", "min", "max", "mean"])
+    )
+    assert status == 200
+    assert [row["Brand"] for row in stats] == ["Audi", "Tesla"]
+    for row in stats:
+        count, low, high, mean = expected.loc[row["Brand"]]
+        assert row["Models"] == count
+        assert row["Minimum Price"] == low
+        assert row["Maximum Price"] == high
+        assert row["Average Price"] == pytest.approx(mean, abs=0.01)
+
+
+def test_csv_format(get):
+    status, body, headers = get("/cheapest?n=2&brand=tesla&format=csv")
+
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/csv")
+    frame = pd.read_csv(io.StringIO(body))
+    assert list(frame.columns) == [
+        "Brand",
+        "Year",
+        "Model",
+        "Price",
+        "Price Max",
+        "Price Outlier",
+    ]
+    assert len(frame) == 2
+
+
+def test_unknown_path_is_not_found(get):
+    status, body, _ = get("/nothing")
+
+    assert status == 404
+    assert body["error"]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/models?year_min=abc",
+        "/models?year_min=2026&year_max=2020",
+        "/models?price_min=nan",
+        "/models?price_max=nan",
+        "/models?price_max=inf",
+        "/models?price_min=-inf",
+        "/stats?price_min=nan",
+        "/models?brand=nosuch",
+        "/models?sort=colour",
+        "/models?order=up",
+        "/models?limit=-1",
+        "/models?offset=-1",
+        "/models?format=xml",
+    ],
+)
+def test_bad_filter_params_are_rejected(get, path):
+    status, body, _ = get(path)
+
+    assert status == 400
+    assert body["error"]
+
+
+def test_non_finite_bounds_are_rejected_without_http(service):
+    with pytest.raises(QueryError):
+        service.make_query(price_range=(float("nan"), None))
+
+
+def test_cheapest_returns_n_models_in_price_order(get):
+    status, models, _ = get("/cheapest?n=3&brand=tesla")
+
+    assert status == 200
+    assert len(models) == 3
+    assert [model["Brand"] for model in models] == ["Tesla"] * 3
+    prices = [model["Price"] for model in models]
+    assert prices == sorted(prices)
+
+
+@pytest.mark.parametrize("n", ["-1", "0", "2.5", "ten"])
+def test_cheapest_rejects_invalid_n(get, n):
+    status, body, _ = get(f"/cheapest?n={n}")
+
+    assert status == 400
+    assert "n" in body["error"]
+
+
+def test_cheapest_rejects_invalid_n_without_http(service):
+    with pytest.raises(QueryError):
+        service.cheapest(-1)
+
+
+def test_fully_quarantined_dataset_serves_empty_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No columnar copy next to it
+    complete_filepath = tmp_path / "complete.json"
+    complete_filepath.write_text(
+        json.dumps({"Tesla": [{"year": "TBD", "model": "Roadster", "price": "TBD"}]})
+    )
+    empty_service = CarQueryService.from_file(str(complete_filepath))
+    server, get = start_client(empty_service)
+    try:
+        status, health, _ = get("/health")
+        assert status == 200
+        assert health["models"] == 0
+        assert health["year_range"] == [None, None]
+
+        for path in ("/models", "/cheapest?n=3", "/stats", "/models?year_min=2020"):
+            status, body, headers = get(path)
+            assert status == 200
+            assert body == []
+        assert get("/models")[2]["X-Total-Count"] == "0"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_default_port_differs_from_the_stub_proxy():
+    # The load test runs both side by side
+    assert DEFAULT_PORT != stub_proxy.DEFAULT_PORT
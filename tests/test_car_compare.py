@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from car_compare import BAND_PERCENTILES, PriceComparator, percentile_rank
+
+CARS = pd.DataFrame(
+    {
+        "Brand": ["Audi", "Audi", "Audi", "Kia", "Kia", "Kia", "Lotus"],
+        "Year": [2024, 2025, 2025, 2024, 2025, 2025, 2025],
+        "Model": ["A3", "A4", "Q7", "Rio", "Niro", "EV9", "Emira"],
+        "Price": [35000, 45000, 60000, 18000, 27000, 45000, np.nan],
+    }
+)
+
+
+def brute_force_rank(prices, price):
+    prices = list(prices)
+    below = sum(other < price for other in prices)
+    equal = sum(other == price for other in prices)
+    return (below + equal / 2) / len(prices) * 100
+
+
+@pytest.fixture(scope="module")
+def comparator():
+    return PriceComparator(CARS)
+
+
+@pytest.mark.parametrize("price", [0, 18000, 30000, 45000, 60000, 99000])
+def test_percentile_rank_counts_ties_as_half_below(price):
+    prices = CARS["Price"].dropna().sort_values().to_numpy()
+
+    assert percentile_rank(prices, price) == pytest.approx(
+        brute_force_rank(prices, price)
+    )
+
+
+def test_percentile_rank_of_no_prices_is_nan():
+    assert np.isnan(percentile_rank(np.array([]), 45000))
+    assert np.isnan(percentile_rank(np.array([]), [1, 2])).all()
+
+
+def test_percentiles_of_every_row(comparator):
+    priced = CARS.dropna(subset=["Price"])
+    for position, car in priced.iterrows():
+        percentiles = comparator.percentiles.iloc[position]
+        same_brand = priced[priced["Brand"] == car["Brand"]]["Price"]
+        same_year = priced[priced["Year"] == car["Year"]]["Price"]
+
+        assert percentiles["Overall"] == pytest.approx(
+            brute_force_rank(priced["Price"], car["Price"])
+        )
+        assert percentiles["Brand"] == pytest.approx(
+            brute_force_rank(same_brand, car["Price"])
+        )
+        assert percentiles["Year"] == pytest.approx(
+            brute_force_rank(same_year, car["Price"])
+        )
+
+
+def test_unpriced_rows_and_brands_have_nan_percentiles(comparator):
+    assert comparator.percentiles.iloc[6].isna().all()  # Lotus has no price
+
+
+def test_bands_match_numpy_percentiles(comparator):
+    priced = CARS.dropna(subset=["Price"])
+
+    assert list(comparator.bands.index) == ["All brands", "Audi", "Kia"]
+    assert list(comparator.bands.loc["All brands"]) == pytest.approx(
+        np.percentile(priced["Price"], BAND_PERCENTILES)
+    )
+    for brand, prices in priced.groupby("Brand")["Price"]:
+        assert list(comparator.bands.loc[brand]) == pytest.approx(
+            np.percentile(prices, BAND_PERCENTILES)
+        )
+
+
+def test_bands_of_an_unpriced_catalogue_are_nan():
+    comparator = PriceComparator(CARS.assign(Price=np.nan))
+
+    assert list(comparator.bands.index) == ["All brands"]
+    assert comparator.bands.isna().all(axis=None)
+    assert comparator.percentiles.isna().all(axis=None)
+
+
+def test_neighbours_are_in_the_price_window_closest_first(comparator):
+    neighbours = comparator.neighbours(1, tolerance=0.25)  # Audi A4, $45,000
+
+    assert list(neighbours["Model"]) == ["EV9", "A3"]
+    assert list(neighbours["Difference (USD)"]) == [0, -10000]
+    assert list(comparator.neighbours(1, 0.25, other_brands=True)["Model"]) == ["EV9"]
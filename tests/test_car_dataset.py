@@ -0,0 +1,59 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from car_dataset import (
+    NdjsonWriter,
+    iter_ndjson_batches,
+    normalize_car_data,
+    read_json_dataset,
+    read_ndjson_dataset,
+)
+from conftest import ROOT_DIR
+
+COMPLETE_FILEPATH = os.path.join(ROOT_DIR, "complete.json")
+
+
+def write_ndjson(company_cars_data, filepath):
+    with NdjsonWriter(str(filepath)) as writer:
+        for brand, models in company_cars_data.items():
+            writer.write_make(brand, models)
+    return writer
+
+
+def test_ndjson_read_in_batches_equals_complete_json(tmp_path):
+    with open(COMPLETE_FILEPATH) as infile:
+        company_cars_data = json.load(infile)
+    ndjson_filepath = tmp_path / "complete.ndjson"
+    writer = write_ndjson(company_cars_data, ndjson_filepath)
+
+    expected = read_json_dataset(COMPLETE_FILEPATH)
+    batches = list(iter_ndjson_batches(str(ndjson_filepath), batch_size=997))
+    assert len(batches) == -(-writer.rows // 997)
+    assert sum(len(batch.frame) for batch in batches) == len(expected)
+
+    car_df = read_ndjson_dataset(str(ndjson_filepath), batch_size=997)
+    pd.testing.assert_frame_equal(car_df, expected)
+
+
+def test_failed_ndjson_write_keeps_the_previous_file(tmp_path):
+    filepath = tmp_path / "complete.ndjson"
+    filepath.write_text("previous\n")
+
+    with pytest.raises(RuntimeError):
+        with NdjsonWriter(str(filepath)) as writer:
+            writer.write_make("Tesla", [{"year": 2025, "model": "Model Y", "price": 1}])
+            raise RuntimeError("build failed")
+
+    assert filepath.read_text() == "previous\n"
+
+
+def test_empty_ndjson_reads_as_an_empty_frame(tmp_path):
+    filepath = tmp_path / "complete.ndjson"
+    filepath.write_text("")
+
+    car_df = read_ndjson_dataset(str(filepath))
+    assert car_df.empty
+    assert list(car_df.columns) == list(normalize_car_data({}).frame.columns)
@@ -0,0 +1,135 @@
+import math
+
+import pandas as pd
+import pytest
+
+from car_normalize import (
+    flag_price_outliers,
+    normalize_car_frame,
+    parse_prices,
+    parse_years,
+)
+
+# (raw price, low, high); the raw pages give "$44,990", the rest covers what
+# the extraction passes through when a card's text is not a plain amount
+PRICES = [
+    ("$44,990", 44990, 44990),
+    (44990, 44990, 44990),
+    ("44990", 44990, 44990),
+    ("$107,900", 107900, 107900),
+    ("Starting at $44,990", 44990, 44990),
+    ("From $44,990 MSRP", 44990, 44990),
+    ("USD 50,000.50", 50000.5, 50000.5),
+    ("Matador: $30,000", 30000, 30000),  # "at" inside a word is not noise
+    ("$39,990 - $45,990", 39990, 45990),
+    ("$39,990–$45,990", 39990, 45990),
+    ("$39,990 to $45,990", 39990, 45990),
+    ("$45,990 - $39,990", 39990, 45990),  # Swapped bounds are reordered
+    ("MSRP TBD", None, None),
+    ("Price not found", None, None),
+    ("Call for price", None, None),
+    ("$0", None, None),
+    (None, None, None),
+]
+
+# (raw year, year); the raw pages give the year as the first word of the name
+YEARS = [
+    (2025, 2025),
+    ("2025", 2025),
+    ("MY 2025", 2025),
+    ("MY2025", 2025),
+    ("2025MY", 2025),
+    ("2025 Tesla Model Y", 2025),
+    ("12025", None),
+    ("1899", None),
+    (2025.5, None),
+    ("TBD", None),
+    (None, None),
+]
+
+
+def as_optional(value):
+    return None if math.isnan(value) else value
+
+
+@pytest.mark.parametrize("raw, low, high", PRICES)
+def test_parse_prices(raw, low, high):
+    lows, highs, _, _ = parse_prices(pd.Series([raw], dtype=object))
+
+    assert as_optional(lows[0]) == low
+    assert as_optional(highs[0]) == high
+
+
+def test_parse_prices_counts_text_and_ranges():
+    raw = pd.Series([price for price, _, _ in PRICES], dtype=object)
+
+    _, _, coerced, ranges = parse_prices(raw)
+
+    assert coerced == 11  # Every formatted text with an amount, "$0" included
+    assert ranges == 4
+
+
+@pytest.mark.parametrize("raw, year", YEARS)
+def test_parse_years(raw, year):
+    years, _ = parse_years(pd.Series([raw], dtype=object))
+
+    assert as_optional(years[0]) == year
+
+
+def raw_frame(rows):
+    return pd.DataFrame(rows, columns=["Brand", "Year", "Model", "Price"], dtype=object)
+
+
+def test_rows_without_a_usable_year_or_price_are_quarantined():
+    normalized = normalize_car_frame(
+        raw_frame(
+            [
+                ("Tesla", 2025, "Model Y", "$44,990"),
+                ("Tesla", "TBD", "Roadster", "$200,000"),
+                ("Tesla", "MY2025", "Model 3", "MSRP TBD"),
+                ("Tesla", "2025", "Cybertruck", "$79,990 - $99,990"),
+            ]
+        )
+    )
+
+    assert list(normalized.frame["Model"]) == ["Model Y", "Cybertruck"]
+    assert normalized.frame["Year"].dtype == "int64"
+    assert list(normalized.frame["Price"]) == [44990, 79990]
+    assert list(normalized.frame["Price Max"]) == [44990, 99990]
+    assert list(normalized.quarantine["Model"]) == ["Roadster", "Model 3"]
+    assert list(normalized.quarantine["Reason"]) == ["year", "price"]
+    assert normalized.report._asdict() == {
+        "rows": 2,
+        "coerced_years": 1,  # "2025" converts directly
+        "coerced_prices": 3,
+        "price_ranges": 1,
+        "quarantined": 2,
+        "outliers": 0,
+    }
+
+
+def test_outliers_are_flagged_per_brand():
+    brands = pd.Series(["Kia"] * 4 + ["Bugatti"] * 2)
+    prices = pd.Series([20000.0, 22000, 24000, 400000, 3000000, 3500000])
+
+    flags = flag_price_outliers(brands, prices)
+
+    # 10x the Kia median, but not compared with Bugatti's
+    assert list(flags) == [False, False, False, True, False, False]
+    assert not flag_price_outliers(brands, prices, ratio=100).any()
+
+
+def test_outlier_flagging_can_be_left_for_later():
+    normalized = normalize_car_frame(
+        raw_frame(
+            [
+                ("Kia", 2025, "A", 20000),
+                ("Kia", 2025, "B", 21000),
+                ("Kia", 2025, "C", 900000),
+            ]
+        ),
+        outlier_ratio=None,
+    )
+
+    assert not normalized.frame["Price Outlier"].any()
+    assert normalized.report.outliers == 0
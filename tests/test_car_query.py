@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from car_dataset import read_json_dataset
+from car_query import CarIndex
+from conftest import ROOT_DIR
+
+
+@pytest.fixture(scope="module")
+def car_df():
+    return read_json_dataset(f"{ROOT_DIR}/complete.json")
+
+
+@pytest.fixture(scope="module")
+def car_index(car_df):
+    return CarIndex(car_df)
+
+
+def filtered(car_df, brands, year_range, price_range):
+    """The boolean-mask filter the index replaces."""
+    return car_df[
+        car_df["Brand"].isin(brands)
+        & car_df["Year"].between(*year_range)
+        & car_df["Price"].between(*price_range)
+    ]
+
+
+def assert_matches_pandas(car_index, brands, year_range, price_range):
+    result = car_index.query(brands, year_range, price_range)
+    expected = filtered(car_index.car_df, brands, year_range, price_range)
+
+    pd.testing.assert_frame_equal(result.frame, expected)
+    assert list(result.positions) == list(expected.index)
+
+    expected_stats = (
+        expected.groupby("Brand")["Price"].agg(["count", "min", "max", "mean"])
+    )
+    assert list(result.stats.index) == list(expected_stats.index)
+    assert list(result.stats["count"]) == list(expected_stats["count"])
+    for column in ("min", "max", "mean"):
+        assert list(result.stats[column]) == pytest.approx(
+            list(expected_stats[column])
+        )
+
+
+@pytest.mark.parametrize(
+    "brands, year_range, price_range",
+    [
+        (["Tesla"], (2000, 2100), (0, 10**7)),
+        (["Audi", "Bmw", "Tesla"], (2025, 2025), (40000, 90000)),
+        (["Toyota", "Honda", "Kia"], (2024, 2026), (25000, 35000)),
+        (["Ford", "Nosuch"], (2020, 2030), (30000, 60000)),
+        (["Porsche"], (2030, 2040), (0, 10**7)),
+        (["Bmw"], (2000, 2100), (90000, 10000)),
+        ([], (2000, 2100), (0, 10**7)),
+    ],
+)
+def test_query_matches_a_pandas_filter(car_index, brands, year_range, price_range):
+    assert_matches_pandas(car_index, brands, year_range, price_range)
+
+
+def test_every_brand_over_the_full_range_is_the_whole_frame(car_index, car_df):
+    result = car_index.query(car_index.brands, (2000, 2100), (0, 10**7))
+
+    assert len(result.frame) == len(car_df)
+    assert result.stats["count"].sum() == len(car_df)
+
+
+def test_bounds_on_existing_prices_are_inclusive(car_index):
+    prices = np.sort(car_index.car_df["Price"].unique())
+    for price_range in [(prices[0], prices[10]), (prices[5], prices[5])]:
+        assert_matches_pandas(car_index, car_index.brands, (2000, 2100), price_range)
+
+
+def test_ties_and_unpriced_rows_match_a_pandas_filter():
+    car_index = CarIndex(
+        pd.DataFrame(
+            {
+                "Brand": ["Kia", "Kia", "Kia", "Audi", "Audi", "Kia"],
+                "Year": [2025, 2024, 2025, 2025, 2025, 2025],
+                "Model": ["Rio", "Niro", "EV6", "A3", "A4", "EV9"],
+                "Price": [20000.0, 27000.0, 20000.0, np.nan, 45000.0, 55000.0],
+            },
+            index=[10, 11, 12, 13, 14, 15],  # Reset by the index
+        )
+    )
+
+    assert_matches_pandas(car_index, ["Kia", "Audi"], (2024, 2025), (0, 10**7))
+    assert_matches_pandas(car_index, ["Kia"], (2025, 2025), (20000, 20000))
+    assert car_index.min_price == 20000
+    assert car_index.max_price == 55000
+
+
+def test_empty_frame_has_no_bounds_and_matches_nothing(car_df):
+    car_index = CarIndex(car_df.iloc[:0])
+
+    assert car_index.brands == []
+    assert car_index.min_year is None and car_index.max_price is None
+    result = car_index.query(["Tesla"], (2000, 2100), (0, 10**7))
+    assert result.frame.empty
+    assert result.stats.empty
+
+
+SORT_KEYS = [
+    (("Price", "Brand", "Year", "Model"), (False, True, True, True)),
+    (("Price", "Brand", "Year", "Model"), (True, True, True, True)),
+    (("Year", "Price"), (False, True)),
+    (("Brand",), (True,)),
+]
+
+
+@pytest.mark.parametrize("by, ascending", SORT_KEYS)
+def test_sort_order_matches_sort_values(car_index, car_df, by, ascending):
+    expected = car_df.sort_values(by=list(by), ascending=list(ascending), kind="stable")
+
+    order = car_index.sort_order(by, ascending)
+    assert list(order) == list(expected.index)
+    assert car_index.sort_order(by, ascending) is order  # Computed once
+
+
+@pytest.mark.parametrize("by, ascending", SORT_KEYS)
+@pytest.mark.parametrize("page_size", [1, 7, 25, 1000])
+def test_pages_of_sorted_positions_match_sort_values(car_index, by, ascending, page_size):
+    result = car_index.query(["Audi", "Bmw", "Tesla", "Kia"], (2024, 2026), (0, 10**7))
+    expected = result.frame.sort_values(
+        by=list(by), ascending=list(ascending), kind="stable"
+    )
+
+    positions = car_index.sorted_positions(result.positions, by, ascending)
+    assert sorted(positions) == list(result.positions)
+    for start in range(0, len(positions) + page_size, page_size):
+        page = car_index.car_df.iloc[positions[start : start + page_size]]
+        pd.testing.assert_frame_equal(page, expected.iloc[start : start + page_size])
+
+
+def test_sorted_positions_of_nothing_is_empty(car_index):
+    positions = car_index.sorted_positions(np.array([], int), ("Price",), (True,))
+
+    assert len(positions) == 0
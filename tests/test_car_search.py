@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from car_search import PREFIX_SCORE, SearchIndex, index_tokens, tokenize
+
+CARS = pd.DataFrame(
+    [
+        ("Ford", 2024, "F-150"),
+        ("Ford", 2025, "F-150 Lightning"),
+        ("Ford", 2025, "Mustang Mach-E"),
+        ("Land Rover", 2024, "Range Rover"),
+        ("Land Rover", 2025, "Range Rover Sport"),
+        ("Honda", 2024, "Civic"),
+        ("Honda", 2025, "Civic"),
+        ("Kia", 2025, "Niro"),
+        ("Kia", 2025, "Niro EV"),
+        ("Kia", 2025, "Niroplus"),
+        ("Kia", 2025, "Nirro"),
+    ],
+    columns=["Brand", "Year", "Model"],
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(CARS)
+
+
+def models(index, query, **options):
+    result = index.search(query, **options)
+    return list(CARS["Model"].iloc[result.positions])
+
+
+def test_tokens_drop_punctuation():
+    assert tokenize("Ford F-150 XL") == ["ford", "f150", "xl"]
+    assert tokenize("F150") == tokenize("f-150") == ["f150"]
+    assert index_tokens("Mercedes-AMG GT") == ["mercedesamg", "gt", "mercedes", "amg"]
+
+
+@pytest.mark.parametrize("query", ["f150", "F-150", "f 150", "ford f150"])
+def test_punctuated_models_match_with_or_without_punctuation(index, query):
+    assert models(index, query) == ["F-150", "F-150 Lightning"]
+
+
+def test_a_part_of_a_punctuated_word_matches(index):
+    assert models(index, "mach") == ["Mustang Mach-E"]
+    assert models(index, "mach-e") == ["Mustang Mach-E"]
+
+
+def test_misspelled_words_are_tolerated(index):
+    assert models(index, "rang rovr sport") == ["Range Rover Sport"]
+    assert models(index, "civc") == ["Civic", "Civic"]
+
+
+def test_exact_matches_rank_before_prefix_and_typo_matches(index):
+    result = index.search("niro")
+
+    assert list(CARS["Model"].iloc[result.positions]) == [
+        "Niro",
+        "Niro EV",
+        "Niroplus",
+        "Nirro",
+    ]
+    assert list(result.scores[:3]) == [1.0, 1.0, PREFIX_SCORE]
+    assert 0 < result.scores[3] < PREFIX_SCORE
+
+
+def test_every_word_must_match(index):
+    assert models(index, "range rover") == ["Range Rover", "Range Rover Sport"]
+    assert models(index, "range rover sport") == ["Range Rover Sport"]
+    assert models(index, "civic sport") == []
+
+
+def test_years_filter_instead_of_matching_text(index):
+    result = index.search("2024 civic")
+
+    assert list(CARS["Year"].iloc[result.positions]) == [2024]
+    assert list(CARS["Year"].iloc[index.search("2025").positions]) == [2025] * 8
+
+
+def test_limit(index):
+    assert models(index, "kia", limit=2) == ["Niro", "Niro EV"]
+    assert models(index, "") == []
@@ -0,0 +1,208 @@
+import functools
+
+import pytest
+from bs4 import BeautifulSoup
+
+import main_script
+from conftest import DATA_DIR
+from lineup_parser import LineupExtractor, iter_lineup_cards, serialize_lineup
+from page_store import find_raw_page, list_stored_makes, load_raw_page
+from scraper_module import parse_models_data
+
+MAKES = sorted(list_stored_makes(DATA_DIR))
+
+
+@functools.lru_cache(maxsize=None)
+def raw_page(make):
+    return load_raw_page(find_raw_page(DATA_DIR, make))
+
+
+@functools.lru_cache(maxsize=None)
+def soup_cards(html_content, data_qa_prefix):
+    """
+    The lineup cards as the BeautifulSoup lookups of the original
+    main_script.py find them: (has_model_element, has_link, link, name, price).
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    cards = []
+    for item in soup.find_all("spark-card", class_="new-car-lineup-model-card"):
+        model_name_element = item.find(
+            "div", {"data-qa": lambda x: x and x.startswith(data_qa_prefix)}
+        )
+        link_element = (
+            model_name_element.find("a", {"data-card-link": ""})
+            if model_name_element
+            else None
+        )
+        model_name_div = (
+            link_element.find("div", class_="new-car-model-card-name")
+            if link_element
+            else None
+        )
+        price_element = item.find("div", class_="new-car-model-card-price")
+        cards.append(
+            (
+                model_name_element is not None,
+                link_element is not None,
+                link_element.get("href") if link_element else None,
+                model_name_div.text.strip() if model_name_div else None,
+                price_element.text.strip() if price_element else None,
+            )
+        )
+    return tuple(cards)
+
+
+def streamed_cards(html_content, data_qa_prefix):
+    return tuple(
+        (card.has_model_element, card.has_link, card.link, card.name, card.price)
+        for card in iter_lineup_cards(html_content, data_qa_prefix)
+    )
+
+
+def card(model=None, link=True, name=True, price="$44,990", make="tesla"):
+    """Markup of one lineup card, with the given parts left out."""
+    name_div = '<div class="new-car-model-card-name">2025 Tesla Model Y</div>'
+    link_tag = (
+        f'<a data-card-link href="/research/tesla-model_y-2025/">'
+        f'{name_div if name else "<div>2025 Tesla Model Y</div>"}</a>'
+        if link
+        else (name_div if name else "")
+    )
+    price_div = (
+        f'<div class="new-car-model-card-price">{price}</div>' if price else ""
+    )
+    return (
+        '<spark-card class="new-car-lineup-model-card">'
+        f'<div data-qa="{model or make}-model-name">{link_tag}</div>'
+        f"{price_div}</spark-card>"
+    )
+
+
+@pytest.mark.parametrize("make", MAKES)
+def test_cards_match_beautifulsoup_on_every_saved_page(make):
+    html_content = raw_page(make)
+    prefix = f"{make}-"
+
+    assert streamed_cards(html_content, prefix) == soup_cards(html_content, prefix)
+
+
+@pytest.mark.parametrize(
+    "html_content",
+    [
+        card(),
+        card(link=False),
+        card(name=False),
+        card(price=None),
+        card(price="MSRP TBD"),
+        card(model="audi"),  # Another make's card (e.g., a promo)
+        card(link=False, price=None) + card() + card(name=False),
+        "<spark-card-carousel>" + card() + "</spark-card-carousel>",
+        '<spark-card class="promo"><div data-qa="tesla-x"></div></spark-card>',
+    ],
+    ids=[
+        "complete",
+        "no-link",
+        "no-name",
+        "no-price",
+        "text-price",
+        "other-make",
+        "mixed",
+        "in-carousel",
+        "not-a-lineup-card",
+    ],
+)
+def test_cards_match_beautifulsoup_on_partial_cards(html_content):
+    page = f"<html><body><div>{html_content}</div></body></html>"
+
+    assert streamed_cards(page, "tesla-") == soup_cards(page, "tesla-")
+
+
+def soup_records(html_content, data_qa_prefix):
+    """
+    The (year, model, price) records of the original main_script.py, with its
+    int conversions, plus the reason each skipped card was skipped.
+    """
+    records, skipped = [], []
+    cards = soup_cards(html_content, data_qa_prefix)
+    for has_model, has_link, _, name, price in cards:
+        if not has_model:
+            skipped.append("no_model_element")
+        elif not has_link:
+            skipped.append("no_link")
+        elif name is None:
+            skipped.append("no_name")
+        else:
+            parts = name.split(" ", 1)
+            year = parts[0] if parts else "Year N/A"
+            model = parts[1] if len(parts) > 1 else name
+            try:
+                year = int(year)
+            except ValueError:
+                pass
+            if price is not None:
+                try:
+                    price = int(price.replace("$", "").replace(",", ""))
+                except ValueError:
+                    pass
+            records.append((year, model, price))
+    return records, skipped
+
+
+def extractor_records(html_content, make):
+    skipped = []
+    records = LineupExtractor.for_make(make).iter_records(
+        html_content, lambda card, reason: skipped.append(reason)
+    )
+    return [tuple(record) for record in records], skipped
+
+
+@pytest.mark.parametrize("make", MAKES)
+def test_records_match_beautifulsoup_on_every_saved_page(make):
+    html_content = raw_page(make)
+    expected = soup_records(html_content, f"{make}-")
+
+    assert extractor_records(html_content, make) == expected
+    # Pages may come as bytes, or as the lineup-only fragment stored instead
+    assert extractor_records(html_content.encode("utf-8"), make) == expected
+    assert extractor_records(serialize_lineup(html_content), make) == expected
+
+
+@pytest.mark.parametrize(
+    "html_content, records, skipped",
+    [
+        (card(), [(2025, "Tesla Model Y", 44990)], []),
+        (card(link=False), [], ["no_link"]),
+        (card(name=False), [], ["no_name"]),
+        (card(price=None), [(2025, "Tesla Model Y", None)], []),
+        (card(price="MSRP TBD"), [(2025, "Tesla Model Y", "MSRP TBD")], []),
+        (card(model="audi"), [], ["no_model_element"]),
+        (
+            card(link=False, price=None) + card() + card(name=False),
+            [(2025, "Tesla Model Y", 44990)],
+            ["no_link", "no_name"],
+        ),
+    ],
+    ids=[
+        "complete",
+        "no-link",
+        "no-name",
+        "no-price",
+        "text-price",
+        "other-make",
+        "mixed",
+    ],
+)
+def test_partial_cards_are_typed_or_skipped_like_beautifulsoup(
+    html_content, records, skipped
+):
+    page = f"<html><body>{html_content}</body></html>"
+
+    assert extractor_records(page, "tesla") == (records, skipped)
+    assert soup_records(page, "tesla-") == (records, skipped)
+
+
+def test_scraper_and_build_extract_the_same_records():
+    cars, _ = main_script.extract_make("land_rover", DATA_DIR, debug=False)
+
+    assert parse_models_data(raw_page("land_rover"), "Land_Rover") == cars
+    assert cars
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import shutil
+
+import pytest
+
+import main_script
+from car_dataset import NDJSON_FILEPATH
+from conftest import DATA_DIR
+from main_script import (
+    COMPLETE_FILEPATH,
+    MANIFEST_FILEPATH,
+    MANIFEST_FILEPATHS,
+    build,
+    build_incremental,
+)
+
+MAKES = ["acura", "audi", "tesla"]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A few real raw pages; the build's outputs go to the test's directory."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for make in MAKES:
+        shutil.copy(os.path.join(DATA_DIR, f"{make}.json"), data_dir)
+    monkeypatch.chdir(tmp_path)
+    return data_dir
+
+
+def build_makes(data_dir, makes=MAKES, **options):
+    """Runs build_incremental and saves its manifest, as a build would."""
+    company_cars_data, make_stats, changed_makes, manifest = build_incremental(
+        makes, str(data_dir), MANIFEST_FILEPATH, **options
+    )
+    main_script.save_manifest(MANIFEST_FILEPATH, manifest, None)
+    return company_cars_data, make_stats, changed_makes
+
+
+def change_tesla_price(data_dir, old="$44,990", new="$45,990"):
+    filepath = data_dir / "tesla.json"
+    raw_page = json.loads(filepath.read_text())
+    content = raw_page["results"][0]["content"]
+    raw_page["results"][0]["content"] = content.replace(old, new, 1)
+    filepath.write_text(json.dumps(raw_page))
+
+
+def tesla_prices(company_cars_data):
+    return [car["price"] for car in company_cars_data["Tesla"]]
+
+
+def test_unchanged_pages_are_not_reparsed(data_dir):
+    first, first_stats, _ = build_makes(data_dir)
+    assert sorted(first_stats) == MAKES
+
+    second, second_stats, changed_makes = build_makes(data_dir)
+    assert second_stats == {}
+    assert changed_makes == []
+    assert second == first
+
+
+def test_touched_but_identical_pages_are_not_reparsed(data_dir):
+    build_makes(data_dir)
+    os.utime(data_dir / "audi.json", ns=(1, 1))
+
+    _, make_stats, changed_makes = build_makes(data_dir)
+    assert make_stats == {}
+    assert changed_makes == []
+
+
+def test_changed_page_is_reparsed(data_dir):
+    first, _, _ = build_makes(data_dir)
+    change_tesla_price(data_dir)
+
+    second, make_stats, changed_makes = build_makes(data_dir)
+    assert list(make_stats) == ["tesla"]
+    assert changed_makes == ["tesla"]
+    assert 45990 in tesla_prices(second)
+    assert 45990 not in tesla_prices(first)
+    assert second["Acura"] == first["Acura"]
+    assert list(second) == list(first)
+
+
+def test_removed_page_drops_its_make_without_a_warning(data_dir, caplog):
+    build_makes(data_dir)
+    os.remove(data_dir / "audi.json")
+
+    caplog.set_level(logging.DEBUG, logger="car_build")
+    company_cars_data, make_stats, changed_makes = build_makes(
+        data_dir, ["acura", "tesla"]
+    )
+    assert list(company_cars_data) == ["Acura", "Tesla"]
+    assert make_stats == {}  # Nothing is extracted for the removed make
+    assert changed_makes == ["audi"]
+    assert "raw_page_missing" not in caplog.messages
+    assert "makes_removed" in caplog.messages
+
+    with open(MANIFEST_FILEPATH) as infile:
+        assert sorted(json.load(infile)["makes"]) == ["acura", "tesla"]
+
+
+def test_full_reparses_every_make(data_dir):
+    build_makes(data_dir)
+
+    _, make_stats, changed_makes = build_makes(data_dir, full=True)
+    assert sorted(make_stats) == MAKES
+    assert sorted(changed_makes) == MAKES
+
+
+def test_manifest_for_another_data_dir_is_ignored(data_dir, tmp_path):
+    build_makes(data_dir)
+    other_dir = tmp_path / "other"
+    shutil.copytree(data_dir, other_dir)
+
+    _, make_stats, _ = build_makes(other_dir)
+    assert sorted(make_stats) == MAKES
+
+
+def test_interrupted_write_leaves_the_manifest_untouched(data_dir, monkeypatch):
+    build(data_dir=str(data_dir))
+    with open(MANIFEST_FILEPATH) as infile:
+        manifest = infile.read()
+    with open(COMPLETE_FILEPATH) as infile:
+        complete = infile.read()
+    change_tesla_price(data_dir)
+
+    write_json_atomic = main_script.write_json_atomic
+
+    def crash_on_complete(filepath, *args, **kwargs):
+        if filepath == COMPLETE_FILEPATH:
+            raise OSError("disk full")
+        write_json_atomic(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(main_script, "write_json_atomic", crash_on_complete)
+    with pytest.raises(OSError):
+        build(data_dir=str(data_dir))
+    with open(MANIFEST_FILEPATH) as infile:
+        assert infile.read() == manifest
+    with open(COMPLETE_FILEPATH) as infile:
+        assert infile.read() == complete
+
+    monkeypatch.setattr(main_script, "write_json_atomic", write_json_atomic)
+    build(data_dir=str(data_dir))  # Tesla is re-parsed, as it never made it out
+    with open(COMPLETE_FILEPATH) as infile:
+        assert 45990 in tesla_prices(json.load(infile))
+
+
+def read_ndjson_prices(make):
+    with open(NDJSON_FILEPATH) as infile:
+        records = [json.loads(line) for line in infile]
+    return [record["price"] for record in records if record["brand"] == make]
+
+
+def test_each_output_format_is_rebuilt_from_its_own_manifest(data_dir):
+    build(data_dir=str(data_dir))
+    change_tesla_price(data_dir)
+
+    build(output_format="ndjson", data_dir=str(data_dir))
+    assert 45990 in read_ndjson_prices("Tesla")
+    assert os.path.exists(MANIFEST_FILEPATHS["ndjson"])
+
+    build(data_dir=str(data_dir))  # The ndjson build must not mark json current
+    with open(COMPLETE_FILEPATH) as infile:
+        assert 45990 in tesla_prices(json.load(infile))
+
+    change_tesla_price(data_dir, "$45,990", "$44,990")
+    build(data_dir=str(data_dir))
+    build(output_format="ndjson", data_dir=str(data_dir))
+    assert 45990 not in read_ndjson_prices("Tesla")
+    assert 44990 in read_ndjson_prices("Tesla")
+
+
+
+def test_only_the_serial_path_dumps_lineup_cards(caplog):
+    caplog.set_level(logging.DEBUG, logger="car_build")
+
+    main_script.extract_make("tesla", DATA_DIR)
+    assert "lineup_card" in caplog.messages
+
+    caplog.clear()
+    main_script._extract_make_quietly("tesla", DATA_DIR)  # What pool workers run
+    assert "lineup_card" not in caplog.messages
+    assert "raw_page_found" in caplog.messages
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from car_dataset import read_trims_dataset
+from conftest import DATA_DIR
+from model_crawler import PRIORITY_CHANGED, PRIORITY_UNCHANGED, ModelCrawler
+from page_store import MODEL_PAGE_DIR, PAGE_EXTENSION, write_page
+
+# The fixture page is written to match the placeholder TRIM_* classes in
+# model_crawler, so these tests cover planning, fetching and parsing, not
+# whether the classes match cars.com
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MODEL_SLUG = "tesla-model_y-2025"
+
+EXPECTED_TRIMS = [
+    {"trim": "Long Range RWD", "price": 44990},
+    {"trim": "Long Range AWD", "price": 47990},
+    {"trim": "Performance AWD", "price": 51490},
+    {"trim": "Launch Series", "price": "MSRP TBD"},
+    {"trim": "Standard", "price": None},
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """The real Tesla lineup page, as the crawler's data directory."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shutil.copy(os.path.join(DATA_DIR, "tesla.json"), data_dir)
+    return data_dir
+
+
+@pytest.fixture
+def endpoint(tmp_path, stub_proxy):
+    """A stub proxy serving the Model Y fixture page and nothing else."""
+    served_dir = tmp_path / "served"
+    (served_dir / MODEL_PAGE_DIR).mkdir(parents=True)
+    with open(os.path.join(FIXTURE_DIR, f"{MODEL_SLUG}.html")) as infile:
+        html_content = infile.read()
+    write_page(
+        str(served_dir / MODEL_PAGE_DIR / f"{MODEL_SLUG}{PAGE_EXTENSION}"),
+        html_content,
+    )
+    return stub_proxy(served_dir)[1]
+
+
+def make_crawler(tmp_path, data_dir, **options):
+    return ModelCrawler(
+        str(data_dir),
+        "user",
+        "pass",
+        index_filepath=str(tmp_path / "model_crawl.json"),
+        timeout=10,
+        retries=0,
+        max_workers=2,
+        **options,
+    )
+
+
+def test_plan_follows_the_lineup_card_links(tmp_path, data_dir):
+    tasks = make_crawler(tmp_path, data_dir).plan(["tesla"])
+
+    assert [task.slug for task in tasks] == [
+        "tesla-model_y-2025",
+        "tesla-model_x-2025",
+        "tesla-cybertruck-2025",
+        "tesla-model_s-2025",
+        "tesla-model_3-2025",
+    ]
+    assert {task.priority for task in tasks} == {PRIORITY_CHANGED}
+    assert tasks[0].model == "Tesla Model Y"
+    assert tasks[0].lineup_price == 44990
+
+
+def test_crawl_through_the_stub_then_offline(tmp_path, data_dir, endpoint):
+    crawler = make_crawler(tmp_path, data_dir, endpoint=endpoint)
+    tasks = crawler.plan(["tesla"])
+
+    results = crawler.crawl(tasks)
+
+    assert results[MODEL_SLUG].status == "fetched"
+    assert results[MODEL_SLUG].trims == EXPECTED_TRIMS
+    assert results["tesla-model_x-2025"].status == "failed"  # The stub has no page
+    saved_page = data_dir / MODEL_PAGE_DIR / f"{MODEL_SLUG}{PAGE_EXTENSION}"
+    assert saved_page.exists()
+
+    # The saved page is read back with no proxy, and the unchanged lineup
+    # price moves the model behind the ones never crawled
+    offline = make_crawler(tmp_path, data_dir, offline=True)
+    replanned = {task.slug: task for task in offline.plan(["tesla"])}
+    assert replanned[MODEL_SLUG].priority == PRIORITY_UNCHANGED
+    assert replanned["tesla-model_x-2025"].priority == PRIORITY_CHANGED
+
+    offline_results = offline.crawl([replanned[MODEL_SLUG]])
+    assert offline_results[MODEL_SLUG].status == "loaded"
+    assert offline_results[MODEL_SLUG].trims == EXPECTED_TRIMS
+
+
+def test_pages_without_trim_cards_are_reported(tmp_path, data_dir):
+    model_dir = data_dir / MODEL_PAGE_DIR
+    model_dir.mkdir()
+    write_page(
+        str(model_dir / f"{MODEL_SLUG}{PAGE_EXTENSION}"),
+        "<html><body><div class='trim-picker-label'>Trims</div></body></html>",
+    )
+    crawler = make_crawler(tmp_path, data_dir, offline=True)
+    task = crawler.plan(["tesla"])[0]
+
+    result = crawler.crawl([task])[MODEL_SLUG]
+
+    assert result.status == "no_trims"
+    assert result.trims == []
+
+
+def test_trims_round_trip_and_unusable_years_are_skipped(tmp_path, data_dir, endpoint):
+    crawler = make_crawler(tmp_path, data_dir, endpoint=endpoint)
+    crawler.crawl(crawler.plan(["tesla"]))
+    trims_filepath = tmp_path / "trims.ndjson"
+    assert crawler.write_trims(str(trims_filepath)) == len(EXPECTED_TRIMS)
+
+    with open(trims_filepath, "a") as outfile:
+        for year in ["MY 2024", "TBD", None]:
+            record = {
+                "brand": "Tesla",
+                "year": year,
+                "model": "Tesla Model Y",
+                "trim": f"Base ({year})",
+                "price": 40000,
+                "lineup_price": None,
+            }
+            outfile.write(json.dumps(record) + "\n")
+    trims_df = read_trims_dataset(str(trims_filepath))
+
+    trims = [trim["trim"] for trim in EXPECTED_TRIMS] + ["Base (MY 2024)"]
+    assert trims_df["Trim"].tolist() == trims
+    assert trims_df["Year"].tolist() == [2025] * len(EXPECTED_TRIMS) + [2024]
+    assert str(trims_df["Year"].dtype) == "int64"
+    assert trims_df["Price"].isna().tolist() == [False] * 3 + [True] * 2 + [False]
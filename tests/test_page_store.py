@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from conftest import DATA_DIR
+from lineup_parser import serialize_lineup
+from page_store import (
+    CODECS,
+    PAGE_MAGIC,
+    PageFormatError,
+    find_raw_page,
+    load_raw_page,
+    migrate_legacy_pages,
+    read_page,
+    write_lineup_page,
+    write_page,
+)
+
+
+@pytest.fixture(scope="module")
+def html_content():
+    return load_raw_page(os.path.join(DATA_DIR, "tesla.json"))
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip(tmp_path, html_content, codec):
+    filepath = str(tmp_path / "tesla.page")
+
+    written = write_page(filepath, html_content, {"make": "tesla"}, codec=codec)
+    header, round_trip = read_page(filepath)
+
+    assert round_trip == html_content
+    assert header == written
+    assert header["codec"] == codec
+    assert header["make"] == "tesla"
+    assert header["content_bytes"] == len(html_content.encode("utf-8"))
+    assert os.path.getsize(filepath) < len(html_content) / 4
+    assert not os.path.exists(f"{filepath}.tmp")
+
+
+def test_lineup_page_keeps_the_cards_and_the_full_page_hash(tmp_path, html_content):
+    filepath = str(tmp_path / "tesla.page")
+
+    write_lineup_page(filepath, html_content, {"make": "tesla"})
+    header, lineup = read_page(filepath)
+
+    assert lineup == serialize_lineup(html_content)
+    assert header["kind"] == "lineup"
+    assert header["page_bytes"] == len(html_content.encode("utf-8"))
+
+
+def test_unknown_codec_is_rejected(tmp_path):
+    with pytest.raises(PageFormatError):
+        write_page(str(tmp_path / "tesla.page"), "<html></html>", codec="brotli")
+
+
+def corrupt_copy(tmp_path, html_content, change, codec="gzip"):
+    filepath = tmp_path / "tesla.page"
+    write_page(str(filepath), html_content, codec=codec)
+    filepath.write_bytes(change(filepath.read_bytes()))
+    return str(filepath)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda data: b"",
+        lambda data: data[:5],
+        lambda data: b"NOTAPAGE" + data[len(PAGE_MAGIC) :],
+        lambda data: data[:20],  # Cut inside the header
+        lambda data: data[: len(data) // 2],  # Cut inside the body
+        lambda data: data[:-40] + bytes(40),  # Body overwritten
+    ],
+    ids=["empty", "short", "bad-magic", "truncated-header", "truncated-body", "zeroed"],
+)
+@pytest.mark.parametrize("codec", CODECS)
+def test_corrupt_files_raise_page_format_error(tmp_path, html_content, change, codec):
+    filepath = corrupt_copy(tmp_path, html_content, change, codec)
+
+    with pytest.raises(PageFormatError):
+        read_page(filepath)
+
+
+def test_legacy_json_is_found_after_page(tmp_path, html_content):
+    legacy = tmp_path / "tesla.json"
+    legacy.write_text(json.dumps({"results": [{"content": html_content}]}))
+    assert find_raw_page(str(tmp_path), "tesla") == str(legacy)
+    assert load_raw_page(str(legacy)) == html_content
+
+    write_page(str(tmp_path / "tesla.page"), "<html>new</html>")
+    assert find_raw_page(str(tmp_path), "tesla") == str(tmp_path / "tesla.page")
+    assert find_raw_page(str(tmp_path), "audi") is None
+
+
+def test_legacy_json_without_results_loads_as_none(tmp_path):
+    legacy = tmp_path / "tesla.json"
+    legacy.write_text(json.dumps({"results": []}))
+
+    assert load_raw_page(str(legacy)) is None
+
+
+def test_migration_replaces_legacy_dumps(tmp_path, html_content):
+    (tmp_path / "tesla.json").write_text(
+        json.dumps({"results": [{"content": html_content}]})
+    )
+
+    stats = migrate_legacy_pages(str(tmp_path))
+
+    assert stats["files"] == 1
+    assert os.listdir(tmp_path) == ["tesla.page"]
+    assert load_raw_page(str(tmp_path / "tesla.page")) == html_content
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from price_history import connect, price_changes, record_snapshot
+
+CARS = pd.DataFrame(
+    {
+        "Brand": ["Tesla", "Tesla", "Acura"],
+        "Year": [2025, 2025, 2025],
+        "Model": ["Tesla Model 3", "Tesla Model Y", "Acura MDX"],
+        "Price": [42490.0, 44990.0, 51200.0],
+    }
+)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "price_history.sqlite"))
+    yield conn
+    conn.close()
+
+
+def test_price_changes_read_only_the_compared_snapshots(conn):
+    raised = CARS.assign(Price=CARS["Price"] + 1000)
+    record_snapshot(conn, CARS, "a", "2026-01-01T00:00:00+00:00")
+    record_snapshot(conn, raised, "b", "2026-01-02T00:00:00+00:00")
+
+    changes = price_changes(conn)
+    assert changes["Change"].tolist() == [1000, 1000, 1000]
+
+    plan = " ".join(
+        row[-1]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT f.price, l.price FROM prices f "
+            "JOIN prices l ON l.brand = f.brand AND l.model = f.model "
+            "AND l.year = f.year AND l.snapshot_id = ? WHERE f.snapshot_id = ?",
+            (2, 1),
+        )
+    )
+    assert "SCAN" not in plan
+
+
+def test_repeated_models_are_rejected(conn):
+    repeated = pd.concat([CARS, CARS.iloc[[1]].assign(Price=1.0)], ignore_index=True)
+
+    with pytest.raises(ValueError, match="Tesla Model Y"):
+        record_snapshot(conn, repeated, "a")
+    assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone() == (0,)
@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import refresh
+from conftest import DATA_DIR
+from page_store import find_raw_page, load_raw_page, write_page
+from refresh import DONE, FAILED, PENDING, RefreshRun
+
+BASE_URL = "https://www.cars.com/research/"
+MAKES = ["Acura", "Audi", "BMW", "Tesla"]
+
+
+@pytest.fixture
+def served_dir(tmp_path):
+    """Pages the stub proxy serves, copied so a test can change them."""
+    served_dir = tmp_path / "served"
+    served_dir.mkdir()
+    for make in MAKES:
+        shutil.copy(os.path.join(DATA_DIR, f"{make.lower()}.json"), served_dir)
+    return served_dir
+
+
+@pytest.fixture
+def make_run(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+
+    def make_run(endpoint):
+        return RefreshRun(
+            str(data_dir),
+            "user",
+            "pass",
+            BASE_URL,
+            checkpoint_filepath=str(tmp_path / "refresh_checkpoint.json"),
+            endpoint=endpoint,
+            timeout=10,
+            retries=0,
+            max_workers=1,
+        )
+
+    return make_run
+
+
+def statuses(run):
+    return {entry["make"]: entry["status"] for entry in run.checkpoint["makes"].values()}
+
+
+def test_interrupted_run_resumes_only_the_makes_not_done(
+    stub_proxy, served_dir, make_run, monkeypatch
+):
+    server, endpoint = stub_proxy(served_dir)
+    run = make_run(endpoint)
+    run.start(MAKES)
+
+    save_page_content = refresh.save_page_content
+    died = []
+
+    def die_from_bmw_on(make, *args):
+        if make == "BMW" or died:
+            died.append(make)
+            raise KeyboardInterrupt  # Not caught per make, like a killed process
+        save_page_content(make, *args)
+
+    monkeypatch.setattr(refresh, "save_page_content", die_from_bmw_on)
+    with pytest.raises(KeyboardInterrupt):
+        run.refresh(run.makes_to_refresh())
+    monkeypatch.setattr(refresh, "save_page_content", save_page_content)
+
+    resumed = make_run(endpoint)  # As a new process would, from the checkpoint
+    assert resumed.in_progress
+    assert statuses(resumed) == {
+        "Acura": DONE,
+        "Audi": DONE,
+        "BMW": PENDING,
+        "Tesla": PENDING,
+    }
+    assert resumed.makes_to_refresh() == ["BMW", "Tesla"]
+
+    assert resumed.refresh(resumed.makes_to_refresh()) == {"BMW": True, "Tesla": True}
+    # Acura and Audi were done before the run died and are not fetched again
+    assert server.request_counts == {"acura": 1, "audi": 1, "bmw": 2, "tesla": 2}
+    assert set(statuses(resumed).values()) == {DONE}
+
+
+def test_retry_failed_selects_only_failures_of_the_error_class(
+    stub_proxy, served_dir, make_run
+):
+    (served_dir / "audi.json").write_text(
+        json.dumps({"results": [{"content": "<html><body></body></html>"}]})
+    )
+    server, endpoint = stub_proxy(served_dir, failures={"bmw": 1, "tesla": 1})
+    run = make_run(endpoint)
+    run.start(MAKES)
+
+    results = run.refresh(run.makes_to_refresh())
+
+    assert results == {"Acura": True, "Audi": False, "BMW": False, "Tesla": False}
+    assert run.summary()["failed_by_error_class"] == {
+        "EmptyLineupError": 1,
+        "HTTPError": 2,
+    }
+    assert run.checkpoint["makes"]["bmw"]["status_code"] == 503
+    assert run.makes_to_refresh(retry_failed=True) == ["Audi", "BMW", "Tesla"]
+    assert run.makes_to_refresh(retry_failed=True, error_classes=["HTTPError"]) == [
+        "BMW",
+        "Tesla",
+    ]
+
+    results = run.refresh(run.makes_to_refresh(True, ["HTTPError"]))
+    assert results == {"BMW": True, "Tesla": True}
+    assert server.request_counts["audi"] == 1
+    assert statuses(run)["Audi"] == FAILED
+    assert "error_class" not in run.checkpoint["makes"]["bmw"]
+
+
+def test_empty_lineup_keeps_the_previous_page(stub_proxy, served_dir, make_run):
+    (served_dir / "tesla.json").write_text(
+        json.dumps({"results": [{"content": "<html><body></body></html>"}]})
+    )
+    _, endpoint = stub_proxy(served_dir)
+    run = make_run(endpoint)
+    previous_filepath = os.path.join(run.data_dir, "tesla.page")
+    with open(os.path.join(DATA_DIR, "tesla.json")) as infile:
+        previous_html = json.load(infile)["results"][0]["content"]
+    write_page(previous_filepath, previous_html, {"make": "tesla"})
+    with open(previous_filepath, "rb") as infile:
+        previous_bytes = infile.read()
+
+    run.start(["Tesla"])
+    assert run.refresh(["Tesla"]) == {"Tesla": False}
+
+    assert run.checkpoint["makes"]["tesla"]["error_class"] == "EmptyLineupError"
+    with open(previous_filepath, "rb") as infile:
+        assert infile.read() == previous_bytes
+    assert load_raw_page(find_raw_page(run.data_dir, "tesla")) == previous_html
+
+
+def test_build_reads_the_run_data_dir(
+    stub_proxy, served_dir, make_run, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)  # The build writes complete.json here
+    _, endpoint = stub_proxy(served_dir)
+    run = make_run(endpoint)
+    run.start(["Audi", "Tesla"])
+    run.refresh(run.makes_to_refresh())
+
+    assert run.build()
+
+    assert run.checkpoint["build"]["status"] == DONE
+    assert not run.in_progress
+    with open(tmp_path / "complete.json") as infile:
+        assert list(json.load(infile)) == ["Audi", "Tesla"]
+    with open(tmp_path / "build_manifest.json") as infile:
+        assert json.load(infile)["data_dir"] == os.path.abspath(run.data_dir)
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import DATA_DIR
+from scrape_cache import ScrapeCache
+
+BASE_URL = "https://www.cars.com/research/"
+TTL = 3600
+STALE_WHILE_REVALIDATE = 600
+# Set on saved pages to tell whether a refresh rewrote them
+OLD_MTIME_NS = 1_000_000_000 * 10**9
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def served_dir(tmp_path):
+    """Pages the stub proxy serves, copied so a test can change them."""
+    served_dir = tmp_path / "served"
+    served_dir.mkdir()
+    shutil.copy(os.path.join(DATA_DIR, "tesla.json"), served_dir)
+    return served_dir
+
+
+@pytest.fixture
+def proxy(stub_proxy, served_dir):
+    return stub_proxy(served_dir)
+
+
+@pytest.fixture
+def make_cache(tmp_path, proxy):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    caches = []
+
+    def make_cache(clock):
+        cache = ScrapeCache(
+            str(data_dir),
+            "user",
+            "pass",
+            BASE_URL,
+            index_filepath=str(tmp_path / "scrape_cache.json"),
+            default_ttl=TTL,
+            stale_while_revalidate=STALE_WHILE_REVALIDATE,
+            endpoint=proxy[1],
+            timeout=10,
+            retries=0,
+            max_workers=2,
+            clock=clock,
+        )
+        caches.append(cache)
+        return cache
+
+    yield make_cache
+    for cache in caches:
+        cache.close()
+
+
+def saved_page(cache):
+    return os.path.join(cache.data_dir, "tesla.page")
+
+
+def age_saved_page(cache):
+    os.utime(saved_page(cache), ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def change_served_price(served_dir):
+    filepath = served_dir / "tesla.json"
+    raw_page = json.loads(filepath.read_text())
+    content = raw_page["results"][0]["content"]
+    raw_page["results"][0]["content"] = content.replace("$44,990", "$45,990", 1)
+    filepath.write_text(json.dumps(raw_page))
+
+
+def test_first_scrape_is_changed_then_fresh(proxy, make_cache):
+    server = proxy[0]
+    clock = Clock()
+    cache = make_cache(clock)
+
+    first = cache.scrape("Tesla")
+    assert first.status == "changed"
+    assert first.models_data
+    assert os.path.exists(saved_page(cache))
+
+    clock.now += TTL - 1
+    second = cache.scrape("Tesla")
+    assert second.status == "fresh"
+    assert second.models_data == first.models_data
+    assert server.request_counts["tesla"] == 1
+
+
+def test_stale_is_served_while_revalidating(proxy, make_cache):
+    server = proxy[0]
+    clock = Clock()
+    cache = make_cache(clock)
+    first = cache.scrape("Tesla")
+    age_saved_page(cache)
+
+    clock.now += TTL + STALE_WHILE_REVALIDATE / 2
+    assert cache.status("Tesla") == "stale"
+    result = cache.scrape("Tesla")
+    assert result.status == "stale"
+    assert result.models_data == first.models_data
+    cache.wait()
+
+    assert server.request_counts["tesla"] == 2
+    assert cache.status("Tesla") == "fresh"  # Renewed by the background refresh
+    assert os.stat(saved_page(cache)).st_mtime_ns == OLD_MTIME_NS  # Lineup unchanged
+
+
+def test_expired_unchanged_lineup_keeps_the_raw_page(proxy, make_cache):
+    server = proxy[0]
+    clock = Clock()
+    cache = make_cache(clock)
+    cache.scrape("Tesla")
+    age_saved_page(cache)
+
+    clock.now += TTL + STALE_WHILE_REVALIDATE
+    assert cache.status("Tesla") == "expired"
+    result = cache.scrape("Tesla")
+
+    assert result.status == "unchanged"
+    assert server.request_counts["tesla"] == 2
+    assert os.stat(saved_page(cache)).st_mtime_ns == OLD_MTIME_NS
+    assert cache.status("Tesla") == "fresh"
+
+
+def test_expired_changed_lineup_rewrites_the_raw_page(make_cache, served_dir):
+    clock = Clock()
+    cache = make_cache(clock)
+    first = cache.scrape("Tesla")
+    age_saved_page(cache)
+    change_served_price(served_dir)
+
+    clock.now += TTL + STALE_WHILE_REVALIDATE
+    result = cache.scrape("Tesla")
+
+    assert result.status == "changed"
+    assert result.models_data != first.models_data
+    assert 45990 in [model["price"] for model in result.models_data]
+    assert os.stat(saved_page(cache)).st_mtime_ns != OLD_MTIME_NS
+
+
+def test_missing_raw_page_is_rewritten_even_if_unchanged(make_cache):
+    clock = Clock()
+    cache = make_cache(clock)
+    cache.scrape("Tesla")
+    os.remove(saved_page(cache))
+
+    clock.now += TTL + STALE_WHILE_REVALIDATE
+    assert cache.scrape("Tesla").status == "changed"
+    assert os.path.exists(saved_page(cache))
+
+
+def test_failed_refresh_serves_cached_models_or_fails(proxy, make_cache):
+    server = proxy[0]
+    clock = Clock()
+    cache = make_cache(clock)
+    first = cache.scrape("Tesla")
+
+    server.failures["tesla"] = server.request_counts["tesla"] + 1
+    clock.now += TTL + STALE_WHILE_REVALIDATE
+    result = cache.scrape("Tesla")
+    assert result.status == "stale"
+    assert result.models_data == first.models_data
+    assert cache.status("Tesla") == "expired"  # Not renewed by the failure
+
+    server.failures["acura"] = 1  # Nothing cached for it
+    failed = cache.scrape("Acura")
+    assert failed.status == "failed"
+    assert failed.models_data is None
+
+
+def test_index_survives_a_new_cache(make_cache):
+    clock = Clock()
+    make_cache(clock).scrape("Tesla")
+
+    assert make_cache(clock).scrape("Tesla").status == "fresh"
@@ -0,0 +1,69 @@
+import os
+
+from scraper_module import scrape_car_models, scrape_car_models_batch
+
+BASE_URL = "https://www.cars.com/research/"
+
+
+def scrape(make, data_dir, endpoint, **options):
+    return scrape_car_models(
+        make, "user", "pass", BASE_URL, str(data_dir), endpoint=endpoint, **options
+    )
+
+
+def test_retries_transient_failures(stub_proxy, tmp_path):
+    server, endpoint = stub_proxy(failures={"tesla": 2})
+
+    models_data = scrape("Tesla", tmp_path, endpoint, retries=3, backoff=0.01)
+
+    assert models_data
+    assert server.request_counts["tesla"] == 3
+    assert os.path.exists(tmp_path / "tesla.page")
+
+
+def test_gives_up_once_retries_are_used_up(stub_proxy, tmp_path):
+    server, endpoint = stub_proxy(failures={"tesla": 5})
+
+    models_data = scrape("Tesla", tmp_path, endpoint, retries=2, backoff=0.01)
+
+    assert models_data is None
+    assert server.request_counts["tesla"] == 3
+    assert not os.listdir(tmp_path)
+
+
+def test_does_not_retry_by_default(stub_proxy, tmp_path):
+    server, endpoint = stub_proxy(failures={"tesla": 1})
+
+    assert scrape("Tesla", tmp_path, endpoint) is None
+    assert server.request_counts["tesla"] == 1
+
+
+def test_does_not_retry_client_errors(stub_proxy, tmp_path):
+    server, endpoint = stub_proxy()
+
+    models_data = scrape("No_Such_Make", tmp_path, endpoint, retries=3, backoff=0.01)
+
+    assert models_data is None  # The stub answers 404
+    assert server.request_counts["no_such_make"] == 1
+
+
+def test_batch_retries_each_make(stub_proxy, tmp_path):
+    server, endpoint = stub_proxy(failures={"tesla": 1, "acura": 2, "audi": 9})
+
+    results = scrape_car_models_batch(
+        ["Tesla", "Acura", "Audi", "BMW"],
+        "user",
+        "pass",
+        BASE_URL,
+        str(tmp_path),
+        max_workers=4,
+        timeout=10,
+        retries=2,
+        backoff=0.01,
+        endpoint=endpoint,
+    )
+
+    assert list(results) == ["Tesla", "Acura", "Audi", "BMW"]
+    assert results["Tesla"] and results["Acura"] and results["BMW"]
+    assert results["Audi"] is None
+    assert server.request_counts == {"tesla": 2, "acura": 3, "audi": 3, "bmw": 1}